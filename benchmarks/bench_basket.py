@@ -0,0 +1,101 @@
+"""
+Benchmark the encoding of Saleor checkouts as HyperPay baskets.
+
+Compares ``build_basket_data`` with the encoding the processor used before,
+which formatted every key and price on each call and only sent the last line
+of the cart, for carts of growing size.
+
+Run from the repository root::
+
+    PYTHONPATH=. python benchmarks/bench_basket.py
+"""
+import timeit
+import tracemalloc
+
+from platform_plugin_hyperpay.basket import build_basket_data
+
+CURRENCY = 'SAR'
+ITEM_TYPE = 'DIGITAL'
+
+
+def legacy_build_basket_data(checkout_id, checkout_data, currency, item_type):
+    """
+    Encode the checkout as the processor did before the ``basket`` module.
+    """
+    def format_price(price):
+        return '{:0.2f}'.format(price)
+
+    def get_cart_field(index, name):
+        return 'cart.items[{}].{}'.format(index, name)
+
+    basket_data = {
+        'amount': format_price(float(checkout_data['totalPrice']['gross']['amount'])),
+        'currency': currency,
+        'merchantTransactionId': checkout_id,
+    }
+    cart_data = {}
+    for index, line in enumerate(checkout_data['lines']):
+        cart_data = {
+            get_cart_field(index, 'name'): line.get('variant', {}).get('name'),
+            get_cart_field(index, 'quantity'): line.get('quantity'),
+            get_cart_field(index, 'type'): item_type,
+            get_cart_field(index, 'sku'): line.get('variant', {}).get('sku'),
+            get_cart_field(index, 'price'): format_price(float(line['unitPrice']['gross']['amount'])),
+            get_cart_field(index, 'currency'): currency,
+            get_cart_field(index, 'totalAmount'): format_price(float(line['totalPrice']['gross']['amount'])),
+        }
+    basket_data.update(cart_data)
+    basket_data.update({
+        'customer.email': checkout_data['email'],
+        'customer.givenName': checkout_data['user']['firstName'],
+        'customer.surname': checkout_data['user']['lastName'],
+    })
+    return basket_data
+
+
+def build_checkout(count):
+    lines = [{
+        'variant': {'name': 'Course {}'.format(index), 'sku': 'SKU-{}'.format(index)},
+        'quantity': 3,
+        'unitPrice': {'gross': {'amount': 115.15}},
+        'totalPrice': {'gross': {'amount': 345.45}},
+    } for index in range(count)]
+    return {
+        'totalPrice': {'gross': {'amount': 345.45 * count}},
+        'lines': lines,
+        'email': 'learner@example.com',
+        'user': {'firstName': 'Ada', 'lastName': 'Lovelace'},
+    }
+
+
+def peak_memory(function, *args):
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    for count in (1, 10, 100, 1000, 5000):
+        checkout_data = build_checkout(count)
+        args = ('checkout-id', checkout_data, CURRENCY, ITEM_TYPE)
+        runs = max(20, 20000 // count)
+        legacy = timeit.timeit(lambda: legacy_build_basket_data(*args), number=runs) / runs
+        current = timeit.timeit(lambda: build_basket_data(*args), number=runs) / runs
+        print((
+            '{:5} lines  legacy {:9.1f} us ({} params, peak {:.0f} KiB)  '
+            'current {:9.1f} us ({} params, peak {:.0f} KiB)'
+        ).format(
+            count,
+            legacy * 1e6,
+            len(legacy_build_basket_data(*args)),
+            peak_memory(legacy_build_basket_data, *args) / 1024,
+            current * 1e6,
+            len(build_basket_data(*args)),
+            peak_memory(build_basket_data, *args) / 1024,
+        ))
+
+
+if __name__ == '__main__':
+    main()
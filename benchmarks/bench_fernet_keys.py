@@ -0,0 +1,47 @@
+"""
+Benchmark the decryption of encrypted resource paths.
+
+Compares deriving the Fernet key with PBKDF2 on every call, as before, with
+the keys cached by ``get_fernet``.
+
+Run from the repository root::
+
+    PYTHONPATH=. DJANGO_SETTINGS_MODULE=test_settings python benchmarks/bench_fernet_keys.py
+"""
+import timeit
+
+import django
+
+django.setup()
+
+# pylint: disable=wrong-import-position
+from cryptography.fernet import Fernet
+
+from platform_plugin_hyperpay.payment.views import clear_key_cache, decrypt_string, encrypt_string, generate_key
+
+ENCRYPTION_KEY = 'encryption-key'
+SALT = 'salt'
+RESOURCE_PATH = '/v1/checkouts/8ac7a4a28e1f2b3c01/payment'
+
+
+def decrypt_uncached(encrypted_message):
+    """
+    Decrypt the message deriving the key on every call.
+    """
+    return Fernet(generate_key(ENCRYPTION_KEY, SALT)).decrypt(encrypted_message.encode()).decode('utf-8')
+
+
+def main():
+    clear_key_cache()
+    encrypted = encrypt_string(RESOURCE_PATH, ENCRYPTION_KEY, SALT)
+    assert decrypt_uncached(encrypted) == decrypt_string(encrypted, ENCRYPTION_KEY, SALT) == RESOURCE_PATH
+
+    uncached_runs, cached_runs = 20, 20000
+    uncached = timeit.timeit(lambda: decrypt_uncached(encrypted), number=uncached_runs) / uncached_runs
+    cached = timeit.timeit(lambda: decrypt_string(encrypted, ENCRYPTION_KEY, SALT), number=cached_runs) / cached_runs
+    print('uncached: {:.2f} ms per call'.format(uncached * 1e3))
+    print('cached:   {:.1f} us per call'.format(cached * 1e6))
+
+
+if __name__ == '__main__':
+    main()
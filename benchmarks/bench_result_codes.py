@@ -0,0 +1,66 @@
+"""
+Benchmark the classification of HyperPay result codes.
+
+Compares ``classify_result_code`` with the chain of regular expressions the
+processor used before, on one million codes drawn from a few hundred distinct
+values, and checks both agree on the status of every code of the sample grid.
+
+Run from the repository root::
+
+    PYTHONPATH=. python benchmarks/bench_result_codes.py
+"""
+import random
+import re
+import timeit
+
+from platform_plugin_hyperpay.result_codes import PaymentStatus, classify_result_code
+
+SUCCESS_CODES_REGEX = re.compile(r'^(000\.000\.|000\.100\.1|000\.[36])')
+SUCCESS_MANUAL_REVIEW_CODES_REGEX = re.compile(r'^(000\.400\.0[^3]|000\.400\.[0-1]{2}0)')
+PENDING_CHANGEABLE_SOON_CODES_REGEX = re.compile(r'^(000\.200)')
+PENDING_NOT_CHANGEABLE_SOON_CODES_REGEX = re.compile(r'^(800\.400\.5|100\.400\.500)')
+
+
+def legacy_status(code):
+    """
+    Return the status of the code as the processor computed it before ``classify_result_code``.
+    """
+    if PENDING_CHANGEABLE_SOON_CODES_REGEX.search(code):
+        return PaymentStatus.PENDING
+    if PENDING_NOT_CHANGEABLE_SOON_CODES_REGEX.search(code):
+        return PaymentStatus.FAILURE
+    if SUCCESS_CODES_REGEX.search(code):
+        return PaymentStatus.SUCCESS
+    if SUCCESS_MANUAL_REVIEW_CODES_REGEX.search(code):
+        return PaymentStatus.FAILURE
+    return PaymentStatus.FAILURE
+
+
+def sample_codes():
+    """
+    Return a grid of codes covering every first group of the catalogue.
+    """
+    return [
+        '{:03d}.{:03d}.{:03d}'.format(first, second, third)
+        for first in (0, 100, 200, 300, 500, 600, 700, 800, 900, 999)
+        for second in range(0, 1000, 10)
+        for third in range(0, 1000, 7)
+    ]
+
+
+def main():
+    random.seed(1)
+    codes = sample_codes()
+    mismatches = [code for code in codes if legacy_status(code) != classify_result_code(code).status]
+    print('{} codes compared, {} mismatches'.format(len(codes), len(mismatches)))
+
+    classify_result_code.cache_clear()
+    pool = random.sample(codes, 300) + ['000.000.000'] * 50 + ['800.100.151'] * 20
+    stream = [random.choice(pool) for _ in range(1_000_000)]
+    legacy = timeit.timeit(lambda: [legacy_status(code) for code in stream], number=1)
+    current = timeit.timeit(lambda: [classify_result_code(code) for code in stream], number=1)
+    print('{} codes: regex chain {:.2f}s, classify_result_code {:.2f}s'.format(len(stream), legacy, current))
+
+
+if __name__ == '__main__':
+    main()
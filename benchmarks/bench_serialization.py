@@ -0,0 +1,84 @@
+"""
+Benchmark the JSON handling of the webhook and API traffic.
+
+Compares the standard library and Django's ``JsonResponse`` with the
+``serialization`` module, on a TRANSACTION_INITIALIZE_SESSION webhook body and
+a HyperPay payment status response. The module uses orjson when it is
+installed (``pip install platform-plugin-hyperpay[orjson]``).
+
+Run from the repository root::
+
+    PYTHONPATH=. DJANGO_SETTINGS_MODULE=test_settings python benchmarks/bench_serialization.py
+"""
+import json
+import timeit
+
+import django
+
+django.setup()
+
+# pylint: disable=wrong-import-position
+from django.http import JsonResponse as DjangoJsonResponse
+
+from platform_plugin_hyperpay.serialization import JSON_BACKEND, JsonResponse, loads
+
+RUNS = 20000
+
+TRANSACTION_INITIALIZE_SESSION = {
+    'issuedAt': '2026-10-01T10:00:00.123456+00:00',
+    'version': '3.20.12',
+    'recipient': {
+        'id': 'QXBwOjE=',
+        'privateMetadata': [{'key': 'k{}'.format(index), 'value': 'v' * 40} for index in range(8)],
+        'metadata': [{'key': 'm{}'.format(index), 'value': 'x' * 40} for index in range(8)],
+    },
+    'idempotencyKey': 'c2a4f0e2-1b5e-4bde-9a0b-1f6a9e8d3c21',
+    'data': {'id': '8ac7a4a2', 'code': '000.200.100', 'description': 'successfully created checkout'},
+    'merchantReference': 'VHJhbnNhY3Rpb25JdGVtOjE=',
+    'action': {'amount': '1150.00', 'currency': 'SAR', 'actionType': 'CHARGE'},
+    'transaction': {'id': 'VHJhbnNhY3Rpb25JdGVtOjE=', 'pspReference': '', 'events': [{'pspReference': ''}] * 3},
+}
+
+PAYMENT_STATUS = {
+    'id': '8ac7a4a28e1',
+    'paymentType': 'DB',
+    'paymentBrand': 'VISA',
+    'amount': '1150.00',
+    'currency': 'SAR',
+    'merchantTransactionId': 'Q2hlY2tvdXQ6MQ==',
+    'result': {'code': '000.000.000', 'description': 'Transaction succeeded'},
+    'card': {'bin': '411111', 'last4Digits': '1111', 'holder': 'Jane Doe', 'expiryMonth': '12', 'expiryYear': '2030'},
+    'customer': {'givenName': 'Jane', 'surname': 'Doe', 'email': 'jane@example.com', 'ip': '10.0.0.1'},
+    'billing': {'street1': 'King Fahd Road 1234', 'city': 'Riyadh', 'postcode': '12345', 'country': 'SA'},
+    'cart': {'items': [
+        {'name': 'Course {}'.format(index), 'quantity': '1', 'type': 'DIGITAL', 'price': '115.00'}
+        for index in range(10)
+    ]},
+    'timestamp': '2026-10-01 10:00:00+0000',
+    'ndc': '8ac7a4a2ABC.uat01-vm-tx01',
+}
+
+
+def per_call(func):
+    return timeit.timeit(func, number=RUNS) / RUNS * 1e6
+
+
+def main():
+    print('serialization backend: {}'.format(JSON_BACKEND))
+    for name, payload in (('webhook body', TRANSACTION_INITIALIZE_SESSION), ('payment status', PAYMENT_STATUS)):
+        body = json.dumps(payload).encode()
+        print((
+            '{:15} {:5}B  loads: json {:6.2f}us, module {:6.2f}us  '
+            'JsonResponse: django {:6.2f}us, module {:6.2f}us'
+        ).format(
+            name,
+            len(body),
+            per_call(lambda: json.loads(body)),  # pylint: disable=cell-var-from-loop
+            per_call(lambda: loads(body)),  # pylint: disable=cell-var-from-loop
+            per_call(lambda: DjangoJsonResponse(payload)),  # pylint: disable=cell-var-from-loop
+            per_call(lambda: JsonResponse(payload)),  # pylint: disable=cell-var-from-loop
+        ))
+
+
+if __name__ == '__main__':
+    main()
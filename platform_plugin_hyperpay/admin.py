@@ -0,0 +1,51 @@
+"""
+Django admin for platform_plugin_hyperpay.
+"""
+from django.contrib import admin
+
+from platform_plugin_hyperpay.models import CheckoutCompletion, HyperPayTransaction, SaleorAppConfiguration
+from platform_plugin_hyperpay.saleor_app.configuration import CONFIGURATION_FIELDS, save_saleor_app_configuration
+from platform_plugin_hyperpay.saleor_app.store import RECORD_PK
+
+
+@admin.register(HyperPayTransaction)
+class HyperPayTransactionAdmin(admin.ModelAdmin):
+    list_display = (
+        'hyperpay_checkout_id',
+        'saleor_checkout_id',
+        'processor_name',
+        'amount',
+        'currency',
+        'status',
+        'result_code',
+        'updated_at',
+    )
+    list_filter = ('status', 'processor_name')
+    search_fields = ('=hyperpay_checkout_id', '=saleor_checkout_id', '=payment_id')
+    readonly_fields = ('created', 'updated_at')
+
+
+@admin.register(CheckoutCompletion)
+class CheckoutCompletionAdmin(admin.ModelAdmin):
+    list_display = ('checkout_id', 'processor_name', 'status', 'attempts', 'order_id', 'modified')
+    list_filter = ('status', 'processor_name')
+    search_fields = ('=checkout_id', '=payment_id', '=order_id', '=reference')
+    readonly_fields = ('reference', 'created', 'modified')
+
+
+@admin.register(SaleorAppConfiguration)
+class SaleorAppConfigurationAdmin(admin.ModelAdmin):
+    list_display = ('version', 'payment_url', 'hyper_pay_api_base_url', 'modified')
+    # The access token is a secret, it is only set through the configuration page of the app.
+    exclude = ('access_token',)
+    readonly_fields = ('version', 'modified')
+
+    def save_model(self, request, obj, form, change):
+        """
+        Save the edited fields through the versioned store, so every worker picks up the new version.
+        """
+        save_saleor_app_configuration(
+            **{field: form.cleaned_data[field] for field in CONFIGURATION_FIELDS if field in form.cleaned_data}
+        )
+        obj.pk = RECORD_PK
+        obj.refresh_from_db()
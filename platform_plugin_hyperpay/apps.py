@@ -12,6 +12,7 @@ class PlatformPluginHyperpayConfig(AppConfig):
     """
 
     name = 'platform_plugin_hyperpay'
+    default_auto_field = 'django.db.models.BigAutoField'
     verbose_name = 'Hyperpay plugin for payment processor.'
     plugin_app = {
         PluginURLs.CONFIG: {
@@ -28,3 +29,11 @@ class PlatformPluginHyperpayConfig(AppConfig):
             },
         },
     }
+
+    def ready(self):
+        """
+        Build the payment processors once per worker.
+        """
+        from platform_plugin_hyperpay import registry  # pylint: disable=import-outside-toplevel
+
+        registry.load_processors()
@@ -0,0 +1,162 @@
+"""
+Asyncio-native variants of the HyperPay payment processors.
+
+Calls to oppwa go through the non-blocking ``httpx`` client. The Saleor API
+client is synchronous, so its calls are delegated to the default executor.
+"""
+import logging
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from platform_plugin_hyperpay.background import run_coroutine_in_background
+from platform_plugin_hyperpay.exceptions import HyperPayException
+from platform_plugin_hyperpay.ledger import record_checkout, record_verification
+from platform_plugin_hyperpay.logs import log_event
+from platform_plugin_hyperpay.metrics import get_result_code_class, track_stage
+from platform_plugin_hyperpay.processors import HyperPay, HyperPayMada
+from platform_plugin_hyperpay.result_codes import PaymentStatus
+from platform_plugin_hyperpay.serialization import loads
+from platform_plugin_hyperpay.transport import async_http_get, async_http_post
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncHyperPayMixin:
+    """
+    Replace the blocking network calls of a HyperPay processor with coroutines.
+    """
+
+    async def get_saleor_checkout_data(self, checkout_id):
+        """
+        Return the checkout data from Saleor.
+        """
+        return await sync_to_async(super().get_saleor_checkout_data, thread_sensitive=False)(checkout_id)
+
+    async def init_saleor_transaction(self, saleor_checkout_id, data):
+        """
+        Initialize the transaction with Saleor.
+        """
+        return await sync_to_async(super().init_saleor_transaction, thread_sensitive=False)(
+            saleor_checkout_id=saleor_checkout_id,
+            data=data,
+        )
+
+    async def complete_saleor_checkout(self, verification_response):
+        """
+        Complete the Saleor checkout after a successful payment.
+        """
+        return await sync_to_async(super().complete_saleor_checkout, thread_sensitive=False)(verification_response)
+
+    async def _get_basket_data(self, request):
+        """
+        Prepare the basket data and return the basket data.
+        """
+        checkout_id = request.GET['checkoutId']
+        return self._build_basket_data(checkout_id, await self.get_saleor_checkout_data(checkout_id))
+
+    async def _get_checkout_data(self, request):
+        """
+        Prepare the checkout and return the checkout data.
+        """
+        return await self._create_checkout(self._get_checkout_request_data(await self._get_basket_data(request)))
+
+    async def _create_checkout(self, request_data):
+        """
+        Create a HyperPay checkout and return the checkout data.
+        """
+        checkouts_api_url = self.hyper_pay_api_base_url + self.CHECKOUTS_ENDPOINT
+        log_event(logger, logging.INFO, 'hyperpay.checkout.request', processor=self.NAME, request=request_data)
+        with track_stage('create_checkout', self.NAME) as stage:
+            try:
+                response = await async_http_post(
+                    checkouts_api_url,
+                    request_data,
+                    headers=self.authentication_headers
+                )
+            except Exception as exc:
+                raise HyperPayException('Error creating a checkout. {}'.format(exc))
+            response_data = loads(response.content)
+            stage.result = get_result_code_class(response_data)
+
+        return self._parse_checkout_response(response_data)
+
+    async def get_transaction_parameters(self, request=None):
+        """
+        Return the transaction parameters needed for this processor.
+        """
+        request_data = self._get_checkout_request_data(await self._get_basket_data(request))
+        reuse_cache_key = self._get_request_checkout_reuse_cache_key(request_data)
+        checkout_data = await cache.aget(reuse_cache_key)
+        if checkout_data is not None:
+            return self._build_transaction_parameters(request, checkout_data)
+
+        checkout_data = await self._create_checkout(request_data)
+        await sync_to_async(record_checkout)(self, request_data, checkout_data)
+        transaction_initialization = self._initialize_reused_checkout(
+            request.GET['checkoutId'],
+            checkout_data,
+            reuse_cache_key,
+        )
+        if self.background_transaction_initialize:
+            run_coroutine_in_background(transaction_initialization, task_name='init_saleor_transaction')
+        else:
+            await transaction_initialization
+        return self._build_transaction_parameters(request, checkout_data)
+
+    async def _initialize_reused_checkout(self, saleor_checkout_id, checkout_data, reuse_cache_key):
+        """
+        Initialize the Saleor transaction of a new HyperPay checkout, then let page reloads reuse the checkout.
+        """
+        await self.init_saleor_transaction(saleor_checkout_id=saleor_checkout_id, data=checkout_data)
+        await cache.aset(reuse_cache_key, checkout_data, timeout=self.checkout_reuse_timeout)
+
+    async def _verify_status(self, resource_path):
+        """
+        Verify the status of the payment.
+        """
+        cache_key = self._get_verification_cache_key(resource_path)
+        with track_stage('verify_status', self.NAME) as stage:
+            cached = await cache.aget(cache_key)
+            if cached is not None:
+                stage.result = 'cached'
+                return cached['response'], PaymentStatus[cached['status']]
+
+            response = await async_http_get(
+                self._get_payment_status_endpoint(resource_path),
+                headers=self.authentication_headers,
+            )
+            response_data = loads(response.content)
+            stage.result = get_result_code_class(response_data) if response.is_success else 'http_error'
+
+        response_data, status = self._get_payment_status(response.is_success, response.status_code, response_data)
+        if response.is_success:
+            await sync_to_async(record_verification)(self, resource_path, response_data, status)
+            await cache.aset(
+                cache_key,
+                {'response': response_data, 'status': status.name},
+                timeout=self._get_verification_cache_timeout(status),
+            )
+            if status != PaymentStatus.PENDING:
+                await self._discard_reused_checkout(response_data)
+        return response_data, status
+
+    async def _discard_reused_checkout(self, response_data):
+        """
+        Stop reusing the HyperPay checkout once a payment with it reached a final status.
+        """
+        reuse_cache_key = self._get_response_checkout_reuse_cache_key(response_data)
+        if reuse_cache_key is not None:
+            await cache.adelete(reuse_cache_key)
+
+
+class AsyncHyperPay(AsyncHyperPayMixin, HyperPay):
+    """
+    Async HyperPay payment processor.
+    """
+
+
+class AsyncHyperPayMada(AsyncHyperPayMixin, HyperPayMada):
+    """
+    Async HyperPay payment processor for mada.
+    """
@@ -0,0 +1,109 @@
+"""
+Run work that the customer does not need to wait for outside of the request cycle.
+
+Tasks are executed by a small per-process thread pool. Failures are logged and
+counted per task name so they remain visible even though nobody awaits them.
+"""
+import asyncio
+import logging
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from platform_plugin_hyperpay.metrics import BACKGROUND_FAILURES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKGROUND_WORKERS = 4
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_failures = Counter()
+_pending_tasks = set()
+
+
+def get_executor():
+    """
+    Return the thread pool of the current process, creating it after a fork.
+    """
+    global _executor, _executor_pid  # pylint: disable=global-statement
+
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'HYPERPAY_BACKGROUND_WORKERS', DEFAULT_BACKGROUND_WORKERS),
+                    thread_name_prefix='hyperpay-background',
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def get_background_failures():
+    """
+    Return a copy of the number of failed background tasks per task name.
+    """
+    return dict(_failures)
+
+
+def record_failure(task_name, exc):
+    """
+    Log and count the failure of a background task.
+    """
+    _failures[task_name] += 1
+    BACKGROUND_FAILURES.inc(task_name)
+    logger.error('Background task %s failed: %r', task_name, exc, exc_info=exc)
+
+
+def _run_task(func, args, kwargs):
+    """
+    Run the task and release the database connection used by the worker thread.
+    """
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def run_in_background(func, *args, task_name=None, **kwargs):
+    """
+    Schedule ``func(*args, **kwargs)`` on the background pool and return its future.
+    """
+    task_name = task_name or getattr(func, '__name__', repr(func))
+    future = get_executor().submit(_run_task, func, args, kwargs)
+
+    def on_done(done_future):
+        exc = done_future.exception()
+        if exc is not None:
+            record_failure(task_name, exc)
+
+    future.add_done_callback(on_done)
+    return future
+
+
+def run_coroutine_in_background(coroutine, task_name):
+    """
+    Schedule the coroutine on the running event loop without awaiting it.
+
+    A reference to the task is kept until it finishes so it is not garbage collected.
+    Tasks cancelled before they finish, e.g. when ``async_to_sync`` closes the loop of
+    a request, are counted as failures.
+    """
+    task = asyncio.get_running_loop().create_task(coroutine)
+    _pending_tasks.add(task)
+
+    def on_done(done_task):
+        _pending_tasks.discard(done_task)
+        if done_task.cancelled():
+            record_failure(task_name, asyncio.CancelledError('The task was cancelled before it finished.'))
+        elif done_task.exception() is not None:
+            record_failure(task_name, done_task.exception())
+
+    task.add_done_callback(on_done)
+    return task
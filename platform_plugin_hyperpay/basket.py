@@ -0,0 +1,76 @@
+"""
+Encoding of Saleor checkouts as HyperPay basket parameters.
+
+HyperPay receives the lines of the cart as flat ``cart.items[i].<field>``
+parameters. The keys of each index are built once and reused by every basket,
+and money amounts are formatted from their exact decimal value.
+"""
+import threading
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+
+CART_ITEM_FIELDS = ('name', 'quantity', 'type', 'sku', 'price', 'currency', 'totalAmount')
+CART_ITEM_KEY_TEMPLATE = 'cart.items[{}].{}'
+
+TWO_PLACES = Decimal('0.01')
+
+# Keys of the cart fields of each line index, extended when a larger cart is seen.
+_cart_item_keys = []
+_cart_item_keys_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def format_price(price):
+    """
+    Return the price with two decimals, as expected by HyperPay.
+
+    Floats are converted through their shortest representation, so 1.005 is
+    rounded to 1.01 instead of going through its binary approximation. Carts
+    repeat the same few prices, so results are memoized.
+    """
+    if not isinstance(price, Decimal):
+        price = Decimal(str(price))
+    return '{:f}'.format(price.quantize(TWO_PLACES, rounding=ROUND_HALF_UP))
+
+
+def get_cart_item_keys(count):
+    """
+    Return the tuples of cart field keys of the first ``count`` lines.
+
+    The table only grows, under a lock, so concurrent baskets never see the
+    keys of an index appended twice or out of order.
+    """
+    if len(_cart_item_keys) < count:
+        with _cart_item_keys_lock:
+            for index in range(len(_cart_item_keys), count):
+                _cart_item_keys.append(tuple(CART_ITEM_KEY_TEMPLATE.format(index, field) for field in CART_ITEM_FIELDS))
+    return _cart_item_keys[:count]
+
+
+def build_basket_data(checkout_id, checkout_data, currency, item_type):
+    """
+    Return the basket parameters of a Saleor checkout, with every line of its cart.
+    """
+    lines = checkout_data['lines'] or ()
+    basket_data = {
+        'amount': format_price(checkout_data['totalPrice']['gross']['amount']),
+        'currency': currency,
+        'merchantTransactionId': checkout_id,
+    }
+    for keys, line in zip(get_cart_item_keys(len(lines)), lines):
+        variant = line.get('variant') or {}
+        basket_data.update(zip(keys, (
+            variant.get('name'),
+            line.get('quantity'),
+            item_type,
+            variant.get('sku'),
+            format_price(line['unitPrice']['gross']['amount']),
+            currency,
+            format_price(line['totalPrice']['gross']['amount']),
+        )))
+
+    user = checkout_data.get('user') or {}
+    basket_data['customer.email'] = checkout_data['email']
+    basket_data['customer.givenName'] = user.get('firstName')
+    basket_data['customer.surname'] = user.get('lastName')
+    return basket_data
@@ -1,2 +1,15 @@
 class HyperPayException(Exception):
     pass
+
+
+class SaleorCheckoutFinalizationError(HyperPayException):
+    """
+    Raised when Saleor reports errors while finalizing a checkout.
+
+    ``errors`` maps each mutation of the finalization document to the errors it returned.
+    """
+
+    def __init__(self, checkout_id, errors):
+        super().__init__('Error finalizing checkout {}: {}'.format(checkout_id, errors))
+        self.checkout_id = checkout_id
+        self.errors = errors
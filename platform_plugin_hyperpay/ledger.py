@@ -0,0 +1,92 @@
+"""
+Record the lifecycle of HyperPay payments in the local transaction ledger.
+"""
+import hashlib
+import re
+
+from django.utils import timezone
+
+from platform_plugin_hyperpay.models import HyperPayTransaction
+from platform_plugin_hyperpay.result_codes import PaymentStatus
+
+RESOURCE_PATH_CHECKOUT_ID_REGEX = re.compile(r'^/v1/checkouts/(?P<checkout_id>[^/]+)/payment')
+LEDGER_STATUSES = {
+    PaymentStatus.SUCCESS: HyperPayTransaction.SUCCESS,
+    PaymentStatus.PENDING: HyperPayTransaction.PENDING,
+    PaymentStatus.FAILURE: HyperPayTransaction.FAILURE,
+}
+FINAL_STATUSES = (HyperPayTransaction.SUCCESS, HyperPayTransaction.FAILURE)
+PAYMENT_STATUSES = {ledger_status: status for status, ledger_status in LEDGER_STATUSES.items()}
+
+
+def get_resource_path_hash(resource_path):
+    """
+    Return the hash under which the resource path is stored.
+    """
+    return hashlib.sha256(resource_path.encode()).hexdigest()
+
+
+def record_checkout(processor, request_data, checkout_data):
+    """
+    Record the HyperPay checkout created for a Saleor checkout, once per HyperPay checkout.
+
+    The merchant transaction id sent to HyperPay is the Saleor checkout id.
+    """
+    HyperPayTransaction.objects.get_or_create(
+        hyperpay_checkout_id=checkout_data['id'],
+        defaults={
+            'saleor_checkout_id': request_data['merchantTransactionId'],
+            'processor_name': processor.NAME,
+            'amount': request_data['amount'],
+            'currency': request_data['currency'],
+        },
+    )
+
+
+def record_verification(processor, resource_path, response_data, status):
+    """
+    Record the status of a payment returned by HyperPay.
+    """
+    match = RESOURCE_PATH_CHECKOUT_ID_REGEX.match(resource_path)
+    hyperpay_checkout_id = response_data.get('ndc') or (match and match.group('checkout_id'))
+    if not hyperpay_checkout_id:
+        return
+    changes = {
+        'payment_id': response_data.get('id', ''),
+        'resource_path_hash': get_resource_path_hash(resource_path),
+        'status': LEDGER_STATUSES[status],
+        'result_code': response_data.get('result', {}).get('code', ''),
+    }
+    transactions = HyperPayTransaction.objects.filter(hyperpay_checkout_id=hyperpay_checkout_id)
+    if status == PaymentStatus.PENDING:
+        # Notifications and status queries can arrive out of order, a final status is never reverted.
+        transactions = transactions.exclude(status__in=FINAL_STATUSES)
+    updated = transactions.update(
+        updated_at=timezone.now(),
+        **changes
+    )
+    if updated:
+        return
+
+    # Either the checkout already reached a final status or it was never recorded, e.g. it predates the ledger.
+    HyperPayTransaction.objects.get_or_create(
+        hyperpay_checkout_id=hyperpay_checkout_id,
+        defaults={
+            'saleor_checkout_id': response_data.get('merchantTransactionId', ''),
+            'processor_name': processor.NAME,
+            'amount': response_data.get('amount') or 0,
+            'currency': response_data.get('currency', ''),
+            **changes,
+        },
+    )
+
+
+def get_final_status(hyperpay_checkout_id):
+    """
+    Return the PaymentStatus recorded for the payment of the HyperPay checkout if it is final, or None.
+    """
+    status = HyperPayTransaction.objects.filter(
+        hyperpay_checkout_id=hyperpay_checkout_id,
+        status__in=FINAL_STATUSES,
+    ).values_list('status', flat=True).first()
+    return PAYMENT_STATUSES.get(status)
@@ -0,0 +1,158 @@
+"""
+Structured logging of the payment flow.
+
+``log_event`` logs a named event with keyword fields as a single JSON object.
+Nothing is built unless a handler emits the record: the level is checked
+first, the event may be sampled out, field values may be callables evaluated
+at that point, and the fields are only redacted, truncated and serialized when
+the message is formatted.
+
+Configured with ``HYPERPAY_LOGGING``::
+
+    HYPERPAY_LOGGING = {
+        # Share of the records of each event below WARNING that are logged.
+        'sample_rates': {'hyperpay.checkout.request': 0.1},
+        'max_field_length': 512,
+        'max_items': 20,
+    }
+"""
+import json
+import logging
+import random
+from itertools import islice
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from platform_plugin_hyperpay.serialization import dumps
+
+DEFAULT_LOGGING_CONFIG = {
+    'sample_rates': {},
+    'max_field_length': 256,
+    # Longer lists and dicts, such as the parameters of large carts, are truncated.
+    'max_items': 50,
+}
+
+REDACTED = '[redacted]'
+
+# Keys, or last segment of dotted keys such as ``customer.email``, holding personal data or secrets.
+REDACTED_KEYS = frozenset((
+    'email',
+    'givenname',
+    'surname',
+    'firstname',
+    'lastname',
+    'phone',
+    'mobile',
+    'ip',
+    'street1',
+    'street2',
+    'streetaddress1',
+    'streetaddress2',
+    'postcode',
+    'postalcode',
+    'holder',
+    'number',
+    'cvv',
+    'access_token',
+    'auth_token',
+    'token',
+    'authorization',
+))
+
+
+def get_logging_config():
+    """
+    Return the logging configuration, merging ``HYPERPAY_LOGGING`` over the defaults.
+    """
+    config = dict(DEFAULT_LOGGING_CONFIG)
+    config.update(getattr(settings, 'HYPERPAY_LOGGING', {}))
+    return config
+
+
+def is_redacted_key(key):
+    """
+    Return whether the values of the key must not be logged.
+    """
+    return str(key).rsplit('.', 1)[-1].lower() in REDACTED_KEYS
+
+
+def sanitize(value, max_length, max_items):
+    """
+    Return a copy of the value with the personal data redacted and the long strings and collections truncated.
+    """
+    if isinstance(value, dict):
+        sanitized = {
+            key: REDACTED if is_redacted_key(key) else sanitize(item, max_length, max_items)
+            for key, item in islice(value.items(), max_items)
+        }
+        if len(value) > max_items:
+            sanitized['...'] = '{} more'.format(len(value) - max_items)
+        return sanitized
+    if isinstance(value, (list, tuple)):
+        sanitized = [sanitize(item, max_length, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            sanitized.append('...{} more'.format(len(value) - max_items))
+        return sanitized
+    if isinstance(value, (str, bytes)) and len(value) > max_length:
+        return '{}...[{} chars]'.format(value[:max_length], len(value))
+    return value
+
+
+class LogJSONEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder logging the values that cannot be serialized as their repr.
+    """
+
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return repr(o)
+
+
+class StructuredMessage:
+    """
+    Log message built from the event fields when it is formatted.
+    """
+
+    __slots__ = ('event', 'fields', 'config')
+
+    def __init__(self, event, fields, config):
+        """
+        Keep the event, its fields and the logging configuration until the message is formatted.
+        """
+        self.event = event
+        self.fields = fields
+        self.config = config
+
+    def __str__(self):
+        """
+        Return the event and its evaluated, sanitized fields as a JSON object.
+        """
+        fields = {
+            key: value() if callable(value) else value
+            for key, value in self.fields.items()
+        }
+        fields = sanitize(fields, self.config['max_field_length'], self.config['max_items'])
+        message = {'event': self.event, **fields}
+        try:
+            return dumps(message).decode()
+        except TypeError:
+            return json.dumps(message, cls=LogJSONEncoder, separators=(',', ':'))
+
+
+def log_event(logger, level, event, **fields):
+    """
+    Log the event with its fields, unless the level is disabled or the event is sampled out.
+
+    Field values can be callables returning the value, to defer building it.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    config = get_logging_config()
+    if level < logging.WARNING:
+        sample_rate = config['sample_rates'].get(event, 1)
+        if sample_rate < 1 and random.random() >= sample_rate:
+            return
+    logger.log(level, '%s', StructuredMessage(event, fields, config), extra={'hyperpay_event': event})
@@ -0,0 +1,45 @@
+"""
+Complete the Saleor checkouts of verified HyperPay payments left in the outbox.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from platform_plugin_hyperpay.outbox import get_due_checkout_completions, process_checkout_completion
+
+
+def _process(pk):
+    """
+    Process an outbox entry and release the database connection of the thread.
+    """
+    try:
+        process_checkout_completion(pk)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    """
+    Process the outbox entries that are due, e.g. after a worker restart.
+
+    Meant to be run periodically. Entries that fail again are left pending for the next run.
+    """
+
+    help = 'Complete the Saleor checkouts of verified HyperPay payments left in the outbox.'
+
+    def add_arguments(self, parser):
+        """
+        Add the options limiting the number of entries and the concurrency.
+        """
+        parser.add_argument('--limit', type=int, default=None, help='Maximum number of entries to process.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Number of entries processed in parallel.')
+
+    def handle(self, *args, **options):
+        """
+        Process the due outbox entries in parallel.
+        """
+        pks = get_due_checkout_completions(options['limit'])
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(_process, pks))
+        self.stdout.write('Processed {} outbox entries.'.format(len(pks)))
@@ -0,0 +1,127 @@
+"""
+Export the HyperPay transactions of a date range to a CSV or Parquet file.
+"""
+import csv
+import os
+import tempfile
+from datetime import datetime, time, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from platform_plugin_hyperpay.exceptions import HyperPayException
+from platform_plugin_hyperpay.registry import get_processor, get_processors
+from platform_plugin_hyperpay.reports import REPORT_COLUMNS, iter_transaction_report
+
+FORMATS = ('csv', 'parquet')
+
+
+def parse_date(value):
+    """
+    Return the UTC midnight of a ``YYYY-MM-DD`` date.
+    """
+    return datetime.combine(datetime.strptime(value, '%Y-%m-%d').date(), time(), tzinfo=timezone.utc)
+
+
+def write_csv(output, windows):
+    """
+    Write the rows of every window to a CSV file, returning the number of rows.
+    """
+    count = 0
+    with open(output, 'w', newline='', encoding='utf-8') as report_file:
+        writer = csv.writer(report_file)
+        writer.writerow(REPORT_COLUMNS)
+        for rows in windows:
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def write_parquet(output, windows):
+    """
+    Write the rows of every window to a Parquet file, a row group per window, returning the number of rows.
+    """
+    try:
+        import pyarrow  # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        raise CommandError('Exporting to Parquet requires pyarrow, install platform-plugin-hyperpay[parquet].')
+
+    schema = pyarrow.schema([(column, pyarrow.string()) for column in REPORT_COLUMNS])
+    count = 0
+    with pyarrow.parquet.ParquetWriter(output, schema) as writer:
+        for rows in windows:
+            if not rows:
+                continue
+            columns = [[None if value is None else str(value) for value in column] for column in zip(*rows)]
+            writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+            count += len(rows)
+    return count
+
+
+class Command(BaseCommand):
+    """
+    Stream the transaction reports of the HyperPay entities into a file.
+
+    Example, exporting September 2026 for both entities::
+
+        ./manage.py lms export_hyperpay_transactions 2026-09-01 2026-10-01 september.parquet
+    """
+
+    help = 'Export the HyperPay transactions between two dates (UTC, end excluded) to a CSV or Parquet file.'
+
+    def add_arguments(self, parser):
+        """
+        Add the date range, output, format, processors and query options.
+        """
+        parser.add_argument('date_from', type=parse_date, help='First day of the report, YYYY-MM-DD.')
+        parser.add_argument('date_to', type=parse_date, help='Day after the last day of the report, YYYY-MM-DD.')
+        parser.add_argument('output', help='Path of the report file.')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=None,
+            help='Format of the report, guessed from the extension of the output by default.',
+        )
+        parser.add_argument(
+            '--processor',
+            action='append',
+            dest='processors',
+            help='Name of a processor whose entity is exported, all the configured ones by default.',
+        )
+        parser.add_argument('--window', type=int, default=60, help='Minutes covered by each query.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Number of windows queried in parallel.')
+
+    def handle(self, *args, **options):
+        """
+        Write the report of the date range to a temporary file, then move it to the output.
+        """
+        if options['date_from'] >= options['date_to']:
+            raise CommandError('date_from must be before date_to.')
+
+        output_format = options['format'] or ('parquet' if options['output'].endswith('.parquet') else 'csv')
+        try:
+            processors = [get_processor(name) for name in options['processors'] or []] or get_processors()
+        except HyperPayException as exc:
+            raise CommandError(str(exc))
+
+        windows = iter_transaction_report(
+            processors,
+            options['date_from'],
+            options['date_to'],
+            window=timedelta(minutes=options['window']),
+            concurrency=options['concurrency'],
+        )
+        write = write_parquet if output_format == 'parquet' else write_csv
+        # The report is written next to the output and only moved there once complete.
+        output_dir = os.path.dirname(os.path.abspath(options['output']))
+        file_descriptor, temporary_output = tempfile.mkstemp(dir=output_dir, prefix='.hyperpay-report-')
+        os.close(file_descriptor)
+        try:
+            count = write(temporary_output, windows)
+            os.replace(temporary_output, options['output'])
+        except HyperPayException as exc:
+            raise CommandError(str(exc))
+        finally:
+            if os.path.exists(temporary_output):
+                os.remove(temporary_output)
+        self.stdout.write('Exported {} transactions to {}.'.format(count, options['output']))
@@ -0,0 +1,221 @@
+"""
+Prometheus metrics of the payment flow.
+
+Each stage of the flow (Saleor calls, oppwa calls and the Saleor webhooks) is
+timed with ``track_stage``, which records its latency in a histogram and
+counts its outcome, labelled by processor and result: the category of the
+HyperPay result code for oppwa calls, ``ok``, ``cached`` or ``error``
+otherwise. Metrics are kept in memory by each process and rendered in the
+Prometheus text format by ``render_metrics``, so every worker has to be
+scraped. Scrapes are authorized by ``HYPERPAY_METRICS``, see ``get_metrics_config``.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+from platform_plugin_hyperpay.result_codes import classify_result_code
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_METRICS_CONFIG = {
+    # Token expected in the ``Authorization: Bearer <token>`` header of the scrapes.
+    'bearer_token': '',
+    # Client addresses allowed to scrape without a token.
+    'allowed_ips': (),
+    # Whether logged-in staff users can read the metrics.
+    'allow_staff': True,
+}
+
+
+def get_metrics_config():
+    """
+    Return the configuration of the metrics endpoint, merging ``HYPERPAY_METRICS`` over the defaults.
+
+    Without a token or allowed address, only staff users can read the metrics.
+    """
+    config = dict(DEFAULT_METRICS_CONFIG)
+    config.update(getattr(settings, 'HYPERPAY_METRICS', {}))
+    return config
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(name, _escape(value)) for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter, per combination of label values.
+    """
+
+    TYPE = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        """
+        Create a counter exposed as ``name``, with a value per combination of the ``labels``.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        """
+        Increase the value of the label values by ``amount``.
+        """
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values):
+        """
+        Return the value of the label values.
+        """
+        return self._values.get(label_values, 0)
+
+    def collect(self):
+        """
+        Yield a line of the Prometheus text format per combination of label values.
+        """
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in sorted(values):
+            yield '{}{} {}'.format(self.name, _format_labels(self.labels, label_values), _format_value(value))
+
+
+class Histogram:
+    """
+    Distribution of observed values in cumulative buckets, per combination of label values.
+    """
+
+    TYPE = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        """
+        Create a histogram exposed as ``name``, counting values up to each of the ``buckets`` upper bounds.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count of each bucket, +Inf included], sum
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """
+        Record a value for the label values.
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(label_values) or ([0] * (len(self.buckets) + 1), 0)
+            counts[index] += 1
+            self._values[label_values] = (counts, total + value)
+
+    def collect(self):
+        """
+        Yield the bucket, sum and count lines of the Prometheus text format per combination of label values.
+        """
+        with self._lock:
+            values = [(label_values, list(counts), total) for label_values, (counts, total) in self._values.items()]
+        for label_values, counts, total in sorted(values):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), counts):
+                cumulative += count
+                labels = _format_labels(self.labels, label_values, (('le', _format_value(bound)),))
+                yield '{}_bucket{} {}'.format(self.name, labels, cumulative)
+            labels = _format_labels(self.labels, label_values)
+            yield '{}_sum{} {}'.format(self.name, labels, _format_value(total))
+            yield '{}_count{} {}'.format(self.name, labels, cumulative)
+
+
+STAGE_DURATION = Histogram(
+    'hyperpay_stage_duration_seconds',
+    'Duration of each stage of the payment flow.',
+    labels=('stage', 'processor', 'result'),
+)
+STAGE_TOTAL = Counter(
+    'hyperpay_stage_total',
+    'Number of executions of each stage of the payment flow, by result.',
+    labels=('stage', 'processor', 'result'),
+)
+BACKGROUND_FAILURES = Counter(
+    'hyperpay_background_task_failures_total',
+    'Number of failed background tasks.',
+    labels=('task',),
+)
+
+REGISTRY = [STAGE_DURATION, STAGE_TOTAL, BACKGROUND_FAILURES]
+
+
+class StageTimer:
+    """
+    Context manager recording the duration and result of a stage.
+
+    The result can be set on the timer from within the block, it defaults to
+    ``ok``, or ``error`` if the stage raised.
+    """
+
+    __slots__ = ('stage', 'processor', 'result', 'start')
+
+    def __init__(self, stage, processor):
+        self.stage = stage
+        self.processor = processor
+        self.result = None
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self.start
+        result = self.result or ('error' if exc_type is not None else 'ok')
+        STAGE_DURATION.observe(duration, self.stage, self.processor, result)
+        STAGE_TOTAL.inc(self.stage, self.processor, result)
+        return False
+
+
+def track_stage(stage, processor=''):
+    """
+    Return a context manager timing a stage of the flow for the processor NAME.
+    """
+    return StageTimer(stage, processor)
+
+
+def get_result_code_class(response_data):
+    """
+    Return the category of the HyperPay result code of a response, used as the result of oppwa stages.
+    """
+    try:
+        return classify_result_code(response_data['result']['code']).category
+    except (KeyError, TypeError):
+        return 'invalid_response'
+
+
+def render_metrics():
+    """
+    Return every metric of this process in the Prometheus text format.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.append('# HELP {} {}'.format(metric.name, metric.documentation))
+        lines.append('# TYPE {} {}'.format(metric.name, metric.TYPE))
+        lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
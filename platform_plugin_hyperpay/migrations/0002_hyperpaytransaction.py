@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_plugin_hyperpay', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HyperPayTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('saleor_checkout_id', models.CharField(db_index=True, max_length=255)),
+                ('hyperpay_checkout_id', models.CharField(max_length=64, unique=True)),
+                ('payment_id', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('resource_path_hash', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('processor_name', models.CharField(max_length=64)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('currency', models.CharField(max_length=3)),
+                ('status', models.CharField(choices=[('created', 'Created'), ('pending', 'Pending'), ('success', 'Success'), ('failure', 'Failure')], default='created', max_length=16)),
+                ('result_code', models.CharField(blank=True, max_length=16)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='platform_pl_status_96f9d0_idx')],
+            },
+        ),
+    ]
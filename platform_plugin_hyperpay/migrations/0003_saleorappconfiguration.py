@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_plugin_hyperpay', '0002_hyperpaytransaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaleorAppConfiguration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payment_url', models.CharField(blank=True, max_length=255)),
+                ('payment_button_image', models.CharField(blank=True, max_length=255)),
+                ('hyper_pay_api_base_url', models.CharField(blank=True, max_length=255)),
+                ('access_token', models.CharField(blank=True, max_length=255)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
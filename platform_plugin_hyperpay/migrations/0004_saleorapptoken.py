@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_plugin_hyperpay', '0003_saleorappconfiguration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaleorAppToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(blank=True, max_length=255)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,3 +1,121 @@
 """
 Database models for platform_plugin_hyperpay.
 """
+import uuid
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class CheckoutCompletion(models.Model):
+    """
+    Outbox entry recording a verified HyperPay payment whose Saleor checkout must be completed.
+
+    .. pii: Stores the HyperPay payment status response, which includes the customer name, email and billing address.
+    .. pii_types: name, email_address, location
+    .. pii_retirement: retained
+    """
+
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, _('Pending')),
+        (PROCESSING, _('Processing')),
+        (COMPLETED, _('Completed')),
+        (FAILED, _('Failed')),
+    )
+
+    reference = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    checkout_id = models.CharField(max_length=255, unique=True)
+    processor_name = models.CharField(max_length=64)
+    payment_id = models.CharField(max_length=64, blank=True)
+    verification_response = models.JSONField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    order_id = models.CharField(max_length=255, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return '{} ({})'.format(self.checkout_id, self.status)
+
+
+class HyperPayTransaction(models.Model):
+    """
+    Local ledger of a HyperPay payment, from the checkout creation to its final status.
+
+    .. no_pii:
+    """
+
+    CREATED = 'created'
+    PENDING = 'pending'
+    SUCCESS = 'success'
+    FAILURE = 'failure'
+    STATUS_CHOICES = (
+        (CREATED, _('Created')),
+        (PENDING, _('Pending')),
+        (SUCCESS, _('Success')),
+        (FAILURE, _('Failure')),
+    )
+
+    saleor_checkout_id = models.CharField(max_length=255, db_index=True)
+    hyperpay_checkout_id = models.CharField(max_length=64, unique=True)
+    payment_id = models.CharField(max_length=64, blank=True, db_index=True)
+    resource_path_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    processor_name = models.CharField(max_length=64)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    currency = models.CharField(max_length=3)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=CREATED)
+    result_code = models.CharField(max_length=16, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return '{} ({})'.format(self.hyperpay_checkout_id, self.status)
+
+
+class SaleorAppConfiguration(models.Model):
+    """
+    Configuration of the Saleor app, a single record whose version increases on every change.
+
+    .. no_pii:
+    """
+
+    payment_url = models.CharField(max_length=255, blank=True)
+    payment_button_image = models.CharField(max_length=255, blank=True)
+    hyper_pay_api_base_url = models.CharField(max_length=255, blank=True)
+    access_token = models.CharField(max_length=255, blank=True)
+    version = models.PositiveIntegerField(default=0)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return 'Saleor app configuration v{}'.format(self.version)
+
+
+class SaleorAppToken(models.Model):
+    """
+    Token received from Saleor when the app was registered, a single record whose version increases on every change.
+
+    .. no_pii:
+    """
+
+    token = models.CharField(max_length=255, blank=True)
+    version = models.PositiveIntegerField(default=0)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return 'Saleor app token v{}'.format(self.version)
@@ -0,0 +1,88 @@
+"""
+HyperPay server-to-server notifications.
+
+HyperPay pushes the outcome of a payment to the notification URL configured in
+its dashboard, encrypted with AES-256-GCM using the secret of the merchant.
+The body is the hex encoded ciphertext, the initialization vector and the
+authentication tag are sent hex encoded in the ``X-Initialization-Vector`` and
+``X-Authentication-Tag`` headers. See
+https://hyperpay.docs.oppwa.com/tutorials/webhooks/decryption.
+
+Settling a payment through a notification stores the same verification result
+the status query would, so the response and pending pages, and the pending
+payment poller, pick it up from the cache without querying oppwa. Whether a
+payment was already settled is read from the transaction ledger.
+"""
+import logging
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from platform_plugin_hyperpay.exceptions import HyperPayException
+from platform_plugin_hyperpay.ledger import get_final_status
+from platform_plugin_hyperpay.outbox import enqueue_checkout_completion
+from platform_plugin_hyperpay.result_codes import PaymentStatus
+from platform_plugin_hyperpay.serialization import loads
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_NOTIFICATION_TYPE = 'PAYMENT'
+# Fields of the payment payload needed to settle it and complete its Saleor checkout.
+REQUIRED_PAYMENT_FIELDS = ('id', 'ndc', 'merchantTransactionId')
+
+
+def decrypt_notification(secret, body, initialization_vector, authentication_tag):
+    """
+    Decrypt and authenticate the notification, returning its JSON content.
+
+    Raises HyperPayException if the notification is malformed or was not encrypted with the secret.
+    """
+    try:
+        key = bytes.fromhex(secret)
+        ciphertext = bytes.fromhex(body.decode('ascii').strip())
+        iv = bytes.fromhex(initialization_vector)
+        tag = bytes.fromhex(authentication_tag)
+    except (AttributeError, TypeError, ValueError) as exc:
+        raise HyperPayException('Malformed HyperPay notification. {}'.format(exc))
+
+    try:
+        # AESGCM expects the authentication tag appended to the ciphertext.
+        plaintext = AESGCM(key).decrypt(iv, ciphertext + tag, None)
+    except (InvalidTag, ValueError):
+        raise HyperPayException('Could not authenticate the HyperPay notification.')
+
+    try:
+        return loads(plaintext)
+    except ValueError as exc:
+        raise HyperPayException('Malformed HyperPay notification. {}'.format(exc))
+
+
+def process_payment_notification(processor, payment_data):
+    """
+    Settle the payment described by a notification and return its status.
+
+    Notifications can be delivered more than once and out of order, once a
+    payment reached a final status later notifications are ignored.
+    """
+    if not isinstance(payment_data, dict):
+        raise HyperPayException('The HyperPay notification does not describe the payment of a checkout.')
+    missing = [field for field in REQUIRED_PAYMENT_FIELDS if not payment_data.get(field)]
+    if not isinstance(payment_data.get('result'), dict) or 'code' not in payment_data['result']:
+        missing.append('result.code')
+    if missing:
+        raise HyperPayException('The HyperPay notification is missing {}.'.format(', '.join(missing)))
+
+    checkout_id = payment_data['ndc']
+    settled_status = get_final_status(checkout_id)
+    if settled_status is not None:
+        logger.info('Ignoring the notification of payment %s, already settled as %s.',
+                    payment_data['id'], settled_status.name)
+        return settled_status
+
+    resource_path = processor.get_payment_resource_path(checkout_id)
+
+    response_data, status = processor._get_payment_status(True, 200, payment_data)  # pylint: disable=protected-access
+    processor.store_verification(resource_path, response_data, status)
+    if status == PaymentStatus.SUCCESS:
+        enqueue_checkout_completion(processor, response_data)
+    return status
@@ -0,0 +1,150 @@
+"""
+Durable outbox for completing Saleor checkouts after a successful payment.
+
+The response view only records the verified payment and redirects the
+customer to an order status page. Entries are processed on the background
+pool, retried with exponential backoff, and picked up again by the
+``drain_hyperpay_outbox`` management command if a worker died meanwhile.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from platform_plugin_hyperpay.background import run_in_background
+from platform_plugin_hyperpay.models import CheckoutCompletion
+from platform_plugin_hyperpay.registry import get_processor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTBOX_CONFIG = {
+    'max_attempts': 5,
+    'base_retry_delay': 5,
+    'max_retry_delay': 300,
+    # Entries left in processing for longer than this are considered abandoned.
+    'processing_timeout': 300,
+}
+
+
+def get_outbox_config():
+    """
+    Return the outbox configuration, merging ``HYPERPAY_OUTBOX`` over the defaults.
+    """
+    config = dict(DEFAULT_OUTBOX_CONFIG)
+    config.update(getattr(settings, 'HYPERPAY_OUTBOX', {}))
+    return config
+
+
+def enqueue_checkout_completion(processor, verification_response):
+    """
+    Record the verified payment and schedule the completion of its Saleor checkout.
+
+    Recording the same payment twice returns the existing entry. A failed entry
+    is reset to pending when another payment of the same checkout succeeds.
+    """
+    payment_id = verification_response.get('id', '')
+    values = {
+        'processor_name': processor.NAME,
+        'payment_id': payment_id,
+        'verification_response': verification_response,
+        'next_attempt_at': timezone.now(),
+    }
+    completion, created = CheckoutCompletion.objects.get_or_create(
+        checkout_id=verification_response['merchantTransactionId'],
+        defaults=values,
+    )
+    if not created:
+        failed = CheckoutCompletion.objects.filter(pk=completion.pk, status=CheckoutCompletion.FAILED)
+        reset = failed.exclude(payment_id=payment_id).update(
+            status=CheckoutCompletion.PENDING,
+            attempts=0,
+            last_error='',
+            modified=timezone.now(),
+            **values,
+        )
+        if not reset:
+            return completion
+        logger.info('Retrying the failed completion of checkout %s with payment %s.',
+                    completion.checkout_id, payment_id)
+        completion.refresh_from_db()
+    transaction.on_commit(lambda: schedule_checkout_completion(completion.pk))
+    return completion
+
+
+def schedule_checkout_completion(pk, delay=0):
+    """
+    Process the entry on the background pool, after ``delay`` seconds.
+    """
+    if delay:
+        timer = threading.Timer(delay, schedule_checkout_completion, args=(pk,))
+        timer.daemon = True
+        timer.start()
+        return
+    run_in_background(process_checkout_completion, pk, task_name='complete_saleor_checkout')
+
+
+def _get_due_filter(now):
+    """
+    Return the filter matching the entries that can be processed now.
+    """
+    abandoned_before = now - timedelta(seconds=get_outbox_config()['processing_timeout'])
+    return (
+        Q(status=CheckoutCompletion.PENDING, next_attempt_at__lte=now) |
+        Q(status=CheckoutCompletion.PROCESSING, modified__lt=abandoned_before)
+    )
+
+
+def _claim(pk, now):
+    """
+    Mark the entry as processing if it is due, returning whether this worker owns it.
+    """
+    due = CheckoutCompletion.objects.filter(_get_due_filter(now), pk=pk)
+    return due.update(status=CheckoutCompletion.PROCESSING, modified=now) == 1
+
+
+def process_checkout_completion(pk):
+    """
+    Complete the Saleor checkout of the entry, scheduling a retry on failure.
+    """
+    now = timezone.now()
+    if not _claim(pk, now):
+        return
+
+    completion = CheckoutCompletion.objects.get(pk=pk)
+    completion.attempts += 1
+    try:
+        order = get_processor(completion.processor_name).complete_saleor_checkout(completion.verification_response)
+    except Exception as exc:  # pylint: disable=broad-except
+        config = get_outbox_config()
+        completion.last_error = repr(exc)
+        if completion.attempts >= config['max_attempts']:
+            logger.exception('Giving up completing checkout %s after %s attempts.',
+                             completion.checkout_id, completion.attempts)
+            completion.status = CheckoutCompletion.FAILED
+            completion.save()
+            return
+        delay = min(config['base_retry_delay'] * 2 ** (completion.attempts - 1), config['max_retry_delay'])
+        logger.warning('Completing checkout %s failed (%r), retrying in %s seconds.',
+                       completion.checkout_id, exc, delay)
+        completion.status = CheckoutCompletion.PENDING
+        completion.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        completion.save()
+        schedule_checkout_completion(pk, delay=delay)
+        return
+
+    completion.status = CheckoutCompletion.COMPLETED
+    completion.order_id = order.get('id') or ''
+    completion.last_error = ''
+    completion.save()
+
+
+def get_due_checkout_completions(limit=None):
+    """
+    Return the primary keys of the entries that are due, oldest first.
+    """
+    due = CheckoutCompletion.objects.filter(_get_due_filter(timezone.now())).order_by('next_attempt_at')
+    return list(due.values_list('pk', flat=True)[:limit])
@@ -0,0 +1,246 @@
+"""
+Server-side polling of pending HyperPay payments.
+
+Instead of querying oppwa on every refresh of the pending page, the resource
+paths of pending payments are tracked by a background thread in each worker.
+The thread checks them in batches, backing off exponentially per payment, and
+stores the outcome in the verification cache of the processor, where any
+worker can read it.
+
+While a payment is pending, its shared state is refreshed on every check and
+expires shortly after the next one is due. If the worker tracking it dies, the
+state expires and the other workers check the payment with oppwa again.
+
+The poller always queries oppwa, bypassing the pending results of the
+verification cache. Payments still pending after ``max_age`` are marked as
+expired for ``expired_ttl`` seconds, so refreshes of their page stop tracking
+them again and query oppwa directly.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from platform_plugin_hyperpay.result_codes import PaymentStatus
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLLER_CONFIG = {
+    'tick': 1,
+    'batch_size': 20,
+    'max_concurrency': 4,
+    'base_interval': 5,
+    'max_interval': 300,
+    'max_age': 60 * 60,
+    'expired_ttl': 60 * 60 * 24,
+}
+
+PENDING_PAYMENT_CACHE_KEY = 'hyperpay:pending-payment:{}:{}'
+
+
+def get_poller_config():
+    """
+    Return the poller configuration, merging ``HYPERPAY_PENDING_POLLER`` over the defaults.
+    """
+    config = dict(DEFAULT_POLLER_CONFIG)
+    config.update(getattr(settings, 'HYPERPAY_PENDING_POLLER', {}))
+    return config
+
+
+def get_pending_payment_cache_key(processor_name, resource_path):
+    """
+    Return the cache key holding the polling state of a payment.
+    """
+    return PENDING_PAYMENT_CACHE_KEY.format(processor_name, hashlib.sha256(resource_path.encode()).hexdigest())
+
+
+class PendingPayment:
+    """
+    Polling state of a single pending payment.
+    """
+
+    __slots__ = ('processor', 'resource_path', 'response_data', 'attempts', 'next_check', 'started_at')
+
+    def __init__(self, processor, resource_path, response_data, now, first_check):
+        self.processor = processor
+        self.resource_path = resource_path
+        self.response_data = response_data
+        self.attempts = 0
+        self.next_check = first_check
+        self.started_at = now
+
+
+class PendingPaymentPoller:
+    """
+    Poll HyperPay for the final status of the payments tracked by this process.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_poller_config()
+        self._payments = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._executor = None
+
+    def track(self, processor, resource_path, response_data=None):
+        """
+        Start polling the payment, publishing it as pending until a final status is known.
+
+        Payments whose polling expired are not tracked again.
+        """
+        cache_key = get_pending_payment_cache_key(processor.NAME, resource_path)
+        state = cache.get(cache_key)
+        if state is not None and state.get('expired'):
+            return
+        self._publish_pending(cache_key, response_data, self.config['base_interval'])
+        now = time.monotonic()
+        with self._lock:
+            if cache_key not in self._payments:
+                self._payments[cache_key] = PendingPayment(
+                    processor,
+                    resource_path,
+                    response_data,
+                    now,
+                    now + self.config['base_interval'],
+                )
+        self._ensure_running()
+
+    @staticmethod
+    def _publish_pending(cache_key, response_data, interval):
+        """
+        Publish the payment as pending until twice the interval to its next check has passed.
+        """
+        cache.set(
+            cache_key,
+            {'status': PaymentStatus.PENDING.name, 'response': response_data},
+            timeout=2 * interval,
+        )
+
+    @staticmethod
+    def get_result(processor, resource_path):
+        """
+        Return the last known ``(response_data, status)`` of the payment, or None if it is not tracked.
+        """
+        cached = processor.get_cached_verification(resource_path)
+        if cached is not None and cached[1] != PaymentStatus.PENDING:
+            return cached
+        state = cache.get(get_pending_payment_cache_key(processor.NAME, resource_path))
+        if state is None or state.get('expired'):
+            return None
+        return state['response'], PaymentStatus[state['status']]
+
+    def _ensure_running(self):
+        """
+        Start the polling thread, again if the process was forked since.
+        """
+        pid = os.getpid()
+        if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return
+            self._pid = pid
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config['max_concurrency'],
+                thread_name_prefix='hyperpay-poller',
+            )
+            self._thread = threading.Thread(target=self._run, name='hyperpay-pending-poller', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """
+        Poll the due payments until the process exits.
+        """
+        while True:
+            self._wakeup.wait(self.config['tick'])
+            try:
+                self.poll_once()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Unexpected error while polling pending HyperPay payments.')
+
+    def _get_due_payments(self, now):
+        """
+        Return the next batch of payments whose check is due, dropping the expired ones.
+        """
+        due = []
+        with self._lock:
+            for cache_key, payment in list(self._payments.items()):
+                if now - payment.started_at > self.config['max_age']:
+                    logger.warning('Stopped polling HyperPay payment %s after %s attempts.',
+                                   payment.resource_path, payment.attempts)
+                    del self._payments[cache_key]
+                    cache.set(
+                        cache_key,
+                        {'status': PaymentStatus.PENDING.name, 'response': payment.response_data, 'expired': True},
+                        timeout=self.config['expired_ttl'],
+                    )
+                elif payment.next_check <= now and len(due) < self.config['batch_size']:
+                    due.append((cache_key, payment))
+        return due
+
+    def _check(self, payment):
+        """
+        Query the status of the payment, skipping the pending result cached by the last check.
+        """
+        try:
+            return payment.processor._verify_status(  # pylint: disable=protected-access
+                payment.resource_path,
+                use_cache=False,
+            )
+        finally:
+            close_old_connections()
+
+    def poll_once(self):
+        """
+        Check a batch of due payments and record their outcome.
+        """
+        now = time.monotonic()
+        due = self._get_due_payments(now)
+        if not due:
+            return
+        futures = [(cache_key, payment, self._executor.submit(self._check, payment)) for cache_key, payment in due]
+        for cache_key, payment, future in futures:
+            try:
+                response_data, status = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning('Error polling HyperPay payment %s: %r', payment.resource_path, exc)
+                response_data, status = None, PaymentStatus.PENDING
+
+            if status == PaymentStatus.PENDING:
+                payment.attempts += 1
+                interval = min(self.config['base_interval'] * 2 ** payment.attempts, self.config['max_interval'])
+                payment.next_check = time.monotonic() + interval
+                if response_data is not None:
+                    payment.response_data = response_data
+                self._publish_pending(cache_key, payment.response_data, interval)
+                continue
+
+            # The final result was stored in the verification cache by the processor.
+            cache.delete(cache_key)
+            with self._lock:
+                self._payments.pop(cache_key, None)
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def get_pending_payment_poller():
+    """
+    Return the poller of the current process.
+    """
+    global _poller  # pylint: disable=global-statement
+
+    if _poller is None:
+        with _poller_lock:
+            if _poller is None:
+                _poller = PendingPaymentPoller()
+    return _poller
@@ -1,11 +1,21 @@
 """eox_nelp course_api  urls
 """
+from django.conf import settings
 from django.urls import include, path
 from platform_plugin_hyperpay.payment import views
 app_name = 'platform_plugin_hyperpay'  # pylint: disable=invalid-name
 
+if getattr(settings, 'HYPERPAY_ASYNC_VIEWS', False):
+    payment_page_view = views.AsyncHyperPayPaymentPageView
+    response_view = views.AsyncHyperPayResponseView
+else:
+    payment_page_view = views.HyperPayPaymentPageView
+    response_view = views.HyperPayResponseView
+
 urlpatterns = [
-    path('pay/', views.HyperPayPaymentPageView.as_view(), name='pay-page'),
-    path('submit/', views.HyperPayResponseView.as_view(), name='submit-page'),
-    path('status/(?P<encrypted_resource_path>.+)/$', views.HyperPayResponseView.as_view(), name='status-check'),
+    path('pay/', payment_page_view.as_view(), name='pay-page'),
+    path('submit/', response_view.as_view(), name='submit-page'),
+    path('status/(?P<encrypted_resource_path>.+)/$', response_view.as_view(), name='status-check'),
+    path('order-status/<uuid:reference>/', views.CheckoutCompletionStatusView.as_view(), name='order-status'),
+    path('notifications/<str:processor_name>/', views.HyperPayNotificationView.as_view(), name='notifications'),
 ]
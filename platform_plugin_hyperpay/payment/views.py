@@ -1,25 +1,39 @@
 
 import logging
-import re
 from django.views.generic import View
 import uuid
-import requests
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 import base64
+from functools import lru_cache
 
 from django.conf import settings
+from asgiref.sync import sync_to_async
+from platform_plugin_hyperpay.logs import log_event
+from platform_plugin_hyperpay.models import CheckoutCompletion
+from platform_plugin_hyperpay.notifications import (
+    PAYMENT_NOTIFICATION_TYPE,
+    decrypt_notification,
+    process_payment_notification,
+)
+from platform_plugin_hyperpay.outbox import enqueue_checkout_completion
+from platform_plugin_hyperpay.payment.poller import get_pending_payment_poller
 from platform_plugin_hyperpay.processors import HyperPay, HyperPayMada, PaymentStatus
+from platform_plugin_hyperpay.registry import get_async_processor, get_processor
 from platform_plugin_hyperpay.exceptions import HyperPayException
-from django.shortcuts import redirect, render
-from enum import Enum
+from django.shortcuts import get_object_or_404, redirect, render
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.fernet import Fernet
 from django.urls import reverse
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
 logger = logging.getLogger(__name__)
 
 
+KEY_CACHE_SIZE = 16
+
+
 def generate_key(encryption_key, salt):
     """
     Generate the encryption key.
@@ -34,11 +48,26 @@ def generate_key(encryption_key, salt):
     return base64.urlsafe_b64encode(kdf.derive(encryption_key.encode()))
 
 
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def get_fernet(encryption_key, salt):
+    """
+    Return a Fernet instance for the given key and salt, deriving the key only once.
+    """
+    return Fernet(generate_key(encryption_key, salt))
+
+
+def clear_key_cache():
+    """
+    Drop every derived key, e.g. after the encryption key or salt were rotated.
+    """
+    get_fernet.cache_clear()
+
+
 def encrypt_string(message, encryption_key, salt):
     """
     Encrypt the string.
     """
-    fernet = Fernet(generate_key(encryption_key, salt))
+    fernet = get_fernet(encryption_key, salt)
     return fernet.encrypt(message.encode()).decode('utf-8')
 
 
@@ -46,7 +75,7 @@ def decrypt_string(encrypted_message, encryption_key, salt):
     """
     Decrypt the encrypted string.
     """
-    fernet = Fernet(generate_key(encryption_key, salt))
+    fernet = get_fernet(encryption_key, salt)
     return fernet.decrypt(encrypted_message.encode()).decode('utf-8')
 
 
@@ -58,7 +87,7 @@ class HyperPayPaymentPageView(View):
 
     @property
     def payment_processor(self):
-        return HyperPay()
+        return get_processor(HyperPay.NAME)
 
     def get(self, request):
         """
@@ -77,7 +106,7 @@ class HyperMadaPayPaymentPageView(View):
 
     @property
     def payment_processor(self):
-        return HyperPayMada()
+        return get_processor(HyperPayMada.NAME)
 
 
 
@@ -89,6 +118,7 @@ class HyperPayResponseView(View):
     """
     PENDING_STATUS_URL_NAME = 'hyperpay-payment:status-check'
     PENDING_STATUS_PAGE_TITLE = 'HyperPay - Credit card - pending'
+    ORDER_STATUS_URL_NAME = 'hyperpay-payment:order-status'
 
     # @method_decorator(transaction.non_atomic_requests)
     # @method_decorator(csrf_exempt)
@@ -97,7 +127,7 @@ class HyperPayResponseView(View):
 
     @property
     def payment_processor(self):
-        return HyperPay()
+        return get_processor(HyperPay.NAME)
 
 
     def _handle_pending_status(self, request, encrypted_resource_path, resource_path):
@@ -148,12 +178,36 @@ class HyperPayResponseView(View):
             del request.session['hyperpay_dont_check_status']
         return check_status
 
+    @property
+    def polling_processor(self):
+        """
+        Return the synchronous processor used by the pending payment poller.
+        """
+        return self.payment_processor
+
+    def _verify_payment(self, resource_path, encrypted_resource_path):
+        """
+        Return the verification response and status of the payment.
+
+        Refreshes of the pending page read the result published by the poller and
+        only query HyperPay when the payment is not being polled by any worker.
+        """
+        poller = get_pending_payment_poller()
+        if encrypted_resource_path is not None:
+            result = poller.get_result(self.polling_processor, resource_path)
+            if result is not None:
+                return result
+
+        verification_response, status = self.payment_processor._verify_status(resource_path)
+        if status == PaymentStatus.PENDING:
+            poller.track(self.polling_processor, resource_path, verification_response)
+        return verification_response, status
 
     def get(self, request, encrypted_resource_path=None):
         """
         Handle the response from HyperPay and redirect to the appropriate page based on the status.
         """
-        logger.info('Received a response from HyperPay: %s', request.GET)
+        log_event(logger, logging.INFO, 'hyperpay.response.received', query=request.GET.dict)
         resource_path = self._get_resource_path(request, encrypted_resource_path)
         if resource_path is None:
             raise HyperPayException('Received an invalid response from HyperPay')
@@ -164,7 +218,7 @@ class HyperPayResponseView(View):
         try:
             status = PaymentStatus.PENDING
             if check_status:
-                verification_response, status = self.payment_processor._verify_status(resource_path)
+                verification_response, status = self._verify_payment(resource_path, encrypted_resource_path)
                 if (verification_response and isinstance(verification_response, dict) and
                         verification_response.get('merchantTransactionId')):
                     transaction_id = verification_response['merchantTransactionId']
@@ -176,17 +230,187 @@ class HyperPayResponseView(View):
 
             transaction_id = verification_response['id']
         finally:
-            logger.info('Transaction ID: %s received \n Verification_response:\n %s \n', transaction_id, verification_response)
+            log_event(
+                logger,
+                logging.INFO,
+                'hyperpay.payment.verified',
+                transaction_id=transaction_id,
+                response=verification_response,
+            )
+
+        completion = enqueue_checkout_completion(self.payment_processor, verification_response)
+        return redirect(reverse(self.ORDER_STATUS_URL_NAME, kwargs={'reference': completion.reference}))
 
+
+class CheckoutCompletionStatusView(View):
+    """
+    Show the progress of the order creation and redirect to the order once Saleor completed the checkout.
+    """
+    template_name = 'payment/order_status.html'
+    PAGE_TITLE = 'HyperPay - Order in progress'
+    REFRESH_INTERVAL = 3
+
+    def get(self, request, reference):
+        """
+        Handles the GET request.
+        """
+        completion = get_object_or_404(CheckoutCompletion, reference=reference)
+        if completion.status == CheckoutCompletion.COMPLETED:
+            return redirect(f"{settings.SALEOR_STOREFRONT_HOST}/order?order={completion.order_id}")
+
+        context = {
+            'title': self.PAGE_TITLE,
+            'interval': self.REFRESH_INTERVAL,
+            'failed': completion.status == CheckoutCompletion.FAILED,
+            'reference': completion.reference,
+        }
+        return render(request, self.template_name, context)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class HyperPayNotificationView(View):
+    """
+    Receive the encrypted server-to-server notifications sent by HyperPay.
+
+    HyperPay retries a notification until it is answered with a 200, which is
+    also returned for notifications that are authentic but cannot be used.
+    """
+    http_method_names = ['post']
+
+    def post(self, request, processor_name):
+        """
+        Handles the POST request.
+        """
         try:
-            if verification_response:
-                order_data = self.payment_processor.complete_saleor_checkout(verification_response)
-        except Exception as exc:  # pylint:disable=broad-except
-            logger.exception(
-                'Attempts to handle payment for basket [%d] failed due to [%s].',
-                transaction_id,
-                exc.__class__.__name__
+            processor = get_processor(processor_name)
+        except HyperPayException:
+            raise Http404
+        if not processor.webhook_secret:
+            raise Http404
+
+        try:
+            notification = decrypt_notification(
+                processor.webhook_secret,
+                request.body,
+                request.headers.get('X-Initialization-Vector'),
+                request.headers.get('X-Authentication-Tag'),
             )
-        order_id = order_data.get('id')
-        order_url = f"{settings.SALEOR_STOREFRONT_HOST}/order?order={order_id}"
-        return redirect(order_url)
+        except HyperPayException as exc:
+            logger.warning('Rejected a HyperPay notification for %s: %s', processor_name, exc)
+            return HttpResponse(status=400)
+
+        if notification.get('type') != PAYMENT_NOTIFICATION_TYPE:
+            logger.info('Ignoring a HyperPay %s notification.', notification.get('type'))
+            return HttpResponse()
+
+        try:
+            status = process_payment_notification(processor, notification.get('payload') or {})
+        except HyperPayException as exc:
+            logger.warning('Could not process a HyperPay notification for %s: %s', processor_name, exc)
+            return HttpResponse()
+        logger.info('Processed a HyperPay notification for %s with status %s.', processor_name, status.name)
+        return HttpResponse()
+
+
+class AsyncHyperPayPaymentPageView(HyperPayPaymentPageView):
+    """
+    Async version of HyperPayPaymentPageView to be served under ASGI.
+    """
+
+    @property
+    def payment_processor(self):
+        return get_async_processor(HyperPay.NAME)
+
+    async def get(self, request):
+        """
+        Handles the GET request.
+        """
+        context = await self.payment_processor.get_transaction_parameters(request=request)
+        context["nonce_id"] = str(uuid.uuid4())
+        return await sync_to_async(render)(request, self.template_name, context)
+
+
+class AsyncHyperMadaPayPaymentPageView(AsyncHyperPayPaymentPageView):
+    """
+    Async version of HyperMadaPayPaymentPageView to be served under ASGI.
+    """
+
+    @property
+    def payment_processor(self):
+        return get_async_processor(HyperPayMada.NAME)
+
+
+class AsyncHyperPayResponseView(HyperPayResponseView):
+    """
+    Async version of HyperPayResponseView to be served under ASGI.
+
+    The session may be backed by the database, so every access to it runs in
+    the sync thread.
+    """
+
+    @property
+    def payment_processor(self):
+        return get_async_processor(HyperPay.NAME)
+
+    @property
+    def polling_processor(self):
+        """
+        Return the synchronous processor used by the pending payment poller.
+        """
+        return get_processor(HyperPay.NAME)
+
+    async def _verify_payment(self, resource_path, encrypted_resource_path):
+        """
+        Return the verification response and status of the payment.
+        """
+        poller = get_pending_payment_poller()
+        if encrypted_resource_path is not None:
+            result = await sync_to_async(poller.get_result)(self.polling_processor, resource_path)
+            if result is not None:
+                return result
+
+        verification_response, status = await self.payment_processor._verify_status(resource_path)
+        if status == PaymentStatus.PENDING:
+            await sync_to_async(poller.track)(self.polling_processor, resource_path, verification_response)
+        return verification_response, status
+
+    async def get(self, request, encrypted_resource_path=None):
+        """
+        Handle the response from HyperPay and redirect to the appropriate page based on the status.
+        """
+        log_event(logger, logging.INFO, 'hyperpay.response.received', query=request.GET.dict)
+        resource_path = self._get_resource_path(request, encrypted_resource_path)
+        if resource_path is None:
+            raise HyperPayException('Received an invalid response from HyperPay')
+        check_status = await sync_to_async(self._get_check_status)(request)
+        verification_response = ''
+        transaction_id = 'Unknown'
+
+        try:
+            status = PaymentStatus.PENDING
+            if check_status:
+                verification_response, status = await self._verify_payment(resource_path, encrypted_resource_path)
+                if (verification_response and isinstance(verification_response, dict) and
+                        verification_response.get('merchantTransactionId')):
+                    transaction_id = verification_response['merchantTransactionId']
+            if status == PaymentStatus.FAILURE:
+                raise HyperPayException('Payment failed')
+            if status == PaymentStatus.PENDING:
+                return await sync_to_async(self._handle_pending_status)(
+                    request,
+                    encrypted_resource_path,
+                    resource_path,
+                )
+
+            transaction_id = verification_response['id']
+        finally:
+            log_event(
+                logger,
+                logging.INFO,
+                'hyperpay.payment.verified',
+                transaction_id=transaction_id,
+                response=verification_response,
+            )
+
+        completion = await sync_to_async(enqueue_checkout_completion)(self.payment_processor, verification_response)
+        return redirect(reverse(self.ORDER_STATUS_URL_NAME, kwargs={'reference': completion.reference}))
@@ -1,29 +1,51 @@
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-from platform_plugin_hyperpay.exceptions import HyperPayException
+from django.core.cache import cache
+from platform_plugin_hyperpay.background import run_in_background
+from platform_plugin_hyperpay.basket import build_basket_data
+from platform_plugin_hyperpay.exceptions import HyperPayException, SaleorCheckoutFinalizationError
+from platform_plugin_hyperpay.ledger import record_checkout, record_verification
+from platform_plugin_hyperpay.logs import log_event
+from platform_plugin_hyperpay.metrics import get_result_code_class, track_stage
+from platform_plugin_hyperpay.result_codes import PaymentStatus, classify_result_code
+from platform_plugin_hyperpay.saleor_app.client.graphql import execute
+from platform_plugin_hyperpay.serialization import dumps, loads
+from platform_plugin_hyperpay.saleor_app.client.mutations import FINALIZE_CHECKOUT, INITIALIZE_TRANSACTION
+from platform_plugin_hyperpay.saleor_app.client.queries import GET_CHECKOUT
 from platform_plugin_hyperpay.saleor_app.manifest import HYPERPAY_APP_ID
 from urllib.parse import urlencode
 from django.urls import reverse
-from enum import Enum
-from platform_plugin_saleor.services.helpers import get_saleor_api_client_instance
-import requests
+from platform_plugin_hyperpay.transport import http_get, http_post
+import hashlib
+from types import MappingProxyType
 import logging
-import re
-import json
 
 logger = logging.getLogger(__name__)
 
+VERIFICATION_CACHE_KEY = 'hyperpay:verification:{}:{}'
+CHECKOUT_REUSE_CACHE_KEY = 'hyperpay:checkout:{}'
+SALEOR_CHECKOUT_CACHE_KEY = 'hyperpay:saleor-checkout:{}'
 
-def format_price(price):
+
+def get_saleor_checkout_cache_key(checkout_id):
+    """
+    Return the cache key of the Saleor checkout snapshot.
+    """
+    return SALEOR_CHECKOUT_CACHE_KEY.format(hashlib.sha256(checkout_id.encode()).hexdigest())
+
+
+def get_processor_configuration(name):
     """
-    Return the price in the expected format.
+    Return an immutable snapshot of the ``HYPERPAY_CONFIG`` entry of a processor.
     """
-    return '{:0.2f}'.format(price)
+    return MappingProxyType(dict(settings.HYPERPAY_CONFIG[name]))
 
-class PaymentStatus(Enum):
-    SUCCESS = 0
-    PENDING = 1
-    FAILURE = 2
+
+def invalidate_saleor_checkout_data(checkout_id):
+    """
+    Drop the cached snapshot of the Saleor checkout.
+    """
+    cache.delete(get_saleor_checkout_cache_key(checkout_id))
 
 class HyperPay:
     """
@@ -45,24 +67,34 @@ class HyperPay:
     BRANDS = "VISA MASTER"
     CHECKOUT_TEXT = _("Checkout with credit card")
 
-    SUCCESS_CODES_REGEX = re.compile(r'^(000\.000\.|000\.100\.1|000\.[36])')
-    SUCCESS_MANUAL_REVIEW_CODES_REGEX = re.compile(r'^(000\.400\.0[^3]|000\.400\.[0-1]{2}0)')
-    PENDING_CHANGEABLE_SOON_CODES_REGEX = re.compile(r'^(000\.200)')
-    PENDING_NOT_CHANGEABLE_SOON_CODES_REGEX = re.compile(r'^(800\.400\.5|100\.400\.500)')
     PENDING_STATUS_URL_NAME = 'hyperpay:status-check'
     PENDING_STATUS_PAGE_TITLE = 'HyperPay - Credit card - pending'
 
 
-    def __init__(self):
-        self.access_token = settings.HYPERPAY_CONFIG[self.NAME]['access_token']
-        self.entity_id = settings.HYPERPAY_CONFIG[self.NAME]['entity_id']
-        self.return_url = settings.HYPERPAY_CONFIG[self.NAME]['return_url']
-        self.currency = settings.HYPERPAY_CONFIG[self.NAME]['currency']
-        self.hyper_pay_api_base_url = settings.HYPERPAY_CONFIG[self.NAME].get('hyper_pay_api_base_url', 'https://test.oppwa.com')
-        self.test_mode = settings.HYPERPAY_CONFIG[self.NAME].get('test_mode')
-        self.encryption_key = settings.HYPERPAY_CONFIG[self.NAME].get('encryption_key', settings.SECRET_KEY)
-        self.salt = settings.HYPERPAY_CONFIG[self.NAME]['salt']
+    def __init__(self, configuration=None):
+        """
+        Initialize the processor from its configuration, read from ``HYPERPAY_CONFIG`` when not given.
+        """
+        if configuration is None:
+            configuration = get_processor_configuration(self.NAME)
+        self.configuration = configuration
+        self.access_token = configuration['access_token']
+        self.entity_id = configuration['entity_id']
+        self.return_url = configuration['return_url']
+        self.currency = configuration['currency']
+        self.hyper_pay_api_base_url = configuration.get('hyper_pay_api_base_url', 'https://test.oppwa.com')
+        self.test_mode = configuration.get('test_mode')
+        self.encryption_key = configuration.get('encryption_key', settings.SECRET_KEY)
+        self.salt = configuration['salt']
         self.pending_status_polling_interval = 30
+        self.background_transaction_initialize = configuration.get('background_transaction_initialize', False)
+        self.verification_cache_timeout = configuration.get('verification_cache_timeout', 60 * 60 * 24)
+        self.pending_verification_cache_timeout = configuration.get('pending_verification_cache_timeout', 5)
+        # HyperPay checkouts expire after 30 minutes, leave the customer time to fill the payment form.
+        self.checkout_reuse_timeout = configuration.get('checkout_reuse_timeout', 20 * 60)
+        self.saleor_checkout_cache_timeout = configuration.get('saleor_checkout_cache_timeout', 5 * 60)
+        # Hex encoded key of the server-to-server notifications, which are disabled without it.
+        self.webhook_secret = configuration.get('webhook_secret')
 
     @property
     def authentication_headers(self):
@@ -77,65 +109,63 @@ class HyperPay:
         """
         Prepare the basket data and return the basket data.
         """
-        def get_cart_field(index, name):
-            """
-            Return the cart field name.
-            """
-            return 'cart.items[{}].{}'.format(index, name)
         checkout_id = request.GET['checkoutId']
-        checkout_data = self.get_saleor_checkout_data(checkout_id)["checkout"]
+        return self._build_basket_data(checkout_id, self.get_saleor_checkout_data(checkout_id))
+
+    def _build_basket_data(self, checkout_id, saleor_checkout_data):
+        """
+        Build the basket data from the checkout data returned by Saleor.
+        """
+        checkout_data = saleor_checkout_data["checkout"]
         if checkout_data is None:
             raise HyperPayException('Error getting checkout data from Saleor.')
 
-        basket_data = {
-            'amount': format_price(float(checkout_data["totalPrice"]["gross"]["amount"])),
-            'currency': self.currency,#checkout_data["totalPrice"]["currency"], only sar works
-            'merchantTransactionId': checkout_id,
-
-        }
-        for index, line in enumerate(checkout_data['lines']):
-            cart_data = {
-                get_cart_field(index, 'name'): line.get('variant',{}).get('name'),
-                get_cart_field(index, 'quantity'): line.get('quantity'),
-                get_cart_field(index, 'type'): self.CART_ITEM_TYPE_DIGITAL,
-                get_cart_field(index, 'sku'): line.get('variant',{}).get('sku'),
-                get_cart_field(index, 'price'): format_price(float(line.get('unitPrice',{}).get("gross", {}).get('amount'))),
-                get_cart_field(index, 'currency'): self.currency,
-                get_cart_field(index, 'totalAmount'): format_price(float(line.get('totalPrice',{}).get("gross", {}).get('amount'))),
-            }
-        basket_data.update(cart_data)
-
-        profile_data =  {
-            'customer.email': checkout_data['email'],
-            'customer.givenName': checkout_data["user"]["firstName"],
-            'customer.surname': checkout_data["user"]["lastName"],
-        }
-        basket_data.update(profile_data)
-        return basket_data
+        # Only SAR works, so the currency of the processor is used instead of the one of the checkout.
+        return build_basket_data(checkout_id, checkout_data, self.currency, self.CART_ITEM_TYPE_DIGITAL)
 
     def get_saleor_checkout_data(self, checkout_id):
-        client = get_saleor_api_client_instance()
-        checkout_data = client.get_checkout_data(checkout_id)
-        return checkout_data
+        """
+        Return the checkout data from Saleor, reading it through the checkout snapshot cache.
+
+        Snapshots are invalidated by the CHECKOUT_UPDATED webhook and expire after
+        ``saleor_checkout_cache_timeout`` seconds in case a notification is missed.
+        """
+        with track_stage('get_saleor_checkout_data', self.NAME) as stage:
+            cache_key = get_saleor_checkout_cache_key(checkout_id)
+            checkout_data = cache.get(cache_key)
+            if checkout_data is not None:
+                stage.result = 'cached'
+                return checkout_data
+
+            checkout_data = execute(GET_CHECKOUT, {"id": checkout_id})
+            if checkout_data.get("checkout") is not None:
+                cache.set(cache_key, checkout_data, timeout=self.saleor_checkout_cache_timeout)
+            return checkout_data
 
     def init_saleor_transaction(self, saleor_checkout_id, data):
         """
         Initialize the transaction with Saleor.
         """
-        client = get_saleor_api_client_instance()
-        transaction_data = client.initialize_transaction_for_checkout(
+        with track_stage('init_saleor_transaction', self.NAME):
+            transaction_data = execute(INITIALIZE_TRANSACTION, {
+                "id": saleor_checkout_id,
+                "paymentGateway": {"id": HYPERPAY_APP_ID, "data": data},
+            })
+        log_event(
+            logger,
+            logging.INFO,
+            'saleor.transaction.initialized',
+            processor=self.NAME,
             checkout_id=saleor_checkout_id,
-            payment_app_id=HYPERPAY_APP_ID,
-            data=data,
-            )
-        logger.info("Transaction data: %s", transaction_data)
+            response=transaction_data,
+        )
         return transaction_data
 
-    def complete_saleor_checkout(self, verification_response):
-        """TO DO create saleor connection"""
-        client = get_saleor_api_client_instance()
-        checkout_id = verification_response["merchantTransactionId"]
-        billing_address = {
+    def _get_billing_address(self, verification_response):
+        """
+        Return the Saleor billing address from the HyperPay payment status response.
+        """
+        return {
             "city": verification_response.get("billing", {}).get("city", ""),
             "cityArea": verification_response.get("billing", {}).get("state",""),
             "companyName": "Nelc Company",
@@ -148,19 +178,46 @@ class HyperPay:
             "streetAddress1": verification_response.get("billing", {}).get("street1",""),
             "streetAddress2": verification_response.get("billing", {}).get("street2",""),
         }
-        update_data = client.update_checkout_billing_adress(checkout_id=checkout_id, billing_address=billing_address)
 
-        logger.info("Update data for checkout %s: %s", checkout_id, update_data)
-        order_data = client.complete_checkout(checkout_id=checkout_id, metadata=[{"key": "payment_processor_response","value": json.dumps(verification_response)}])
+    def complete_saleor_checkout(self, verification_response):
+        """
+        Update the billing address and complete the Saleor checkout in a single request.
 
-        logger.info("Order data for checkout %s: %s", checkout_id, order_data)
-        return order_data["checkoutComplete"]["order"]
+        Both mutations are sent in one document; Saleor runs them in order and reports
+        the errors of each one separately.
+        """
+        checkout_id = verification_response["merchantTransactionId"]
+        with track_stage('complete_saleor_checkout', self.NAME):
+            data = execute(FINALIZE_CHECKOUT, {
+                "id": checkout_id,
+                "billingAddress": self._get_billing_address(verification_response),
+                "metadata": [{"key": "payment_processor_response", "value": dumps(verification_response).decode()}],
+            })
+        log_event(
+            logger,
+            logging.INFO,
+            'saleor.checkout.finalized',
+            processor=self.NAME,
+            checkout_id=checkout_id,
+            response=data,
+        )
 
-    def _get_checkout_data(self, request):
+        errors = {
+            operation: data[operation]["errors"]
+            for operation in ("checkoutBillingAddressUpdate", "checkoutComplete")
+            if data.get(operation) and data[operation].get("errors")
+        }
+        order = (data.get("checkoutComplete") or {}).get("order")
+        if order is None:
+            raise SaleorCheckoutFinalizationError(checkout_id, errors)
+        if errors:
+            logger.warning("Checkout %s was completed with errors: %s", checkout_id, errors)
+        return order
+
+    def _get_checkout_request_data(self, basket_data):
         """
-        Prepare the checkout and return the checkout data.
+        Return the payload sent to HyperPay to create a checkout.
         """
-        checkouts_api_url = self.hyper_pay_api_base_url + self.CHECKOUTS_ENDPOINT
         request_data = {
             'entityId': self.entity_id,
             'paymentType': self.PAYMENT_TYPE,
@@ -169,20 +226,14 @@ class HyperPay:
         if self.test_mode:
             request_data['testMode'] = self.test_mode
 
-        request_data.update(self._get_basket_data(request))
-        logger.info("--------------\n")
-        logger.info(request_data)
-        try:
-            response = requests.post(
-                checkouts_api_url,
-                request_data,
-                headers=self.authentication_headers
-            )
-        except Exception as exc:
-            raise HyperPayException('Error creating a checkout. {}'.format(exc))
+        request_data.update(basket_data)
+        return request_data
 
-        data = response.json()
-        logger.info(data)
+    def _parse_checkout_response(self, data):
+        """
+        Validate the response of the checkout creation and return it.
+        """
+        log_event(logger, logging.INFO, 'hyperpay.checkout.response', processor=self.NAME, response=data)
         if 'result' not in data or 'code' not in data['result']:
             raise HyperPayException(
                 'Error creating checkout. Invalid response from HyperPay.'
@@ -194,16 +245,108 @@ class HyperPay:
             )
         return data
 
+    def _get_checkout_data(self, request):
+        """
+        Prepare the checkout and return the checkout data.
+        """
+        return self._create_checkout(self._get_checkout_request_data(self._get_basket_data(request)))
+
+    def _create_checkout(self, request_data):
+        """
+        Create a HyperPay checkout and return the checkout data.
+        """
+        checkouts_api_url = self.hyper_pay_api_base_url + self.CHECKOUTS_ENDPOINT
+        log_event(logger, logging.INFO, 'hyperpay.checkout.request', processor=self.NAME, request=request_data)
+        with track_stage('create_checkout', self.NAME) as stage:
+            try:
+                response = http_post(
+                    checkouts_api_url,
+                    request_data,
+                    headers=self.authentication_headers
+                )
+            except Exception as exc:
+                raise HyperPayException('Error creating a checkout. {}'.format(exc))
+            response_data = loads(response.content)
+            stage.result = get_result_code_class(response_data)
+
+        return self._parse_checkout_response(response_data)
+
+    def _get_checkout_reuse_cache_key(self, merchant_transaction_id, amount, currency):
+        """
+        Return the cache key of the HyperPay checkout created for a Saleor checkout and amount.
+        """
+        key = '{}:{}:{}:{}'.format(self.NAME, merchant_transaction_id, amount, currency)
+        return CHECKOUT_REUSE_CACHE_KEY.format(hashlib.sha256(key.encode()).hexdigest())
+
+    def _get_request_checkout_reuse_cache_key(self, request_data):
+        """
+        Return the checkout reuse cache key for a checkout creation payload.
+        """
+        return self._get_checkout_reuse_cache_key(
+            request_data['merchantTransactionId'],
+            request_data['amount'],
+            request_data['currency'],
+        )
+
+    def _get_response_checkout_reuse_cache_key(self, response_data):
+        """
+        Return the checkout reuse cache key for a payment status response, or None if it cannot be built.
+        """
+        try:
+            return self._get_checkout_reuse_cache_key(
+                response_data['merchantTransactionId'],
+                response_data['amount'],
+                response_data['currency'],
+            )
+        except (KeyError, TypeError):
+            return None
+
     def get_transaction_parameters(self,request=None):
         """
         Return the transaction parameters needed for this processor.
+
+        Reloading the payment page for the same Saleor checkout and amount reuses the HyperPay
+        checkout created before, as long as it is still valid and no payment was attempted with it.
+        """
+        request_data = self._get_checkout_request_data(self._get_basket_data(request))
+        reuse_cache_key = self._get_request_checkout_reuse_cache_key(request_data)
+        checkout_data = cache.get(reuse_cache_key)
+        if checkout_data is not None:
+            return self._build_transaction_parameters(request, checkout_data)
+
+        checkout_data = self._create_checkout(request_data)
+        record_checkout(self, request_data, checkout_data)
+        if self.background_transaction_initialize:
+            # The rendered page only needs the HyperPay checkout, so the Saleor transaction is created meanwhile.
+            run_in_background(
+                self._initialize_reused_checkout,
+                request.GET['checkoutId'],
+                checkout_data,
+                reuse_cache_key,
+                task_name='init_saleor_transaction',
+            )
+        else:
+            self._initialize_reused_checkout(request.GET['checkoutId'], checkout_data, reuse_cache_key)
+        return self._build_transaction_parameters(request, checkout_data)
+
+    def _initialize_reused_checkout(self, saleor_checkout_id, checkout_data, reuse_cache_key):
+        """
+        Initialize the Saleor transaction of a new HyperPay checkout, then let page reloads reuse the checkout.
+
+        The checkout is only reused once its transaction exists, so a failed initialization
+        is attempted again with a new checkout on the next reload.
+        """
+        self.init_saleor_transaction(saleor_checkout_id=saleor_checkout_id, data=checkout_data)
+        cache.set(reuse_cache_key, checkout_data, timeout=self.checkout_reuse_timeout)
+
+    def _build_transaction_parameters(self, request, checkout_data):
+        """
+        Build the context used to render the payment page from the HyperPay checkout.
         """
-        checkout_data = self._get_checkout_data(request)
         payment_widget_js_url = '{}?{}'.format(
             self.hyper_pay_api_base_url + self.PAYMENT_WIDGET_JS_PATH,
             urlencode({'checkoutId': checkout_data['id']})
         )
-        self.init_saleor_transaction(saleor_checkout_id=request.GET['checkoutId'], data=checkout_data)
         transaction_parameters = {
             'payment_widget_js': payment_widget_js_url,
             'payment_page_url': reverse('hyperpay-payment:pay-page'),
@@ -218,117 +361,138 @@ class HyperPay:
         }
         return transaction_parameters
 
-    def _verify_status(self, resource_path):
+    def _get_payment_status_endpoint(self, resource_path):
         """
-        Verify the status of the payment.
+        Return the URL used to query the status of the payment.
         """
-        status = PaymentStatus.SUCCESS
-        payment_status_endpoint = "{}?{}".format(
-            self.payment_processor.hyper_pay_api_base_url + resource_path,
-            urlencode({'entityId': self.payment_processor.configuration['entity_id']})
+        return "{}?{}".format(
+            self.hyper_pay_api_base_url + resource_path,
+            urlencode({'entityId': self.entity_id})
         )
-        response = requests.get(payment_status_endpoint, headers=self.payment_processor.authentication_headers)
-        response_data = response.json()
 
-        result_code = response_data['result']['code']
-        if not response.ok:
-            logger.error('Received a non-success response status code from HyperPay %s', response.status_code)
-            status = PaymentStatus.FAILURE
-        elif self.PENDING_CHANGEABLE_SOON_CODES_REGEX.search(result_code):
-            logger.warning(
-                'Received a pending status code %s from HyperPay for payment id %s.',
-                result_code,
-                response_data['id']
-            )
-            status = PaymentStatus.PENDING
-        elif self.PENDING_NOT_CHANGEABLE_SOON_CODES_REGEX.search(result_code):
-            logger.warning(
-                'Received a pending status code %s from HyperPay for payment id %s. As this can change '
-                'after several days, treating it as a failure.',
-                result_code,
-                response_data['id']
-            )
-            status = PaymentStatus.FAILURE
-        elif self.SUCCESS_CODES_REGEX.search(result_code):
-            logger.info(
-                'Received a success status code %s from HyperPay for payment id %s.',
-                result_code,
-                response_data['id']
-            )
-        elif self.SUCCESS_MANUAL_REVIEW_CODES_REGEX.search(result_code):
-            logger.error(
-                'Received a success status code %s from HyperPay which requires manual verification for payment id %s.'
-                'Treating it as a failed transaction.',
-                result_code,
-                response_data['id']
-            )
+    def get_payment_resource_path(self, checkout_id):
+        """
+        Return the resource path used to query the status of the payment of a HyperPay checkout.
+        """
+        return '{}/{}/payment'.format(self.CHECKOUTS_ENDPOINT, checkout_id)
 
-            # This is a temporary change till we get clarity on whether this should be treated as a failure.
-            status = PaymentStatus.FAILURE
-        else:
-            logger.error(
-                'Received a rejection status code %s from HyperPay for payment id %s',
-                result_code,
-                response_data['id']
-            )
-            status = PaymentStatus.FAILURE
+    def _get_verification_cache_key(self, resource_path):
+        """
+        Return the cache key of the verification result of a payment.
+        """
+        return VERIFICATION_CACHE_KEY.format(self.NAME, hashlib.sha256(resource_path.encode()).hexdigest())
 
-        return response_data, status
+    def _get_verification_cache_timeout(self, status):
+        """
+        Return how long a verification result can be reused.
 
-    def _verify_status(self, resource_path):
+        Final results do not change anymore, pending ones are only reused for a few seconds.
         """
-        Verify the status of the payment.
+        if status == PaymentStatus.PENDING:
+            return self.pending_verification_cache_timeout
+        return self.verification_cache_timeout
+
+    def get_cached_verification(self, resource_path):
         """
-        status = PaymentStatus.SUCCESS
-        payment_status_endpoint = "{}?{}".format(
-            self.hyper_pay_api_base_url + resource_path,
-            urlencode({'entityId': self.entity_id})
+        Return the cached ``(response_data, status)`` of the payment, or None.
+        """
+        cached = cache.get(self._get_verification_cache_key(resource_path))
+        if cached is None:
+            return None
+        return cached['response'], PaymentStatus[cached['status']]
+
+    def cache_verification(self, resource_path, response_data, status):
+        """
+        Store the verification result of the payment.
+        """
+        cache.set(
+            self._get_verification_cache_key(resource_path),
+            {'response': response_data, 'status': status.name},
+            timeout=self._get_verification_cache_timeout(status),
         )
-        response = requests.get(payment_status_endpoint, headers=self.authentication_headers)
-        response_data = response.json()
 
-        result_code = response_data['result']['code']
-        if not response.ok:
-            logger.error('Received a non-success response status code from HyperPay %s', response.status_code)
+    def _verify_status(self, resource_path, use_cache=True):
+        """
+        Verify the status of the payment.
+
+        With ``use_cache`` False, HyperPay is queried even if a result is cached, the new one is still stored.
+        """
+        with track_stage('verify_status', self.NAME) as stage:
+            cached = self.get_cached_verification(resource_path) if use_cache else None
+            if cached is not None:
+                stage.result = 'cached'
+                return cached
+
+            response = http_get(self._get_payment_status_endpoint(resource_path), headers=self.authentication_headers)
+            response_data = loads(response.content)
+            stage.result = get_result_code_class(response_data) if response.ok else 'http_error'
+
+        response_data, status = self._get_payment_status(response.ok, response.status_code, response_data)
+        if response.ok:
+            self.store_verification(resource_path, response_data, status)
+        return response_data, status
+
+    def store_verification(self, resource_path, response_data, status):
+        """
+        Record the verified status of the payment in the ledger and the verification cache.
+        """
+        record_verification(self, resource_path, response_data, status)
+        self.cache_verification(resource_path, response_data, status)
+        if status != PaymentStatus.PENDING:
+            self._discard_reused_checkout(response_data)
+
+    def _discard_reused_checkout(self, response_data):
+        """
+        Stop reusing the HyperPay checkout once a payment with it reached a final status.
+        """
+        reuse_cache_key = self._get_response_checkout_reuse_cache_key(response_data)
+        if reuse_cache_key is not None:
+            cache.delete(reuse_cache_key)
+
+    def _get_payment_status(self, response_ok, response_status_code, response_data):
+        """
+        Classify the HyperPay status response and return it along with the payment status.
+        """
+        result_code = classify_result_code(response_data['result']['code'])
+        status = result_code.status
+        if not response_ok:
+            logger.error('Received a non-success response status code from HyperPay %s', response_status_code)
             status = PaymentStatus.FAILURE
-        elif self.PENDING_CHANGEABLE_SOON_CODES_REGEX.search(result_code):
+        elif result_code.category == 'pending':
             logger.warning(
                 'Received a pending status code %s from HyperPay for payment id %s.',
-                result_code,
+                result_code.code,
                 response_data['id']
             )
-            status = PaymentStatus.PENDING
-        elif self.PENDING_NOT_CHANGEABLE_SOON_CODES_REGEX.search(result_code):
+        elif result_code.category == 'pending_not_changeable_soon':
             logger.warning(
                 'Received a pending status code %s from HyperPay for payment id %s. As this can change '
                 'after several days, treating it as a failure.',
-                result_code,
+                result_code.code,
                 response_data['id']
             )
-            status = PaymentStatus.FAILURE
-        elif self.SUCCESS_CODES_REGEX.search(result_code):
+        elif result_code.category == 'success':
             logger.info(
                 'Received a success status code %s from HyperPay for payment id %s.',
-                result_code,
+                result_code.code,
                 response_data['id']
             )
-        elif self.SUCCESS_MANUAL_REVIEW_CODES_REGEX.search(result_code):
+        elif result_code.category == 'success_manual_review':
+            # This is a temporary change till we get clarity on whether this should be treated as a failure.
             logger.error(
                 'Received a success status code %s from HyperPay which requires manual verification for payment id %s.'
                 'Treating it as a failed transaction.',
-                result_code,
+                result_code.code,
                 response_data['id']
             )
-
-            # This is a temporary change till we get clarity on whether this should be treated as a failure.
-            status = PaymentStatus.FAILURE
         else:
             logger.error(
-                'Received a rejection status code %s from HyperPay for payment id %s',
-                result_code,
+                'Received a rejection status code %s (%s: %s) from HyperPay for payment id %s',
+                result_code.code,
+                result_code.category,
+                result_code.description,
                 response_data['id']
             )
-            status = PaymentStatus.FAILURE
 
         return response_data, status
 
@@ -0,0 +1,110 @@
+"""
+Registry of the payment processors configured for this worker.
+
+Processors are built once, when the application is ready, from immutable
+snapshots of ``HYPERPAY_CONFIG`` and looked up by NAME afterwards. Call
+``reload_processors`` (done automatically by ``override_settings``) when the
+configuration changes at runtime. A processor with an invalid configuration is
+logged and left unregistered, so it does not prevent the LMS from starting.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from platform_plugin_hyperpay.async_processors import AsyncHyperPay, AsyncHyperPayMada
+from platform_plugin_hyperpay.exceptions import HyperPayException
+from platform_plugin_hyperpay.processors import HyperPay, HyperPayMada, get_processor_configuration
+from platform_plugin_hyperpay.transport import reset_http_session
+
+PROCESSOR_CLASSES = (HyperPay, HyperPayMada)
+ASYNC_PROCESSOR_CLASSES = (AsyncHyperPay, AsyncHyperPayMada)
+RELOAD_SETTINGS = ('HYPERPAY_CONFIG', 'HYPERPAY_HTTP_CONFIG', 'SECRET_KEY')
+
+logger = logging.getLogger(__name__)
+
+_processors = {}
+_async_processors = {}
+_lock = threading.Lock()
+
+
+def _build(processor_classes, configured):
+    """
+    Instantiate the processors that have a valid configuration.
+    """
+    processors = {}
+    for processor_class in processor_classes:
+        if processor_class.NAME not in configured:
+            continue
+        try:
+            processors[processor_class.NAME] = processor_class(get_processor_configuration(processor_class.NAME))
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Invalid HYPERPAY_CONFIG entry for %s, the processor is disabled.', processor_class.NAME)
+    return processors
+
+
+def load_processors():
+    """
+    Build every configured processor, replacing the ones currently registered.
+    """
+    global _processors, _async_processors  # pylint: disable=global-statement
+
+    configured = getattr(settings, 'HYPERPAY_CONFIG', {})
+    processors = _build(PROCESSOR_CLASSES, configured)
+    async_processors = _build(ASYNC_PROCESSOR_CLASSES, configured)
+    with _lock:
+        _processors, _async_processors = processors, async_processors
+
+
+def reload_processors():
+    """
+    Rebuild the processors and drop the state derived from the previous configuration.
+    """
+    # Imported here as the payment views import this module.
+    from platform_plugin_hyperpay.payment.views import clear_key_cache  # pylint: disable=import-outside-toplevel
+
+    load_processors()
+    clear_key_cache()
+    reset_http_session()
+
+
+def _get(registry, name):
+    """
+    Return the processor registered under the name.
+    """
+    try:
+        return registry[name]
+    except KeyError:
+        raise HyperPayException('Payment processor {} is not configured.'.format(name)) from None
+
+
+def get_processor(name):
+    """
+    Return the processor with the given NAME.
+    """
+    return _get(_processors, name)
+
+
+def get_processors():
+    """
+    Return every configured processor.
+    """
+    return list(_processors.values())
+
+
+def get_async_processor(name):
+    """
+    Return the async processor with the given NAME.
+    """
+    return _get(_async_processors, name)
+
+
+@receiver(setting_changed)
+def reload_processors_on_setting_changed(setting, **kwargs):  # pylint: disable=unused-argument
+    """
+    Reload the processors when one of the settings they are built from changes.
+    """
+    if setting in RELOAD_SETTINGS:
+        reload_processors()
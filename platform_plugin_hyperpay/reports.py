@@ -0,0 +1,143 @@
+"""
+Bulk retrieval of HyperPay transaction reports.
+
+The reporting API (https://hyperpay.docs.oppwa.com/reference/parameters#reporting)
+returns the transactions of an entity for a time frame, a page at a time, along
+with the number of pages when it is known. Long ranges are split in short
+windows which are queried concurrently, and the rows are yielded window by
+window, in chronological order, so only the windows in flight are held in memory.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from platform_plugin_hyperpay.exceptions import HyperPayException
+from platform_plugin_hyperpay.result_codes import classify_result_code
+from platform_plugin_hyperpay.serialization import loads
+from platform_plugin_hyperpay.transport import http_get
+
+REPORTS_ENDPOINT = '/v3/query'
+REPORT_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Largest page requested from the reporting API, which may return shorter pages.
+REPORT_PAGE_SIZE = 100
+
+REPORT_COLUMNS = (
+    'processor',
+    'entity_id',
+    'id',
+    'timestamp',
+    'payment_type',
+    'payment_brand',
+    'amount',
+    'currency',
+    'merchant_transaction_id',
+    'checkout_id',
+    'result_code',
+    'result_description',
+    'category',
+    'status',
+)
+
+
+def get_report_windows(date_from, date_to, window):
+    """
+    Split ``[date_from, date_to)`` into consecutive ``(start, end)`` windows of at most ``window``.
+    """
+    start = date_from
+    while start < date_to:
+        end = min(start + window, date_to)
+        yield start, end
+        start = end
+
+
+def fetch_report_page(processor, start, end, page):
+    """
+    Return a page of the transactions of the processor entity between ``start`` and ``end``.
+
+    Returns:
+        tuple: The records of the page and the number of pages, or None when the response does not include it.
+    """
+    query = urlencode({
+        'entityId': processor.entity_id,
+        # Both bounds are inclusive, stop right before the next window starts.
+        'date.from': start.strftime(REPORT_DATE_FORMAT),
+        'date.to': (end - timedelta(seconds=1)).strftime(REPORT_DATE_FORMAT),
+        'limit': REPORT_PAGE_SIZE,
+        'pageNo': page,
+    })
+    url = '{}{}?{}'.format(processor.hyper_pay_api_base_url, REPORTS_ENDPOINT, query)
+    try:
+        response = http_get(url, headers=processor.authentication_headers)
+    except Exception as exc:
+        raise HyperPayException('Error querying the transaction report. {}'.format(exc))
+
+    data = loads(response.content)
+    if not response.ok:
+        raise HyperPayException('Error querying the transaction report: {}'.format(data.get('result')))
+    # Queries without matching transactions return no records.
+    page_count = data.get('pageCount')
+    return data.get('records', []), int(page_count) if page_count is not None else None
+
+
+def build_report_row(processor, record):
+    """
+    Flatten a report record into a row of ``REPORT_COLUMNS``, classifying its result code.
+    """
+    result = record.get('result', {})
+    result_code = classify_result_code(result.get('code', ''))
+    return (
+        processor.NAME,
+        processor.entity_id,
+        record.get('id'),
+        record.get('timestamp'),
+        record.get('paymentType'),
+        record.get('paymentBrand'),
+        record.get('amount'),
+        record.get('currency'),
+        record.get('merchantTransactionId'),
+        record.get('ndc'),
+        result_code.code,
+        result.get('description') or result_code.description,
+        result_code.category,
+        result_code.status.name,
+    )
+
+
+def fetch_report_window(processor, start, end):
+    """
+    Return the rows of every page of the transactions of the processor entity in the window.
+
+    Pages are read up to the page count returned by the API. Without it, pages are
+    read until an empty one, as a page shorter than ``REPORT_PAGE_SIZE`` is not
+    necessarily the last one.
+    """
+    rows = []
+    page = 1
+    while True:
+        records, page_count = fetch_report_page(processor, start, end, page)
+        rows.extend(build_report_row(processor, record) for record in records)
+        if not records or (page_count is not None and page >= page_count):
+            return rows
+        page += 1
+
+
+def iter_transaction_report(processors, date_from, date_to, window=timedelta(hours=1), concurrency=4):
+    """
+    Yield the rows of the transactions of the processors between ``date_from`` and ``date_to``, a window at a time.
+
+    At most ``concurrency`` windows are queried at once and fetched ahead of the one being consumed.
+    """
+    tasks = (
+        (processor, start, end)
+        for processor in processors
+        for start, end in get_report_windows(date_from, date_to, window)
+    )
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='hyperpay-report') as executor:
+        for task in tasks:
+            pending.append(executor.submit(fetch_report_window, *task))
+            if len(pending) >= concurrency:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,241 @@
+"""
+Classification of HyperPay result codes.
+
+HyperPay groups its result codes by prefix, see
+https://hyperpay.docs.oppwa.com/reference/resultCodes. All the groups are
+compiled into a single anchored pattern so a code is classified with one
+regex match, and results are memoized since the set of codes seen in practice
+is small.
+"""
+import re
+from enum import Enum
+from functools import lru_cache
+from typing import NamedTuple
+
+
+class PaymentStatus(Enum):
+    SUCCESS = 0
+    PENDING = 1
+    FAILURE = 2
+
+
+class ResultCode(NamedTuple):
+    code: str
+    status: PaymentStatus
+    category: str
+    description: str
+
+
+# (category, pattern, status, description), in matching order. The first
+# four groups decide how a payment is handled, the rest only refine why it
+# was rejected.
+RESULT_CODE_CATEGORIES = (
+    (
+        'pending',
+        r'000\.200',
+        PaymentStatus.PENDING,
+        'Transaction pending',
+    ),
+    (
+        'pending_not_changeable_soon',
+        r'800\.400\.5|100\.400\.500',
+        PaymentStatus.FAILURE,
+        'Transaction pending, the status can change only after several days',
+    ),
+    (
+        'success',
+        r'000\.000\.|000\.100\.1|000\.[36]',
+        PaymentStatus.SUCCESS,
+        'Successfully processed transaction',
+    ),
+    (
+        'success_manual_review',
+        r'000\.400\.0[^3]|000\.400\.[0-1]{2}0',
+        PaymentStatus.FAILURE,
+        'Successfully processed transaction that should be manually reviewed',
+    ),
+    (
+        'chargeback',
+        r'000\.100\.2',
+        PaymentStatus.FAILURE,
+        'Chargeback related transaction',
+    ),
+    (
+        'rejected_3ds_intercard_risk',
+        r'000\.400\.[1][0-9][1-9]|000\.400\.2',
+        PaymentStatus.FAILURE,
+        'Rejected due to 3Dsecure and Intercard risk checks',
+    ),
+    (
+        'rejected_external_bank',
+        r'800\.[17]00|800\.800\.[123]',
+        PaymentStatus.FAILURE,
+        'Rejected by the external bank or payment system',
+    ),
+    (
+        'rejected_communication',
+        r'900\.[1234]00|000\.400\.030',
+        PaymentStatus.FAILURE,
+        'Rejected due to communication errors',
+    ),
+    (
+        'rejected_system',
+        r'800\.[56]|999\.|600\.1|800\.800\.[84]',
+        PaymentStatus.FAILURE,
+        'Rejected due to system errors',
+    ),
+    (
+        'rejected_async_workflow',
+        r'100\.39[765]',
+        PaymentStatus.FAILURE,
+        'Rejected due to an error in the asynchronous workflow',
+    ),
+    (
+        'soft_decline',
+        r'300\.100\.100',
+        PaymentStatus.FAILURE,
+        'Soft decline, the transaction can be retried with strong customer authentication',
+    ),
+    (
+        'rejected_risk_management',
+        r'100\.380\.[23]|100\.380\.101',
+        PaymentStatus.FAILURE,
+        'Rejected by the risk management',
+    ),
+    (
+        'rejected_external_risk',
+        r'100\.400\.[0-3]|100\.38|100\.370\.100|100\.370\.11',
+        PaymentStatus.FAILURE,
+        'Rejected by an external risk check',
+    ),
+    (
+        'rejected_address_validation',
+        r'800\.400\.1',
+        PaymentStatus.FAILURE,
+        'Rejected by the address validation',
+    ),
+    (
+        'rejected_3ds',
+        r'800\.400\.2|100\.390',
+        PaymentStatus.FAILURE,
+        'Rejected by the 3Dsecure authentication',
+    ),
+    (
+        'rejected_blacklist',
+        r'800\.[32]',
+        PaymentStatus.FAILURE,
+        'Rejected due to a blacklist validation',
+    ),
+    (
+        'rejected_risk_validation',
+        r'800\.1[123456]0',
+        PaymentStatus.FAILURE,
+        'Rejected due to a risk validation',
+    ),
+    (
+        'rejected_configuration',
+        r'600\.[23]|500\.[12]|800\.121',
+        PaymentStatus.FAILURE,
+        'Rejected due to a configuration validation',
+    ),
+    (
+        'rejected_registration',
+        r'100\.[13]50',
+        PaymentStatus.FAILURE,
+        'Rejected due to a registration validation',
+    ),
+    (
+        'rejected_job',
+        r'100\.250|100\.360',
+        PaymentStatus.FAILURE,
+        'Rejected due to a job validation',
+    ),
+    (
+        'rejected_reference',
+        r'700\.[1345][05]0',
+        PaymentStatus.FAILURE,
+        'Rejected due to a reference validation',
+    ),
+    (
+        'rejected_format',
+        r'200\.[123]|100\.[53][07]|800\.900|100\.[69]00\.500',
+        PaymentStatus.FAILURE,
+        'Rejected due to a format validation',
+    ),
+    (
+        'rejected_address',
+        r'100\.800',
+        PaymentStatus.FAILURE,
+        'Rejected due to an address validation',
+    ),
+    (
+        'rejected_contact',
+        r'100\.700|100\.900\.[123467890][00-99]',
+        PaymentStatus.FAILURE,
+        'Rejected due to a contact validation',
+    ),
+    (
+        'rejected_account',
+        r'100\.100|100\.2[01]',
+        PaymentStatus.FAILURE,
+        'Rejected due to an account validation',
+    ),
+    (
+        'rejected_amount',
+        r'100\.55',
+        PaymentStatus.FAILURE,
+        'Rejected due to an amount validation',
+    ),
+)
+
+UNKNOWN_CATEGORY = 'rejected'
+UNKNOWN_DESCRIPTION = 'Rejected transaction'
+
+# Descriptions of individual codes, taking precedence over the category description.
+# Intentionally partial: only the codes seen most often are listed, every other
+# code is described by its group, which covers the whole published catalogue.
+RESULT_CODE_DESCRIPTIONS = {
+    '000.000.000': 'Transaction succeeded',
+    '000.000.100': 'successful request',
+    '000.100.110': "Request successfully processed in 'Merchant in Integrator Test Mode'",
+    '000.100.111': "Request successfully processed in 'Merchant in Validator Test Mode'",
+    '000.100.112': "Request successfully processed in 'Merchant in Connector Test Mode'",
+    '000.200.000': 'transaction pending',
+    '000.200.100': 'successfully created checkout',
+    '000.400.000': 'Transaction succeeded (please review manually due to fraud suspicion)',
+    '100.390.112': 'Technical Error in 3D system',
+    '100.396.101': 'Cancelled by user',
+    '100.396.104': 'Uncertain status - probably cancelled by user',
+    '100.400.500': 'waiting for external risk',
+    '200.300.404': 'invalid or missing parameter',
+    '800.100.100': 'transaction declined for unknown reason',
+    '800.100.151': 'transaction declined (invalid card)',
+    '800.100.152': 'transaction declined by authorization system',
+    '800.100.155': 'transaction declined (amount exceeds credit)',
+    '800.100.162': 'transaction declined (limit exceeded)',
+    '800.100.171': 'transaction declined (pick up card)',
+    '800.100.190': 'transaction declined (invalid configuration data)',
+    '800.120.100': 'Rejected by Throttling.',
+    '800.400.500': 'Waiting for confirmation of non-instant payment. Denied for now.',
+    '900.100.100': 'unexpected communication error with connector/acquirer',
+    '900.100.300': 'timeout, uncertain result',
+}
+
+RESULT_CODE_REGEX = re.compile('|'.join(
+    '^(?P<{}>{})'.format(category, pattern) for category, pattern, _, _ in RESULT_CODE_CATEGORIES
+))
+_CATEGORIES = {category: (status, description) for category, _, status, description in RESULT_CODE_CATEGORIES}
+
+
+@lru_cache(maxsize=4096)
+def classify_result_code(code):
+    """
+    Return the ResultCode with the status, category and description of a HyperPay result code.
+    """
+    match = RESULT_CODE_REGEX.match(code)
+    if match is None:
+        status, category, description = PaymentStatus.FAILURE, UNKNOWN_CATEGORY, UNKNOWN_DESCRIPTION
+    else:
+        category = match.lastgroup
+        status, description = _CATEGORIES[category]
+    return ResultCode(code, status, category, RESULT_CODE_DESCRIPTIONS.get(code, description))
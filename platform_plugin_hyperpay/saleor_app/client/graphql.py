@@ -0,0 +1,38 @@
+"""Minimal GraphQL client for documents sent directly to the Saleor API."""
+
+from django.conf import settings
+
+from platform_plugin_hyperpay.exceptions import HyperPayException
+from platform_plugin_hyperpay.saleor_app.tokens import get_saleor_api_token
+from platform_plugin_hyperpay.serialization import dumps, loads
+from platform_plugin_hyperpay.transport import http_post
+
+
+def execute(query, variables=None, token=None):
+    """
+    Execute a GraphQL document against the Saleor API over the shared HTTP session.
+
+    Args:
+        query: The GraphQL document.
+        variables: The variables of the document.
+        token: The token to authenticate with, the registered app token by default.
+    Returns:
+        dict: The ``data`` of the response.
+    """
+    try:
+        response = http_post(
+            settings.SALEOR_API_URL,
+            dumps({"query": query, "variables": variables or {}}),
+            headers={
+                "Authorization": f"Bearer {token or get_saleor_api_token()}",
+                "Content-Type": "application/json",
+            },
+        )
+        response.raise_for_status()
+        content = loads(response.content)
+    except Exception as exc:
+        raise HyperPayException(f"Error calling the Saleor API. {exc}") from exc
+
+    if content.get("errors"):
+        raise HyperPayException(f"Saleor API returned errors: {content['errors']}")
+    return content["data"]
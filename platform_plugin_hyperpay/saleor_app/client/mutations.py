@@ -0,0 +1,24 @@
+FINALIZE_CHECKOUT = """
+mutation FinalizeCheckout($id: ID!, $billingAddress: AddressInput!, $metadata: [MetadataInput!]) {
+  checkoutBillingAddressUpdate(id: $id, billingAddress: $billingAddress) {
+    checkout { id }
+    errors { field message code }
+  }
+  checkoutComplete(id: $id, metadata: $metadata) {
+    order { id number status }
+    confirmationNeeded
+    errors { field message code }
+  }
+}
+"""
+
+INITIALIZE_TRANSACTION = """
+mutation InitializeTransaction($id: ID!, $paymentGateway: PaymentGatewayToInitialize!) {
+  transactionInitialize(id: $id, paymentGateway: $paymentGateway) {
+    transaction { id }
+    transactionEvent { id type message }
+    data
+    errors { field message code }
+  }
+}
+"""
@@ -0,0 +1,22 @@
+GET_CHECKOUT = """
+query GetCheckout($id: ID!) {
+  checkout(id: $id) {
+    id
+    email
+    user { firstName lastName }
+    totalPrice { gross { amount currency } }
+    lines {
+      quantity
+      variant { name sku }
+      unitPrice { gross { amount } }
+      totalPrice { gross { amount } }
+    }
+  }
+}
+"""
+
+APP_ID = """
+query AppId {
+  app { id }
+}
+"""
@@ -63,3 +63,12 @@ fragment PaymentGatewayInitializeSessionEvent on PaymentGatewayInitializeSession
   }
 }
 """
+CHECKOUT_UPDATED = """
+subscription CheckoutUpdated {
+  event { ...CheckoutUpdatedEvent }
+}
+fragment BasicWebhookMetadata on Event {issuedAt version}
+fragment CheckoutUpdatedEvent on CheckoutUpdated {
+  ...BasicWebhookMetadata __typename checkout { id }
+}
+"""
@@ -0,0 +1,35 @@
+"""
+Versioned configuration of the Saleor app.
+
+The configuration is a single database record read through a per-process copy,
+whose version is checked at most every ``HYPERPAY_SALEOR_APP_CONFIG_CHECK_INTERVAL``
+seconds, see ``VersionedRecordStore``.
+"""
+from platform_plugin_hyperpay.models import SaleorAppConfiguration
+from platform_plugin_hyperpay.saleor_app.store import VersionedRecordStore
+
+CONFIGURATION_FIELDS = ('payment_url', 'payment_button_image', 'hyper_pay_api_base_url', 'access_token')
+CONFIGURATION_VERSION_CACHE_KEY = 'hyperpay:saleor-app-configuration:version'
+
+configuration_store = VersionedRecordStore(
+    SaleorAppConfiguration,
+    CONFIGURATION_FIELDS,
+    CONFIGURATION_VERSION_CACHE_KEY,
+    'HYPERPAY_SALEOR_APP_CONFIG_CHECK_INTERVAL',
+)
+
+
+def get_saleor_app_configuration():
+    """
+    Return the configuration of the Saleor app as a dict keyed by CONFIGURATION_FIELDS.
+
+    The returned dict is shared, do not modify it.
+    """
+    return configuration_store.get()
+
+
+def save_saleor_app_configuration(**values):
+    """
+    Store the given fields of the configuration and publish its new version.
+    """
+    return configuration_store.save(**values)
@@ -0,0 +1,155 @@
+"""
+Shared ingestion of the Saleor webhooks.
+
+Every webhook view is wrapped by ``saleor_webhook``, which reads the body
+within a size limit, verifies its ``Saleor-Signature``, parses it once,
+validates it against the schema compiled from the subscription document of
+the event and hands a typed event to the view. Adding an event only requires its subscription and event class.
+"""
+import logging
+from functools import wraps
+from typing import Any, NamedTuple, Optional
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from platform_plugin_hyperpay.metrics import track_stage
+from platform_plugin_hyperpay.saleor_app.client.subscriptions import (
+    CHECKOUT_UPDATED,
+    PAYMENT_GATEWAY_INITIALIZE_SESSION,
+    TRANSACTION_INITIALIZE,
+)
+from platform_plugin_hyperpay.saleor_app.schemas import WebhookPayloadError, compile_subscription, validate_payload
+from platform_plugin_hyperpay.saleor_app.signatures import SaleorSignatureError, verify_saleor_signature
+from platform_plugin_hyperpay.serialization import JSONDecodeError, loads
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEBHOOK_MAX_BODY_SIZE = 256 * 1024
+
+
+class TransactionInitializeSessionEvent(NamedTuple):
+    issued_at: str
+    data: Any
+    merchant_reference: str
+    idempotency_key: str
+    amount: Any
+    currency: str
+    action_type: str
+    transaction_id: Optional[str]
+
+    SUBSCRIPTION = TRANSACTION_INITIALIZE
+
+    @classmethod
+    def from_payload(cls, payload):
+        action = payload['action'] or {}
+        transaction = payload['transaction'] or {}
+        return cls(
+            issued_at=payload['issuedAt'],
+            data=payload['data'],
+            merchant_reference=payload['merchantReference'],
+            idempotency_key=payload['idempotencyKey'],
+            amount=action.get('amount'),
+            currency=action.get('currency'),
+            action_type=action.get('actionType'),
+            transaction_id=transaction.get('id'),
+        )
+
+
+class PaymentGatewayInitializeSessionEvent(NamedTuple):
+    issued_at: str
+    data: Any
+    amount: Any
+
+    SUBSCRIPTION = PAYMENT_GATEWAY_INITIALIZE_SESSION
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(issued_at=payload['issuedAt'], data=payload['data'], amount=payload['amount'])
+
+
+class CheckoutUpdatedEvent(NamedTuple):
+    issued_at: str
+    checkout_id: Optional[str]
+
+    SUBSCRIPTION = CHECKOUT_UPDATED
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(issued_at=payload['issuedAt'], checkout_id=(payload['checkout'] or {}).get('id'))
+
+
+def get_webhook_max_body_size():
+    """
+    Return the largest webhook body accepted, in bytes.
+    """
+    return getattr(settings, 'HYPERPAY_WEBHOOK_MAX_BODY_SIZE', DEFAULT_WEBHOOK_MAX_BODY_SIZE)
+
+
+def read_webhook_payload(body, schema):
+    """
+    Return the parsed and validated payload of the webhook body.
+
+    Raises WebhookPayloadError if the body is not a valid payload for the schema.
+    """
+    try:
+        payload = loads(body)
+    except (JSONDecodeError, UnicodeDecodeError) as exc:
+        raise WebhookPayloadError('The body is not valid JSON. {}'.format(exc))
+    validate_payload(schema, payload)
+    return payload
+
+
+def saleor_webhook(event_class):
+    """
+    Decorate a view handling a Saleor webhook, calling it as ``view(request, event)``.
+
+    Requests that are too large get a 413, unsigned or wrongly signed ones a
+    401 unless ``HYPERPAY_VERIFY_SALEOR_SIGNATURE`` is False, and payloads
+    that do not match the subscription of the event a 400. Every request is
+    timed as the ``webhook_<view name>`` stage, by class of response status.
+    """
+    schema = compile_subscription(event_class.SUBSCRIPTION)
+
+    def decorator(view):
+        def handle(request):
+            max_body_size = get_webhook_max_body_size()
+            try:
+                content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                content_length = 0
+            # Requests without a Content-Length are read one byte past the limit at most.
+            body = b'' if content_length > max_body_size else request.read(max_body_size + 1)
+            if content_length > max_body_size or len(body) > max_body_size:
+                logger.warning('Rejected a %s webhook over %s bytes.', event_class.__name__, max_body_size)
+                return HttpResponse(status=413)
+
+            if getattr(settings, 'HYPERPAY_VERIFY_SALEOR_SIGNATURE', True):
+                try:
+                    verify_saleor_signature(body, request.headers.get('Saleor-Signature'))
+                except SaleorSignatureError as exc:
+                    logger.warning('Rejected a %s webhook: %s', event_class.__name__, exc)
+                    return HttpResponse(status=401)
+
+            try:
+                payload = read_webhook_payload(body, schema)
+            except WebhookPayloadError as exc:
+                logger.warning('Rejected an invalid %s webhook: %s', event_class.__name__, exc)
+                return HttpResponse(status=400)
+
+            event = event_class.from_payload(payload)
+            logger.info('Received a %s webhook issued at %s.', event_class.__name__, event.issued_at)
+            return view(request, event)
+
+        @csrf_exempt
+        @require_POST
+        @wraps(view)
+        def wrapper(request):
+            with track_stage('webhook_' + view.__name__) as stage:
+                response = handle(request)
+                stage.result = '{}xx'.format(response.status_code // 100)
+            return response
+        return wrapper
+    return decorator
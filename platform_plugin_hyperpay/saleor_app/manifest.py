@@ -1,10 +1,21 @@
 """Defines the manifest for the Saleor app."""
 
+import hashlib
+
 from django.conf import settings
-from platform_plugin_hyperpay.saleor_app.client.subscriptions import TRANSACTION_INITIALIZE, PAYMENT_GATEWAY_INITIALIZE_SESSION
+from platform_plugin_hyperpay.saleor_app.client.subscriptions import (
+    CHECKOUT_UPDATED,
+    PAYMENT_GATEWAY_INITIALIZE_SESSION,
+    TRANSACTION_INITIALIZE,
+)
+
+from platform_plugin_hyperpay.serialization import dumps
 
 HYPERPAY_APP_ID = "platform.plugin.hyperpay"
 
+# Serialized manifest and its ETag, along with the LMS_ROOT_URL they were built for.
+_serialized_manifest = (None, None, None)
+
 
 def get_app_manifest():
     """
@@ -72,8 +83,36 @@ def get_app_manifest():
             'targetUrl': f'{settings.LMS_ROOT_URL}/hyperpay/saleor-app/api/webhooks/payment-gateway-initialize-session',
             'isActive': True,
           },
+          {
+            'name': 'Checkout Updated',
+            'asyncEvents': ['CHECKOUT_UPDATED',],
+            'query':  CHECKOUT_UPDATED,
+            'targetUrl': f'{settings.LMS_ROOT_URL}/hyperpay/saleor-app/api/webhooks/checkout-updated',
+            'isActive': True,
+          },
 
         ]
     }
 
     return manifest
+
+
+def get_serialized_app_manifest():
+    """
+    Return the serialized manifest and its ETag, built once for the current LMS_ROOT_URL.
+
+    Returns:
+        tuple: The JSON bytes of the manifest and the hex digest used as its ETag.
+    """
+    global _serialized_manifest  # pylint: disable=global-statement
+
+    root_url, content, etag = _serialized_manifest
+    if root_url == settings.LMS_ROOT_URL:
+        return content, etag
+
+    # Concurrent first requests may build it more than once, with the same result.
+    root_url = settings.LMS_ROOT_URL
+    content = dumps(get_app_manifest())
+    etag = hashlib.sha256(content).hexdigest()
+    _serialized_manifest = (root_url, content, etag)
+    return content, etag
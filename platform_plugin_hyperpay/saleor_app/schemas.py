@@ -0,0 +1,84 @@
+"""
+Payload schemas of the Saleor webhooks, derived from their subscription documents.
+
+Saleor sends the selection of the ``event`` field of the subscription as the
+webhook payload, so the fields a payload must contain are exactly the ones
+selected there. The documents are parsed with graphql-core once, when the
+module is imported, and their selections, fragments resolved, are turned into
+nested dicts of ``field -> Field``.
+"""
+from typing import NamedTuple, Optional
+
+from graphql import FieldNode, FragmentDefinitionNode, FragmentSpreadNode, OperationDefinitionNode, parse
+
+from platform_plugin_hyperpay.exceptions import HyperPayException
+
+
+class WebhookPayloadError(HyperPayException):
+    """
+    The payload of a Saleor webhook does not match its subscription.
+    """
+
+
+class Field(NamedTuple):
+    # Sub-selection of the field, None for scalars.
+    selection: Optional[dict]
+    # Fields selected through an inline fragment are only present for some types.
+    optional: bool
+
+
+def _build(selection_set, fragments, optional=False):
+    """
+    Return the schema of a selection set, resolving its fragments.
+    """
+    schema = {}
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            # The payload uses the alias of the field when it has one.
+            name = (selection.alias or selection.name).value
+            sub_selection = None
+            if selection.selection_set is not None:
+                sub_selection = _build(selection.selection_set, fragments)
+            schema[name] = Field(sub_selection, optional)
+        elif isinstance(selection, FragmentSpreadNode):
+            schema.update(_build(fragments[selection.name.value].selection_set, fragments, optional))
+        else:
+            schema.update(_build(selection.selection_set, fragments, optional=True))
+    return schema
+
+
+def compile_subscription(document):
+    """
+    Return the schema of the payload of the webhook of a subscription document.
+    """
+    definitions = parse(document).definitions
+    fragments = {
+        definition.name.value: definition
+        for definition in definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    for definition in definitions:
+        if not isinstance(definition, OperationDefinitionNode) or definition.operation.value != 'subscription':
+            continue
+        for selection in definition.selection_set.selections:
+            if isinstance(selection, FieldNode) and selection.name.value == 'event' and selection.selection_set:
+                return _build(selection.selection_set, fragments)
+    raise ValueError('The subscription does not select an event.')
+
+
+def validate_payload(schema, payload, path='event'):
+    """
+    Raise WebhookPayloadError if the payload does not contain the fields selected by the schema.
+    """
+    if not isinstance(payload, dict):
+        raise WebhookPayloadError('{} must be an object.'.format(path))
+    for name, field in schema.items():
+        if name not in payload:
+            if field.optional:
+                continue
+            raise WebhookPayloadError('{}.{} is missing.'.format(path, name))
+        value = payload[name]
+        if field.selection is None or value is None:
+            continue
+        for item in value if isinstance(value, list) else (value,):
+            validate_payload(field.selection, item, '{}.{}'.format(path, name))
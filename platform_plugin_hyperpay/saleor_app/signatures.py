@@ -0,0 +1,220 @@
+"""
+Verification of the ``Saleor-Signature`` of the Saleor webhooks.
+
+Saleor signs the body of every webhook with a detached JWS (RS256, with an
+unencoded payload as per RFC 7797) using a key published in the JWKS of its
+domain. The keys of each domain are fetched once per process and kept as
+public key objects, they are fetched again when they expire or when a webhook
+is signed with an unknown ``kid``, e.g. after Saleor rotated its keys.
+
+A single request per domain fetches the keys, without blocking the webhooks
+that can be verified with the keys already known, and at most once every
+``min_refresh_interval`` seconds. When the JWKS cannot be fetched the last
+keys fetched keep being used.
+"""
+import base64
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
+from django.conf import settings
+
+from platform_plugin_hyperpay.exceptions import HyperPayException
+from platform_plugin_hyperpay.serialization import JSONDecodeError, loads
+from platform_plugin_hyperpay.transport import http_get
+
+logger = logging.getLogger(__name__)
+
+JWKS_PATH = '/.well-known/jwks.json'
+
+DEFAULT_JWKS_CONFIG = {
+    'ttl': 60 * 60,
+    # Minimum time between two fetches, so forged signatures or an outage of Saleor do not cause one per webhook.
+    'min_refresh_interval': 30,
+    # How long a webhook signed with an unknown kid waits for the fetch in progress.
+    'refresh_wait_timeout': 10,
+}
+
+
+class SaleorSignatureError(HyperPayException):
+    """
+    The signature of a Saleor webhook is missing or invalid.
+    """
+
+
+def get_jwks_config():
+    """
+    Return the JWKS cache configuration, merging ``HYPERPAY_SALEOR_JWKS`` over the defaults.
+    """
+    config = dict(DEFAULT_JWKS_CONFIG)
+    config.update(getattr(settings, 'HYPERPAY_SALEOR_JWKS', {}))
+    return config
+
+
+def base64url_decode(value):
+    """
+    Decode unpadded base64url.
+    """
+    return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+
+
+def base64url_encode(value):
+    """
+    Encode bytes as unpadded base64url.
+    """
+    return base64.urlsafe_b64encode(value).rstrip(b'=')
+
+
+def parse_jwks(jwks):
+    """
+    Return the RSA public keys of a JWKS, by kid.
+    """
+    keys = {}
+    for jwk in jwks.get('keys', []):
+        if jwk.get('kty') != 'RSA' or 'kid' not in jwk:
+            continue
+        numbers = RSAPublicNumbers(
+            int.from_bytes(base64url_decode(jwk['e']), 'big'),
+            int.from_bytes(base64url_decode(jwk['n']), 'big'),
+        )
+        keys[jwk['kid']] = numbers.public_key()
+    return keys
+
+
+class DomainKeys:
+    """
+    Public keys of a Saleor domain, by kid, and the state of their refresh.
+    """
+
+    __slots__ = ('keys', 'fetched_at', 'attempted_at', 'refreshing')
+
+    def __init__(self):
+        self.keys = {}
+        # Monotonic times of the last successful fetch and of the last attempt.
+        self.fetched_at = None
+        self.attempted_at = None
+        # Set when the fetch in progress, if any, is done.
+        self.refreshing = None
+
+    def is_fresh(self, now, ttl):
+        return self.fetched_at is not None and now - self.fetched_at <= ttl
+
+
+class JWKSCache:
+    """
+    Public keys of the Saleor domains, by domain and kid.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_jwks_config()
+        self._domains = {}
+        # Guards the refresh state of the domains, never held during a fetch.
+        self._lock = threading.Lock()
+
+    def _fetch(self, domain_url):
+        """
+        Fetch and parse the JWKS of the domain.
+        """
+        try:
+            response = http_get(domain_url + JWKS_PATH)
+            response.raise_for_status()
+            return parse_jwks(loads(response.content))
+        except Exception as exc:
+            raise SaleorSignatureError('Could not fetch the JWKS of {}. {}'.format(domain_url, exc))
+
+    def _refresh(self, domain_url, domain, done):
+        """
+        Fetch the keys of the domain, keeping the previous ones if the fetch fails.
+        """
+        try:
+            keys = self._fetch(domain_url)
+        except SaleorSignatureError as exc:
+            logger.warning('%s Keeping the %s keys fetched before.', exc, len(domain.keys))
+        else:
+            domain.keys = keys
+            domain.fetched_at = time.monotonic()
+        finally:
+            with self._lock:
+                domain.refreshing = None
+            done.set()
+
+    def get_key(self, domain_url, kid):
+        """
+        Return the public key of the domain with the kid, fetching the JWKS when needed.
+        """
+        now = time.monotonic()
+        domain = self._domains.get(domain_url)
+        if domain is not None and kid in domain.keys and domain.is_fresh(now, self.config['ttl']):
+            return domain.keys[kid]
+
+        with self._lock:
+            domain = self._domains.setdefault(domain_url, DomainKeys())
+            refreshing = domain.refreshing
+            throttled = (
+                domain.attempted_at is not None and
+                now - domain.attempted_at < self.config['min_refresh_interval']
+            )
+            refresh = refreshing is None and not throttled
+            if refresh:
+                domain.refreshing = refreshing = threading.Event()
+                domain.attempted_at = now
+
+        if refresh:
+            self._refresh(domain_url, domain, refreshing)
+        elif refreshing is not None and kid not in domain.keys:
+            refreshing.wait(self.config['refresh_wait_timeout'])
+
+        try:
+            return domain.keys[kid]
+        except KeyError:
+            raise SaleorSignatureError('Unknown signing key {} for {}.'.format(kid, domain_url)) from None
+
+    def clear(self):
+        """
+        Drop every key.
+        """
+        with self._lock:
+            self._domains = {}
+
+
+jwks_cache = JWKSCache()
+
+
+def get_saleor_domain_url():
+    """
+    Return the scheme and host of the configured Saleor API, where its JWKS is published.
+    """
+    url = urlsplit(settings.SALEOR_API_URL)
+    return '{}://{}'.format(url.scheme, url.netloc)
+
+
+def verify_saleor_signature(body, signature):
+    """
+    Raise SaleorSignatureError unless the signature is a valid JWS of the body by the configured Saleor.
+    """
+    if not signature:
+        raise SaleorSignatureError('The webhook is not signed.')
+    try:
+        encoded_header, encoded_payload, encoded_signature = signature.split('.')
+        header = loads(base64url_decode(encoded_header))
+        signature_bytes = base64url_decode(encoded_signature)
+    except (ValueError, JSONDecodeError) as exc:
+        raise SaleorSignatureError('Malformed signature. {}'.format(exc))
+    if not isinstance(header, dict):
+        raise SaleorSignatureError('Malformed signature header.')
+    if encoded_payload:
+        raise SaleorSignatureError('The signature must be detached.')
+    if header.get('alg') != 'RS256':
+        raise SaleorSignatureError('Unsupported signature algorithm {}.'.format(header.get('alg')))
+
+    payload = body if header.get('b64') is False else base64url_encode(body)
+    key = jwks_cache.get_key(get_saleor_domain_url(), header.get('kid'))
+    try:
+        key.verify(signature_bytes, encoded_header.encode() + b'.' + payload, padding.PKCS1v15(), hashes.SHA256())
+    except InvalidSignature:
+        raise SaleorSignatureError('Invalid signature.') from None
@@ -0,0 +1,87 @@
+"""
+Single-record stores shared by every worker and read through a per-process copy.
+
+The record lives in the database and its version, increased on every save, is
+published in the cache. Each process keeps the last values it read: the
+version is checked at most every ``check_interval`` seconds and the record is
+only read again from the database when it changed.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+RECORD_PK = 1
+
+
+class VersionedRecordStore:
+    """
+    Versioned single record of a model with ``version`` and ``modified`` fields.
+    """
+
+    def __init__(self, model, fields, version_cache_key, check_interval_setting, default_check_interval=5):
+        self.model = model
+        self.fields = fields
+        self.version_cache_key = version_cache_key
+        self.check_interval_setting = check_interval_setting
+        self.default_check_interval = default_check_interval
+        # (version, values, monotonic time of the last version check) of this process.
+        self._local = (None, None, 0)
+
+    def get_check_interval(self):
+        """
+        Return how many seconds a process uses its values before checking the version again.
+        """
+        return getattr(settings, self.check_interval_setting, self.default_check_interval)
+
+    def _to_values(self, record):
+        return {field: getattr(record, field) for field in self.fields}
+
+    def _load(self):
+        """
+        Read the record from the database and publish its version.
+        """
+        record = self.model.objects.filter(pk=RECORD_PK).first()
+        if record is None:
+            version, values = 0, dict.fromkeys(self.fields, '')
+        else:
+            version, values = record.version, self._to_values(record)
+        cache.add(self.version_cache_key, version, timeout=None)
+        return version, values
+
+    def get(self):
+        """
+        Return the values of the record as a dict keyed by field.
+
+        The returned dict is shared, do not modify it.
+        """
+        version, values, checked_at = self._local
+        now = time.monotonic()
+        if values is not None and now - checked_at < self.get_check_interval():
+            return values
+
+        if values is None or cache.get(self.version_cache_key) != version:
+            version, values = self._load()
+        self._local = (version, values, now)
+        return values
+
+    def save(self, **values):
+        """
+        Store the given fields of the record and publish its new version.
+        """
+        values = {field: values[field] or '' for field in self.fields if field in values}
+        with transaction.atomic():
+            self.model.objects.get_or_create(pk=RECORD_PK)
+            self.model.objects.filter(pk=RECORD_PK).update(
+                version=F('version') + 1,
+                modified=timezone.now(),
+                **values
+            )
+            record = self.model.objects.get(pk=RECORD_PK)
+
+        transaction.on_commit(lambda: cache.set(self.version_cache_key, record.version, timeout=None))
+        self._local = (record.version, self._to_values(record), time.monotonic())
+        return self._local[1]
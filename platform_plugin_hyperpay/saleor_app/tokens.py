@@ -0,0 +1,35 @@
+"""
+Saleor app token shared by every worker.
+
+The token received when Saleor installs the app is stored in a single database
+record read through a per-process copy, whose version is checked at most every
+``HYPERPAY_SALEOR_TOKEN_CHECK_INTERVAL`` seconds, see ``VersionedRecordStore``.
+Until the app is registered, the ``SALEOR_API_TOKEN`` setting is used.
+"""
+from django.conf import settings
+
+from platform_plugin_hyperpay.models import SaleorAppToken
+from platform_plugin_hyperpay.saleor_app.store import VersionedRecordStore
+
+TOKEN_VERSION_CACHE_KEY = 'hyperpay:saleor-app-token:version'
+
+token_store = VersionedRecordStore(
+    SaleorAppToken,
+    ('token',),
+    TOKEN_VERSION_CACHE_KEY,
+    'HYPERPAY_SALEOR_TOKEN_CHECK_INTERVAL',
+)
+
+
+def get_saleor_api_token():
+    """
+    Return the current Saleor app token.
+    """
+    return token_store.get()['token'] or getattr(settings, 'SALEOR_API_TOKEN', '')
+
+
+def save_saleor_api_token(token):
+    """
+    Store the token received from Saleor for every worker.
+    """
+    token_store.save(token=token)
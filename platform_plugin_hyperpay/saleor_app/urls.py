@@ -6,7 +6,11 @@ from platform_plugin_hyperpay.saleor_app.views import (
     get_saleor_app_manifest,
     register_saleor_app_token,
 )
-from platform_plugin_hyperpay.saleor_app.webhooks import transaction_initialize, payment_gateway_initialize_session
+from platform_plugin_hyperpay.saleor_app.webhooks import (
+    checkout_updated,
+    payment_gateway_initialize_session,
+    transaction_initialize,
+)
 
 app_name = 'platform_plugin_hyperpay'  # pylint: disable=invalid-name
 
@@ -16,4 +20,5 @@ urlpatterns = [
     path("", configure_saleor_app, name="saleor-app"),
     path("api/webhooks/transaction-initialize-session", transaction_initialize, name="transaction-initialize"),  # Placeholder for webhooks
     path("api/webhooks/payment-gateway-initialize-session", payment_gateway_initialize_session, name="payment-gateway-initialize"),
+    path("api/webhooks/checkout-updated", checkout_updated, name="checkout-updated"),
 ]
@@ -1,46 +1,99 @@
 """Views for Saleor Hyperpay app integration."""
 
-import json
 import logging
 
 from django.conf import settings
-from django.core.cache import cache
-from django.http import JsonResponse
+from django.http import HttpResponse
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
-from platform_plugin_hyperpay.saleor_app.manifest import get_app_manifest
+from django.views.decorators.http import condition, require_POST
+
+from platform_plugin_hyperpay.exceptions import HyperPayException
+from platform_plugin_hyperpay.saleor_app.configuration import (
+    CONFIGURATION_FIELDS,
+    get_saleor_app_configuration,
+    save_saleor_app_configuration,
+)
+from platform_plugin_hyperpay.saleor_app.client.graphql import execute
+from platform_plugin_hyperpay.saleor_app.client.queries import APP_ID
+from platform_plugin_hyperpay.saleor_app.manifest import get_serialized_app_manifest
+from platform_plugin_hyperpay.saleor_app.tokens import save_saleor_api_token
+from platform_plugin_hyperpay.serialization import JSONDecodeError, JsonResponse, loads
 
 logger = logging.getLogger(__name__)
 
 
+def get_app_manifest_etag(request):  # pylint: disable=unused-argument
+    """
+    Return the ETag of the Saleor app manifest.
+    """
+    return get_serialized_app_manifest()[1]
+
+
 @csrf_exempt
+@condition(etag_func=get_app_manifest_etag)
 def get_saleor_app_manifest(request):
     """
     Provide the Saleor app manifest.
     This endpoint returns the application manifest that Saleor uses to register
-    and configure the application within its ecosystem.
+    and configure the application within its ecosystem. The manifest is serialized
+    once and conditional requests matching its ETag are answered with a 304.
     Args:
         request: The HTTP request object.
     Returns:
-        JsonResponse: A JSON response containing the application manifest.
+        HttpResponse: A JSON response containing the application manifest.
+    """
+    content, _ = get_serialized_app_manifest()
+    return HttpResponse(content, content_type="application/json")
+
+
+def is_saleor_api_url(api_url):
+    """
+    Return whether the URL is the one of the Saleor API this app is installed on.
     """
-    return JsonResponse(get_app_manifest(), safe=True)
+    return bool(api_url) and api_url.rstrip("/") == settings.SALEOR_API_URL.rstrip("/")
+
+
+def is_valid_saleor_api_token(token):
+    """
+    Return whether the token authenticates an app against the Saleor API.
+    """
+    try:
+        data = execute(APP_ID, token=token)
+    except HyperPayException as exc:
+        logger.warning("The Saleor app token could not be verified. %s", exc)
+        return False
+    return bool(data.get("app"))
 
 
 @csrf_exempt
+@require_POST
 def register_saleor_app_token(request):
     """
     Register the authentication token received from Saleor.
     This endpoint receives and stores the authentication token that will be used
-    for subsequent API calls to the Saleor API.
+    for subsequent API calls to the Saleor API. As it is called anonymously, the
+    request must come from the configured Saleor API and the token must authenticate
+    the app against it before it replaces the current one.
     Args:
         request: The HTTP request object containing the auth token.
     Returns:
         JsonResponse: A JSON response indicating the token was successfully received.
     """
-    payload = json.loads(request.body.decode("utf-8"))
-    token = payload.get("auth_token")
-    settings.SALEOR_API_TOKEN = token
+    if not is_saleor_api_url(request.headers.get("Saleor-Api-Url")):
+        return JsonResponse({"success": False, "message": "Unknown Saleor API."}, status=403)
+
+    try:
+        token = loads(request.body).get("auth_token")
+    except (JSONDecodeError, UnicodeDecodeError, AttributeError):
+        token = None
+    if not token or not isinstance(token, str):
+        return JsonResponse({"success": False, "message": "Missing auth_token."}, status=400)
+
+    if not is_valid_saleor_api_token(token):
+        return JsonResponse({"success": False, "message": "Invalid auth_token."}, status=403)
+
+    save_saleor_api_token(token)
 
     return JsonResponse(
         {"success": True, "message": "Token received successfully."},
@@ -51,35 +104,12 @@ def register_saleor_app_token(request):
 @csrf_exempt
 def configure_saleor_app(request):
     """
-    This view renders the configuration form and saves the data in cache.
+    This view renders the configuration form and saves the data in the versioned app configuration.
     """
     if request.method == "POST":
-        payment_url = request.POST.get('payment_url')
-        payment_button_image = request.POST.get('payment_button_image')
-        hyper_pay_api_base_url = request.POST.get('hyper_pay_api_base_url')
-        access_token = request.POST.get('access_token')
-
-        cache.set('payment_url', payment_url, timeout=36000)
-        cache.set('payment_button_image', payment_button_image, timeout=36000)
-        cache.set('hyper_pay_api_base_url', hyper_pay_api_base_url, timeout=36000)
-        cache.set('access_token', access_token, timeout=36000)
-
-        return render(request, 'saleor_app/configure.html', {
-            'payment_url': payment_url,
-            'payment_button_image': payment_button_image,
-            'hyper_pay_api_base_url': hyper_pay_api_base_url,
-            'access_token': access_token,
-            'success': True,
-        })
-    payment_url = cache.get('payment_url', '')
-    payment_button_image = cache.get('payment_button_image', '')
-    hyper_pay_api_base_url = cache.get('hyper_pay_api_base_url', '')
-    access_token = cache.get('access_token', '')
-
-    return render(request, 'saleor_app/configure.html', {
-        'payment_url': payment_url,
-        'payment_button_image': payment_button_image,
-        'hyper_pay_api_base_url': hyper_pay_api_base_url,
-        'access_token': access_token,
-        'success': False,
-    })
+        configuration = save_saleor_app_configuration(
+            **{field: request.POST.get(field) for field in CONFIGURATION_FIELDS}
+        )
+        return render(request, 'saleor_app/configure.html', {**configuration, 'success': True})
+
+    return render(request, 'saleor_app/configure.html', {**get_saleor_app_configuration(), 'success': False})
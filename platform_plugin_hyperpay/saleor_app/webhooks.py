@@ -1,29 +1,28 @@
-import json
 import logging
 
-from django.core.cache import cache
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
+from platform_plugin_hyperpay.processors import invalidate_saleor_checkout_data
+from platform_plugin_hyperpay.saleor_app.configuration import get_saleor_app_configuration
+from platform_plugin_hyperpay.saleor_app.ingestion import (
+    CheckoutUpdatedEvent,
+    PaymentGatewayInitializeSessionEvent,
+    TransactionInitializeSessionEvent,
+    saleor_webhook,
+)
+from platform_plugin_hyperpay.serialization import JsonResponse
 
 logger = logging.getLogger(__name__)
 
-@csrf_exempt
-def transaction_initialize(request):
+@saleor_webhook(TransactionInitializeSessionEvent)
+def transaction_initialize(request, event):
     """
     Handle the transaction init from Saleor.
     Args:
         request: The HTTP request object containing the webhook payload.
+        event: The TransactionInitializeSessionEvent of the webhook.
     Returns:
         JsonResponse: A JSON response indicating success or failure.
     """
-    payload = {}
-    if request.method == "POST":
-        payload = json.loads(request.body)
-    payload = json.loads(request.body)
-    logger.info("received webhook payload: %s", payload)
-
-    amount = payload.get("action",{}).get("amount")
-    data = payload.get("data", {})
+    data = event.data if isinstance(event.data, dict) else {}
     response = {
         "pspReference": data.get("id"),
         "result": "CHARGE_SUCCESS",
@@ -31,10 +30,10 @@ def transaction_initialize(request):
         "description": data.get("description"),
         "message": "Great success!",
         "actions": "REFUND", # todo create this function
-        "amount": amount,
+        "amount": event.amount,
         "externalUrl": "https://example.com",
       }
-    logger.info("return response webhook payload: %s", response)
+    logger.info("Initialized transaction %s with HyperPay result code %s.", event.transaction_id, data.get("code"))
 
     return JsonResponse(
         response,
@@ -42,35 +41,40 @@ def transaction_initialize(request):
     )
 
 
-@csrf_exempt
-def payment_gateway_initialize_session(request):
+@saleor_webhook(PaymentGatewayInitializeSessionEvent)
+def payment_gateway_initialize_session(request, event):  # pylint: disable=unused-argument
     """
     Handle the payment_gateway_init session from Saleor.
     This endpoint receives notifications when orders are fully paid in the Saleor system
     and enrolls the user in the specified course.
     Args:
         request: The HTTP request object containing the webhook payload.
+        event: The PaymentGatewayInitializeSessionEvent of the webhook.
     Returns:
         JsonResponse: A JSON response indicating success or failure.
     """
-    payload = {}
-    if request.method == "POST":
-        payload = json.loads(request.body)
-    logger.info("received webhook payload: %s", payload)
-
-    amount = payload.get("action",{}).get("amount")
-    data = payload.get("data", {})
     response = {
-        "data": {
-            "payment_url": cache.get('payment_url', ''),
-            "payment_button_image" : cache.get('payment_button_image', ''),
-            "hyper_pay_api_base_url": cache.get('hyper_pay_api_base_url', ''),
-            "access_token": cache.get('access_token', ''),
-        }
+        "data": get_saleor_app_configuration(),
       }
-    logger.info("return response webhook payload: %s", response)
 
     return JsonResponse(
         response,
         status=200,
     )
+
+
+@saleor_webhook(CheckoutUpdatedEvent)
+def checkout_updated(request, event):  # pylint: disable=unused-argument
+    """
+    Handle the checkout updated event from Saleor.
+    Drops the cached snapshot of the checkout so the next payment page render reads it again.
+    Args:
+        request: The HTTP request object containing the webhook payload.
+        event: The CheckoutUpdatedEvent of the webhook.
+    Returns:
+        JsonResponse: An empty JSON response acknowledging the event.
+    """
+    if event.checkout_id:
+        invalidate_saleor_checkout_data(event.checkout_id)
+
+    return JsonResponse({}, status=200)
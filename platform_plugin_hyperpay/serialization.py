@@ -0,0 +1,77 @@
+"""
+JSON encoding and decoding of the webhook and API traffic.
+
+``orjson`` is used when it is installed (``platform-plugin-hyperpay[orjson]``),
+otherwise the standard library. Both backends accept the same types as
+Django's ``JsonResponse``: values orjson does not support natively, such as
+Decimal or lazy translations, go through ``DjangoJSONEncoder``.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse as DjangoJsonResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+# Both backends raise a subclass of it on invalid documents.
+JSONDecodeError = json.JSONDecodeError
+
+_django_encoder = DjangoJSONEncoder()
+
+
+if orjson is not None:
+    # Datetimes are left to DjangoJSONEncoder, which formats them differently than orjson.
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(obj):
+        """
+        Serialize the object to JSON bytes.
+        """
+        return orjson.dumps(obj, default=_django_encoder.default, option=ORJSON_OPTIONS)
+
+    def loads(data):
+        """
+        Deserialize JSON from bytes or str.
+        """
+        return orjson.loads(data)
+else:
+    def dumps(obj):
+        """
+        Serialize the object to JSON bytes.
+        """
+        return json.dumps(obj, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+
+    def loads(data):
+        """
+        Deserialize JSON from bytes or str.
+        """
+        return json.loads(data)
+
+
+class JsonResponse(DjangoJsonResponse):
+    """
+    Drop-in replacement of Django's JsonResponse serializing with the fastest backend available.
+
+    A custom ``encoder`` or ``json_dumps_params`` only works with the standard
+    library, so the content is serialized by Django in that case.
+    """
+
+    def __init__(self, data, encoder=DjangoJSONEncoder, safe=True, json_dumps_params=None, **kwargs):
+        if encoder is not DjangoJSONEncoder or json_dumps_params:
+            super().__init__(data, encoder=encoder, safe=safe, json_dumps_params=json_dumps_params, **kwargs)
+            return
+
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                'In order to allow non-dict objects to be serialized set the safe parameter to False.'
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        super(DjangoJsonResponse, self).__init__(  # pylint: disable=bad-super-call
+            content=dumps(data),
+            **kwargs
+        )
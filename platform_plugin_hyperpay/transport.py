@@ -0,0 +1,184 @@
+"""
+HTTP transport used to talk to the HyperPay (oppwa) API.
+
+Every worker process keeps a single ``requests.Session`` backed by a
+connection pool, so consecutive calls to oppwa reuse the same keep-alive
+TLS connection instead of performing a new handshake each time. The async
+views use an ``httpx.AsyncClient`` configured from the same settings, one
+per event loop.
+"""
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_HTTP_CONFIG = {
+    'pool_connections': 4,
+    'pool_maxsize': 10,
+    'connect_timeout': 5,
+    'read_timeout': 30,
+    'max_retries': 2,
+    'backoff_factor': 0.3,
+}
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_http_config():
+    """
+    Return the transport configuration, merging ``HYPERPAY_HTTP_CONFIG`` over the defaults.
+    """
+    config = dict(DEFAULT_HTTP_CONFIG)
+    config.update(getattr(settings, 'HYPERPAY_HTTP_CONFIG', {}))
+    return config
+
+
+def get_timeout():
+    """
+    Return the ``(connect, read)`` timeout tuple used for every request.
+    """
+    config = get_http_config()
+    return (config['connect_timeout'], config['read_timeout'])
+
+
+def _build_session():
+    """
+    Build a session with a pooled adapter that only retries idempotent requests.
+    """
+    config = get_http_config()
+    retries = Retry(
+        total=config['max_retries'],
+        connect=config['max_retries'],
+        read=config['max_retries'],
+        status=config['max_retries'],
+        backoff_factor=config['backoff_factor'],
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config['pool_connections'],
+        pool_maxsize=config['pool_maxsize'],
+        max_retries=retries,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_http_session():
+    """
+    Return the session shared by the current worker process.
+
+    The session is rebuilt after a fork so that workers never share sockets
+    inherited from their parent.
+    """
+    global _session, _session_pid  # pylint: disable=global-statement
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+
+def reset_http_session():
+    """
+    Close the current session so the next call builds one with fresh settings.
+    """
+    global _session, _session_pid  # pylint: disable=global-statement
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_pid = None
+
+
+def http_get(url, **kwargs):
+    """
+    Perform a GET request through the shared session.
+    """
+    kwargs.setdefault('timeout', get_timeout())
+    return get_http_session().get(url, **kwargs)
+
+
+def http_post(url, data=None, **kwargs):
+    """
+    Perform a POST request through the shared session.
+
+    POST requests are never retried by the adapter as creating a checkout is not idempotent.
+    """
+    kwargs.setdefault('timeout', get_timeout())
+    return get_http_session().post(url, data, **kwargs)
+
+
+def _build_async_client():
+    """
+    Build an async client with the same pool size and timeouts as the sync session.
+    """
+    config = get_http_config()
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config['pool_maxsize'],
+            max_keepalive_connections=config['pool_maxsize'],
+        ),
+        timeout=httpx.Timeout(config['read_timeout'], connect=config['connect_timeout']),
+        transport=httpx.AsyncHTTPTransport(retries=config['max_retries']),
+    )
+
+
+def get_async_http_client():
+    """
+    Return the async client bound to the running event loop.
+
+    httpx connection pools cannot be shared between event loops, so one client
+    is kept per loop and dropped together with it.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _build_async_client()
+        _async_clients[loop] = client
+    return client
+
+
+async def async_http_get(url, **kwargs):
+    """
+    Perform a non-blocking GET request through the loop's client.
+    """
+    return await get_async_http_client().get(url, **kwargs)
+
+
+def encode_form_data(data):
+    """
+    Return the form fields of ``data`` as ``requests`` sends them.
+
+    ``requests`` drops the fields whose value is None and converts the others
+    with ``str``, while httpx sends None as an empty field and booleans as
+    ``true``/``false``.
+    """
+    return {key: str(value) for key, value in data.items() if value is not None}
+
+
+async def async_http_post(url, data=None, **kwargs):
+    """
+    Perform a non-blocking POST request through the loop's client.
+
+    Form data is encoded as by ``http_post``, so oppwa receives the same payload from both views.
+    """
+    if isinstance(data, dict):
+        data = encode_form_data(data)
+    return await get_async_http_client().post(url, data=data, **kwargs)
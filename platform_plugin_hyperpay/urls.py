@@ -7,6 +7,7 @@ from platform_plugin_hyperpay import views
 
 urlpatterns = [
     path('info/', views.info_view, name='hyperpay-info'),
+    path('metrics/', views.metrics_view, name='hyperpay-metrics'),
     path('payment/', include('platform_plugin_hyperpay.payment.urls', namespace='hyperpay-payment')),
     path('saleor-app/', include('platform_plugin_hyperpay.saleor_app.urls', namespace='hyperpay-saleor-app')),
 ]
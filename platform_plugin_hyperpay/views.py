@@ -1,30 +1,71 @@
 """Generic views for the platform plugin hyperpay."""
 
+import hmac
+from functools import lru_cache
 from os.path import dirname, realpath
-from subprocess import CalledProcessError, check_output
+from subprocess import CalledProcessError, TimeoutExpired, check_output
 
-from django.http import JsonResponse
+from django.http import HttpResponse
 
 from platform_plugin_hyperpay import __version__ as plugin_version
+from platform_plugin_hyperpay.metrics import CONTENT_TYPE, get_metrics_config, render_metrics
+from platform_plugin_hyperpay.serialization import JsonResponse
 
 
-def info_view(request):
+@lru_cache(maxsize=None)
+def get_build_info():
     """
-    Provide basic information about the plugin.
+    Return the version of the plugin and the git commit hash it was loaded from.
 
-    This view returns a JSON response with the version of the plugin and the git commit hash.
+    The commit is resolved on first use and kept for the lifetime of the process,
+    it is empty when the plugin is not installed from a git checkout or git is missing.
     """
     try:
         working_dir = dirname(realpath(__file__))
-        git_data = check_output(["git", "rev-parse", "HEAD"], cwd=working_dir)
+        git_data = check_output(["git", "rev-parse", "HEAD"], cwd=working_dir, timeout=5)
         git_data = git_data.decode().rstrip('\r\n')
-    except CalledProcessError:
+    except (CalledProcessError, OSError, TimeoutExpired):
         git_data = ""
 
-    response_data = {
+    return {
         "version": plugin_version,
         "name": "platform-plugin-hyperpay",
         "git": git_data,
     }
 
-    return JsonResponse(response_data)
+
+def info_view(request):
+    """
+    Provide basic information about the plugin.
+
+    This view returns a JSON response with the version of the plugin and the git commit hash.
+    """
+    return JsonResponse(get_build_info())
+
+
+def is_metrics_scrape_allowed(request, config):
+    """
+    Return whether the request can read the metrics: with the bearer token, from an allowed address or as staff.
+    """
+    bearer_token = config['bearer_token']
+    authorization = request.headers.get('Authorization', '')
+    if bearer_token and authorization.startswith('Bearer '):
+        if hmac.compare_digest(authorization[len('Bearer '):].encode(), bearer_token.encode()):
+            return True
+    if request.META.get('REMOTE_ADDR') in config['allowed_ips']:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(config['allow_staff'] and user is not None and user.is_active and user.is_staff)
+
+
+def metrics_view(request):
+    """
+    Expose the metrics of the payment flow recorded by this process, in the Prometheus text format.
+
+    Scrapes are authorized by ``HYPERPAY_METRICS``, unauthorized requests get a 401.
+    """
+    if not is_metrics_scrape_allowed(request, get_metrics_config()):
+        response = HttpResponse('Unauthorized', status=401, content_type='text/plain')
+        response['WWW-Authenticate'] = 'Bearer realm="hyperpay-metrics"'
+        return response
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
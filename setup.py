@@ -143,6 +143,10 @@ setup(
 
     include_package_data=True,
     install_requires=load_requirements('requirements/base.in'),
+    extras_require={
+        'orjson': ['orjson'],
+        'parquet': ['pyarrow'],
+    },
     python_requires=">=3.11",
     license="AGPL 3.0",
     zip_safe=False,
@@ -0,0 +1,44 @@
+"""
+Fixtures shared by the `platform_plugin_hyperpay` tests.
+"""
+import pytest
+from django.core.cache import cache
+
+PROCESSOR_CONFIGURATION = {
+    'access_token': 'access-token',
+    'entity_id': 'entity-id',
+    'return_url': 'https://lms.example.com/return',
+    'currency': 'SAR',
+    'salt': 'salt',
+    'hyper_pay_api_base_url': 'https://test.oppwa.com',
+}
+
+
+@pytest.fixture
+def processor_configuration():
+    """
+    Return a valid ``HYPERPAY_CONFIG`` entry.
+    """
+    return dict(PROCESSOR_CONFIGURATION)
+
+
+@pytest.fixture
+def hyperpay_config(settings):
+    """
+    Configure both processors, which rebuilds the registry.
+    """
+    settings.HYPERPAY_CONFIG = {
+        'hyperpay': dict(PROCESSOR_CONFIGURATION),
+        'hyperpay_mada': dict(PROCESSOR_CONFIGURATION, entity_id='mada-entity-id'),
+    }
+    return settings.HYPERPAY_CONFIG
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Start and end every test with an empty cache.
+    """
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,75 @@
+"""
+Tests for the `platform_plugin_hyperpay` Django admin.
+"""
+import pytest
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from platform_plugin_hyperpay.models import SaleorAppConfiguration
+from platform_plugin_hyperpay.saleor_app.configuration import (
+    CONFIGURATION_VERSION_CACHE_KEY,
+    save_saleor_app_configuration,
+)
+from platform_plugin_hyperpay.saleor_app.store import RECORD_PK
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def configuration():
+    save_saleor_app_configuration(
+        payment_url='https://pay.example.com/old',
+        payment_button_image='https://cdn.example.com/button.png',
+        hyper_pay_api_base_url='https://test.oppwa.com',
+        access_token='secret-access-token',
+    )
+    return SaleorAppConfiguration.objects.get(pk=RECORD_PK)
+
+
+@pytest.fixture
+def admin_request(admin_user):
+    request = RequestFactory().post('/admin/')
+    request.user = admin_user
+    return request
+
+
+@pytest.fixture
+def model_admin():
+    return site._registry[SaleorAppConfiguration]  # pylint: disable=protected-access
+
+
+def test_access_token_is_not_shown(model_admin, admin_request, configuration):
+    """
+    The change form does not include the access token.
+    """
+    form = model_admin.get_form(admin_request, configuration)
+
+    assert 'access_token' not in form.base_fields
+
+
+def test_admin_edit_publishes_a_new_version(
+    model_admin, admin_request, configuration, django_capture_on_commit_callbacks
+):
+    """
+    Saving the configuration from the admin bumps its version and publishes it, keeping the access token.
+    """
+    form = model_admin.get_form(admin_request, configuration)(
+        {
+            'payment_url': 'https://pay.example.com/new',
+            'payment_button_image': 'https://cdn.example.com/button.png',
+            'hyper_pay_api_base_url': 'https://eu-prod.oppwa.com',
+        },
+        instance=configuration,
+    )
+    assert form.is_valid(), form.errors
+
+    with django_capture_on_commit_callbacks(execute=True):
+        model_admin.save_model(admin_request, form.save(commit=False), form, change=True)
+
+    configuration.refresh_from_db()
+    assert configuration.version == 2
+    assert configuration.payment_url == 'https://pay.example.com/new'
+    assert configuration.hyper_pay_api_base_url == 'https://eu-prod.oppwa.com'
+    assert configuration.access_token == 'secret-access-token'
+    assert cache.get(CONFIGURATION_VERSION_CACHE_KEY) == 2
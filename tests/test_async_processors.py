@@ -0,0 +1,264 @@
+"""
+Tests for the `platform_plugin_hyperpay` async payment processors.
+"""
+from unittest import mock
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+import requests
+from asgiref.sync import async_to_sync
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import RequestFactory
+
+from platform_plugin_hyperpay import async_processors, background, processors, transport
+from platform_plugin_hyperpay.async_processors import AsyncHyperPay
+from platform_plugin_hyperpay.exceptions import HyperPayException
+from platform_plugin_hyperpay.models import CheckoutCompletion
+from platform_plugin_hyperpay.payment import views
+from platform_plugin_hyperpay.processors import HyperPay
+from platform_plugin_hyperpay.serialization import dumps
+
+pytestmark = pytest.mark.django_db
+
+SALEOR_CHECKOUT = {
+    'checkout': {
+        'id': 'saleor-checkout-id',
+        'email': 'learner@example.com',
+        'user': None,
+        'totalPrice': {'gross': {'amount': 115, 'currency': 'SAR'}},
+        'lines': [{
+            'quantity': 1,
+            'variant': {'name': 'Course', 'sku': None},
+            'unitPrice': {'gross': {'amount': 115}},
+            'totalPrice': {'gross': {'amount': 115}},
+        }],
+    },
+}
+
+
+CREATED_CHECKOUT = {
+    'id': 'hyperpay-checkout-id',
+    'integrity': 'sha384-integrity',
+    'result': {'code': HyperPay.RESULT_CODE_SUCCESSFULLY_CREATED_CHECKOUT},
+}
+RESOURCE_PATH = '/v1/checkouts/hyperpay-checkout-id/payment'
+
+
+def payment_status(code):
+    return {
+        'id': 'payment-id',
+        'ndc': 'hyperpay-checkout-id',
+        'merchantTransactionId': 'saleor-checkout-id',
+        'amount': '115.00',
+        'currency': 'SAR',
+        'result': {'code': code, 'description': 'Transaction result'},
+    }
+
+
+class RecordingAdapter(requests.adapters.BaseAdapter):
+    """
+    Transport adapter of the sync session recording the requests sent to oppwa.
+    """
+
+    def __init__(self, response_data):
+        super().__init__()
+        self.response_data = response_data
+        self.requests = []
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        self.requests.append(request)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = dumps(self.response_data)  # pylint: disable=protected-access
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def sync_oppwa():
+    adapter = RecordingAdapter(CREATED_CHECKOUT)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    with mock.patch.object(transport, 'get_http_session', return_value=session):
+        yield adapter
+
+
+@pytest.fixture
+def async_oppwa():
+    """
+    oppwa answering the async client, with the responses queued by path.
+    """
+    async_oppwa = mock.Mock(requests=[], responses={'/v1/checkouts': CREATED_CHECKOUT})
+
+    def handler(request):
+        async_oppwa.requests.append(request)
+        return httpx.Response(200, content=dumps(async_oppwa.responses[request.url.path]))
+
+    def build_client():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    with mock.patch.object(transport, '_build_async_client', build_client):
+        yield async_oppwa
+
+
+def payment_page_request():
+    request = RequestFactory().get('/payment/pay/', {'checkoutId': 'saleor-checkout-id'})
+    request.LANGUAGE_CODE = 'en-us'
+    return request
+
+
+@pytest.fixture
+def processor(processor_configuration):
+    return AsyncHyperPay(processor_configuration)
+
+
+@pytest.fixture
+def saleor_api():
+    """
+    Saleor API returning the checkout and initializing its transactions.
+    """
+    def execute(query, variables=None):  # pylint: disable=unused-argument
+        if query == processors.GET_CHECKOUT:
+            return SALEOR_CHECKOUT
+        return {'transactionInitialize': {'transaction': {'id': 'transaction-id'}, 'errors': []}}
+
+    with mock.patch.object(processors, 'execute', side_effect=execute) as saleor_api:
+        yield saleor_api
+
+
+@pytest.fixture
+def checkouts_api():
+    """
+    HyperPay checkouts API creating a new checkout on each call.
+    """
+    async def create_checkout(url, data, **kwargs):  # pylint: disable=unused-argument
+        checkouts_api.created += 1
+        return mock.Mock(content=dumps({
+            'id': 'hyperpay-checkout-{}'.format(checkouts_api.created),
+            'integrity': 'sha384-integrity',
+            'result': {'code': AsyncHyperPay.RESULT_CODE_SUCCESSFULLY_CREATED_CHECKOUT},
+        }))
+
+    checkouts_api = mock.Mock(side_effect=create_checkout)
+    checkouts_api.created = 0
+    with mock.patch.object(async_processors, 'async_http_post', checkouts_api):
+        yield checkouts_api
+
+
+def test_failed_background_initialization_is_retried_on_reload(processor, saleor_api, checkouts_api):
+    """
+    A HyperPay checkout whose Saleor transaction could not be created in the background is not reused.
+    """
+    processor.background_transaction_initialize = True
+    execute = saleor_api.side_effect
+    initializations = []
+
+    def fail_first_initialization(query, variables=None):
+        if query == processors.INITIALIZE_TRANSACTION:
+            initializations.append(variables)
+            if len(initializations) == 1:
+                raise HyperPayException('Saleor is down')
+        return execute(query, variables)
+
+    saleor_api.side_effect = fail_first_initialization
+    tasks = []
+
+    def run_coroutine_in_background(coroutine, task_name):
+        tasks.append(background.run_coroutine_in_background(coroutine, task_name))
+
+    async def reload_payment_page():
+        await processor.get_transaction_parameters(payment_page_request())
+        while tasks:
+            try:
+                await tasks.pop()
+            except HyperPayException:
+                pass
+
+    with mock.patch.object(async_processors, 'run_coroutine_in_background', run_coroutine_in_background):
+        for _ in range(3):
+            async_to_sync(reload_payment_page)()
+
+    assert checkouts_api.call_count == 2
+    assert len(initializations) == 2
+
+
+def test_async_checkout_payload_matches_sync(processor_configuration, sync_oppwa, async_oppwa):
+    """
+    oppwa receives the same checkout payload from the sync and the async processors.
+    """
+    # pylint: disable=protected-access
+    sync_processor, async_processor = HyperPay(processor_configuration), AsyncHyperPay(processor_configuration)
+    basket_data = sync_processor._build_basket_data('saleor-checkout-id', SALEOR_CHECKOUT)
+    request_data = sync_processor._get_checkout_request_data(basket_data)
+
+    sync_processor._create_checkout(request_data)
+    async_to_sync(async_processor._create_checkout)(request_data)
+
+    sync_body = sync_oppwa.requests[0].body.encode()
+    async_body = async_oppwa.requests[0].content
+    assert async_body == sync_body
+    fields = parse_qs(async_body.decode())
+    assert fields['integrity'] == ['True']
+    assert 'customer.givenName' not in fields
+    assert 'cart.items[0].sku' not in fields
+    assert async_oppwa.requests[0].headers['Content-Type'] == 'application/x-www-form-urlencoded'
+
+
+@pytest.fixture
+def response_view(hyperpay_config, async_oppwa):  # pylint: disable=unused-argument
+    """
+    Call the async response view with a HyperPay status of the given result code.
+    """
+    def response_view(code, encrypted_resource_path=None):
+        async_oppwa.responses[RESOURCE_PATH] = payment_status(code)
+        request = RequestFactory().get('/payment/submit/', {'resourcePath': RESOURCE_PATH})
+        request.session = SessionStore()
+        return async_to_sync(views.AsyncHyperPayResponseView.as_view())(
+            request,
+            encrypted_resource_path=encrypted_resource_path,
+        )
+
+    return response_view
+
+
+@pytest.fixture
+def poller():
+    with mock.patch.object(views, 'get_pending_payment_poller') as get_pending_payment_poller:
+        yield get_pending_payment_poller.return_value
+
+
+def test_async_response_view_success(response_view, poller):
+    """
+    A successful payment enqueues the completion of its checkout and redirects to the order status page.
+    """
+    response = response_view('000.000.000')
+
+    completion = CheckoutCompletion.objects.get(checkout_id='saleor-checkout-id')
+    assert response.status_code == 302
+    assert response.url == '/payment/order-status/{}/'.format(completion.reference)
+    poller.track.assert_not_called()
+
+
+def test_async_response_view_pending(response_view, poller):
+    """
+    A pending payment is handed to the poller and redirects to the pending page.
+    """
+    response = response_view('000.200.000')
+
+    assert response.status_code == 302
+    assert response.url.startswith('/payment/status/')
+    poller.track.assert_called_once()
+    assert poller.track.call_args.args[1] == RESOURCE_PATH
+    assert not CheckoutCompletion.objects.exists()
+
+
+def test_async_response_view_failure(response_view, poller):  # pylint: disable=unused-argument
+    """
+    A rejected payment is reported as failed.
+    """
+    with pytest.raises(HyperPayException, match='Payment failed'):
+        response_view('800.100.151')
@@ -0,0 +1,25 @@
+"""
+Tests for the `platform_plugin_hyperpay` background tasks.
+"""
+import asyncio
+
+from asgiref.sync import async_to_sync
+
+from platform_plugin_hyperpay.background import get_background_failures, run_coroutine_in_background
+
+
+def test_cancelled_coroutine_is_counted():
+    """
+    A coroutine cancelled when the event loop of the request closes is counted as a failure.
+    """
+    async def wait_forever():
+        await asyncio.Event().wait()
+
+    async def view():
+        run_coroutine_in_background(wait_forever(), task_name='cancelled-task')
+
+    before = get_background_failures().get('cancelled-task', 0)
+
+    async_to_sync(view)()
+
+    assert get_background_failures()['cancelled-task'] == before + 1
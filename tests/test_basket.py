@@ -0,0 +1,132 @@
+"""
+Tests for the `platform_plugin_hyperpay` encoding of Saleor checkouts as HyperPay baskets.
+"""
+import sys
+import threading
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+
+from platform_plugin_hyperpay import basket
+from platform_plugin_hyperpay.basket import CART_ITEM_FIELDS, build_basket_data, format_price, get_cart_item_keys
+
+
+def line(index, quantity=3, unit_price=115.15, total_price=345.45):
+    return {
+        'variant': {'name': f'Course {index}', 'sku': f'SKU-{index}'},
+        'quantity': quantity,
+        'unitPrice': {'gross': {'amount': unit_price}},
+        'totalPrice': {'gross': {'amount': total_price}},
+    }
+
+
+def checkout(lines, amount=0):
+    return {
+        'totalPrice': {'gross': {'amount': amount}},
+        'lines': lines,
+        'email': 'learner@example.com',
+        'user': {'firstName': 'Ada', 'lastName': 'Lovelace'},
+    }
+
+
+def test_empty_cart():
+    """
+    A checkout without lines is encoded without cart items.
+    """
+    basket_data = build_basket_data('checkout-id', checkout([]), 'SAR', 'DIGITAL')
+
+    assert basket_data == {
+        'amount': '0.00',
+        'currency': 'SAR',
+        'merchantTransactionId': 'checkout-id',
+        'customer.email': 'learner@example.com',
+        'customer.givenName': 'Ada',
+        'customer.surname': 'Lovelace',
+    }
+
+
+def test_one_line_cart():
+    """
+    The fields of a single line are encoded at index 0.
+    """
+    basket_data = build_basket_data('checkout-id', checkout([line(0)], amount=345.45), 'SAR', 'DIGITAL')
+
+    assert basket_data['amount'] == '345.45'
+    assert {key: value for key, value in basket_data.items() if key.startswith('cart.items')} == {
+        'cart.items[0].name': 'Course 0',
+        'cart.items[0].quantity': 3,
+        'cart.items[0].type': 'DIGITAL',
+        'cart.items[0].sku': 'SKU-0',
+        'cart.items[0].price': '115.15',
+        'cart.items[0].currency': 'SAR',
+        'cart.items[0].totalAmount': '345.45',
+    }
+
+
+def test_multi_line_cart():
+    """
+    Every line of the cart is encoded, not only the last one.
+    """
+    lines = [line(index, quantity=index + 1, unit_price=10, total_price=10 * (index + 1)) for index in range(3)]
+    basket_data = build_basket_data('checkout-id', checkout(lines, amount=60), 'SAR', 'DIGITAL')
+
+    assert len([key for key in basket_data if key.startswith('cart.items')]) == 3 * len(CART_ITEM_FIELDS)
+    for index in range(3):
+        assert basket_data[f'cart.items[{index}].name'] == f'Course {index}'
+        assert basket_data[f'cart.items[{index}].quantity'] == index + 1
+        assert basket_data[f'cart.items[{index}].totalAmount'] == f'{10 * (index + 1)}.00'
+
+
+def test_line_without_variant():
+    """
+    Lines whose variant was deleted are still encoded.
+    """
+    basket_data = build_basket_data('checkout-id', checkout([dict(line(0), variant=None)]), 'SAR', 'DIGITAL')
+
+    assert basket_data['cart.items[0].name'] is None
+    assert basket_data['cart.items[0].sku'] is None
+
+
+@pytest.mark.parametrize('price, expected', (
+    (1.005, '1.01'),
+    (2.675, '2.68'),
+    (10.1, '10.10'),
+    (0, '0.00'),
+    (Decimal('99.999'), '100.00'),
+))
+def test_format_price(price, expected):
+    """
+    Prices are rounded half up from their shortest decimal representation.
+    """
+    assert format_price(price) == expected
+
+
+def test_cart_item_keys_grow_concurrently():
+    """
+    Baskets built concurrently each get the keys of their own indexes, appended once.
+    """
+    barrier = threading.Barrier(8)
+    results = {}
+    switch_interval = sys.getswitchinterval()
+
+    def build(count):
+        barrier.wait()
+        results[count] = get_cart_item_keys(count)
+
+    sys.setswitchinterval(1e-6)
+    try:
+        with mock.patch.object(basket, '_cart_item_keys', []):
+            threads = [threading.Thread(target=build, args=(count,)) for count in range(2000, 2008)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert len(basket._cart_item_keys) == 2007  # pylint: disable=protected-access
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    for count, keys in results.items():
+        assert len(keys) == count
+        assert [item_keys[0] for item_keys in keys] == [f'cart.items[{index}].name' for index in range(count)]
@@ -0,0 +1,125 @@
+"""
+Tests for the `platform_plugin_hyperpay` Saleor webhook ingestion.
+"""
+import io
+import json
+from unittest import mock
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from platform_plugin_hyperpay.saleor_app import ingestion
+from platform_plugin_hyperpay.saleor_app.ingestion import CheckoutUpdatedEvent, saleor_webhook
+from platform_plugin_hyperpay.serialization import dumps
+
+PAYLOAD = {'issuedAt': '2026-10-01T10:00:00+00:00', 'version': '3.20', '__typename': 'CheckoutUpdated',
+           'checkout': {'id': 'checkout-id'}}
+
+
+@pytest.fixture(autouse=True)
+def skip_signature(settings):
+    settings.HYPERPAY_VERIFY_SALEOR_SIGNATURE = False
+
+
+@pytest.fixture
+def received():
+    return []
+
+
+@pytest.fixture
+def view(received):
+    @saleor_webhook(CheckoutUpdatedEvent)
+    def checkout_updated(request, event):  # pylint: disable=unused-argument
+        received.append(event)
+        return HttpResponse()
+    return checkout_updated
+
+
+def post(view, body, **headers):
+    return view(RequestFactory().post('/webhook', body, content_type='application/json', **headers))
+
+
+def test_valid_webhook(view, received):
+    """
+    A valid payload is handed to the view as a typed event.
+    """
+    response = post(view, dumps(PAYLOAD))
+
+    assert response.status_code == 200
+    assert received == [CheckoutUpdatedEvent(issued_at=PAYLOAD['issuedAt'], checkout_id='checkout-id')]
+
+
+def test_only_post(view):
+    """
+    Webhooks are only accepted as POST requests.
+    """
+    assert view(RequestFactory().get('/webhook')).status_code == 405
+
+
+@pytest.mark.parametrize('body', (
+    b'{',
+    b'[]',
+    b'{"checkout": "\xff"}',
+    dumps({**PAYLOAD, 'checkout': 'checkout-id'}),
+    dumps({key: value for key, value in PAYLOAD.items() if key != 'issuedAt'}),
+))
+def test_invalid_payload(view, received, body):
+    """
+    Bodies that are not valid JSON or do not match the subscription are rejected with a 400.
+    """
+    assert post(view, body).status_code == 400
+    assert not received
+
+
+def test_invalid_utf8_with_standard_library_backend(view):
+    """
+    Bodies that are not UTF-8 are rejected with a 400 by the standard library backend too.
+    """
+    with mock.patch.object(ingestion, 'loads', json.loads):
+        assert post(view, b'{"checkout": "\xff"}').status_code == 400
+
+
+def test_too_large(view, received, settings):
+    """
+    Bodies over the size limit are rejected with a 413 before being parsed.
+    """
+    settings.HYPERPAY_WEBHOOK_MAX_BODY_SIZE = 16
+
+    assert post(view, dumps(PAYLOAD)).status_code == 413
+    assert not received
+
+
+def test_too_large_without_content_length(view, received, settings):
+    """
+    Bodies without a Content-Length are read up to one byte over the size limit and rejected with a 413.
+    """
+    settings.HYPERPAY_WEBHOOK_MAX_BODY_SIZE = 16
+    request = RequestFactory().post('/webhook', content_type='application/json')
+    del request.META['CONTENT_LENGTH']
+    request._stream = stream = io.BytesIO(dumps(PAYLOAD))  # pylint: disable=protected-access
+
+    assert view(request).status_code == 413
+    assert stream.tell() == 17
+    assert not received
+
+
+def test_without_content_length(view, received):
+    """
+    Bodies without a Content-Length within the size limit are accepted.
+    """
+    request = RequestFactory().post('/webhook', content_type='application/json')
+    del request.META['CONTENT_LENGTH']
+    request._stream = io.BytesIO(dumps(PAYLOAD))  # pylint: disable=protected-access
+
+    assert view(request).status_code == 200
+    assert received == [CheckoutUpdatedEvent(issued_at=PAYLOAD['issuedAt'], checkout_id='checkout-id')]
+
+def test_unsigned_webhook(view, received, settings):
+    """
+    Unsigned webhooks are rejected with a 401 when signatures are verified.
+    """
+    settings.HYPERPAY_VERIFY_SALEOR_SIGNATURE = True
+
+    assert post(view, dumps(PAYLOAD)).status_code == 401
+    assert not received
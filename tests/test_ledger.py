@@ -0,0 +1,136 @@
+"""
+Tests for the `platform_plugin_hyperpay` transaction ledger.
+"""
+from decimal import Decimal
+
+import pytest
+
+from platform_plugin_hyperpay.ledger import (
+    get_final_status,
+    get_resource_path_hash,
+    record_checkout,
+    record_verification,
+)
+from platform_plugin_hyperpay.models import HyperPayTransaction
+from platform_plugin_hyperpay.registry import get_processor
+from platform_plugin_hyperpay.result_codes import PaymentStatus
+
+pytestmark = pytest.mark.django_db
+
+RESOURCE_PATH = '/v1/checkouts/hyperpay-checkout-id/payment'
+REQUEST_DATA = {'merchantTransactionId': 'saleor-checkout-id', 'amount': '115.00', 'currency': 'SAR'}
+
+
+def payment(code='000.000.000', **fields):
+    return {
+        'id': 'payment-id',
+        'ndc': 'hyperpay-checkout-id',
+        'merchantTransactionId': 'saleor-checkout-id',
+        'amount': '115.00',
+        'currency': 'SAR',
+        'result': {'code': code},
+        **fields,
+    }
+
+
+@pytest.fixture
+def processor(hyperpay_config):  # pylint: disable=unused-argument
+    return get_processor('hyperpay')
+
+
+def test_record_checkout(processor):
+    """
+    The HyperPay checkout is recorded for the Saleor checkout, waiting for its payment.
+    """
+    record_checkout(processor, REQUEST_DATA, {'id': 'hyperpay-checkout-id'})
+
+    transaction = HyperPayTransaction.objects.get()
+    assert transaction.hyperpay_checkout_id == 'hyperpay-checkout-id'
+    assert transaction.saleor_checkout_id == 'saleor-checkout-id'
+    assert transaction.processor_name == 'hyperpay'
+    assert transaction.amount == Decimal('115.00')
+    assert transaction.currency == 'SAR'
+    assert transaction.status == HyperPayTransaction.CREATED
+
+
+def test_record_checkout_is_idempotent(processor):
+    """
+    Recording a HyperPay checkout again keeps a single row and its verified status.
+    """
+    record_checkout(processor, REQUEST_DATA, {'id': 'hyperpay-checkout-id'})
+    record_verification(processor, RESOURCE_PATH, payment(), PaymentStatus.SUCCESS)
+
+    record_checkout(processor, REQUEST_DATA, {'id': 'hyperpay-checkout-id'})
+
+    assert HyperPayTransaction.objects.get().status == HyperPayTransaction.SUCCESS
+
+
+@pytest.mark.parametrize('status, code, expected', (
+    (PaymentStatus.PENDING, '000.200.000', HyperPayTransaction.PENDING),
+    (PaymentStatus.SUCCESS, '000.000.000', HyperPayTransaction.SUCCESS),
+    (PaymentStatus.FAILURE, '800.100.151', HyperPayTransaction.FAILURE),
+))
+def test_record_verification(processor, status, code, expected):
+    """
+    The verified status, result code and payment of the recorded checkout are stored.
+    """
+    record_checkout(processor, REQUEST_DATA, {'id': 'hyperpay-checkout-id'})
+
+    record_verification(processor, RESOURCE_PATH, payment(code), status)
+
+    transaction = HyperPayTransaction.objects.get()
+    assert transaction.status == expected
+    assert transaction.result_code == code
+    assert transaction.payment_id == 'payment-id'
+    assert transaction.resource_path_hash == get_resource_path_hash(RESOURCE_PATH)
+
+
+def test_pending_verification_does_not_revert_a_final_status(processor):
+    """
+    A pending status arriving after a final one is ignored.
+    """
+    record_checkout(processor, REQUEST_DATA, {'id': 'hyperpay-checkout-id'})
+    record_verification(processor, RESOURCE_PATH, payment(), PaymentStatus.SUCCESS)
+
+    record_verification(processor, RESOURCE_PATH, payment('000.200.000'), PaymentStatus.PENDING)
+
+    transaction = HyperPayTransaction.objects.get()
+    assert transaction.status == HyperPayTransaction.SUCCESS
+    assert transaction.result_code == '000.000.000'
+    assert get_final_status('hyperpay-checkout-id') == PaymentStatus.SUCCESS
+
+
+def test_final_verification_replaces_pending_status(processor):
+    """
+    A final status replaces a pending one.
+    """
+    record_checkout(processor, REQUEST_DATA, {'id': 'hyperpay-checkout-id'})
+    record_verification(processor, RESOURCE_PATH, payment('000.200.000'), PaymentStatus.PENDING)
+    assert get_final_status('hyperpay-checkout-id') is None
+
+    record_verification(processor, RESOURCE_PATH, payment('800.100.151'), PaymentStatus.FAILURE)
+
+    assert HyperPayTransaction.objects.get().status == HyperPayTransaction.FAILURE
+    assert get_final_status('hyperpay-checkout-id') == PaymentStatus.FAILURE
+
+
+def test_verification_of_unrecorded_checkout(processor):
+    """
+    Payments of checkouts that were never recorded are added from the verification, found by resource path.
+    """
+    record_verification(processor, RESOURCE_PATH, payment(ndc=None), PaymentStatus.SUCCESS)
+
+    transaction = HyperPayTransaction.objects.get()
+    assert transaction.hyperpay_checkout_id == 'hyperpay-checkout-id'
+    assert transaction.saleor_checkout_id == 'saleor-checkout-id'
+    assert transaction.amount == Decimal('115.00')
+    assert transaction.status == HyperPayTransaction.SUCCESS
+
+
+def test_verification_without_checkout_id(processor):
+    """
+    Verifications that cannot be matched to a HyperPay checkout are not recorded.
+    """
+    record_verification(processor, '/v1/payments/payment-id', payment(ndc=None), PaymentStatus.SUCCESS)
+
+    assert not HyperPayTransaction.objects.exists()
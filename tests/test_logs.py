@@ -0,0 +1,141 @@
+"""
+Tests for the `platform_plugin_hyperpay` structured logging.
+"""
+import logging
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+from platform_plugin_hyperpay import logs
+from platform_plugin_hyperpay.logs import DEFAULT_LOGGING_CONFIG, StructuredMessage, log_event
+from platform_plugin_hyperpay.serialization import loads
+
+logger = logging.getLogger('platform_plugin_hyperpay.tests')
+
+
+class Unserializable:
+    def __repr__(self):
+        return '<Unserializable>'
+
+
+def render(event, **fields):
+    return str(StructuredMessage(event, fields, DEFAULT_LOGGING_CONFIG))
+
+
+def test_rendered_message():
+    """
+    The event and its fields are rendered as a compact JSON object, with callables evaluated.
+    """
+    message = render(
+        'hyperpay.checkout.response',
+        processor='hyperpay',
+        amount=Decimal('115.00'),
+        created=datetime(2026, 10, 1, 10, tzinfo=timezone.utc),
+        response=lambda: {'id': 'checkout-id'},
+    )
+
+    assert message == (
+        '{"event":"hyperpay.checkout.response","processor":"hyperpay","amount":"115.00",'
+        '"created":"2026-10-01T10:00:00Z","response":{"id":"checkout-id"}}'
+    )
+
+
+def test_non_serializable_values():
+    """
+    Values that cannot be serialized are rendered as their repr instead of failing the record.
+    """
+    message = render('hyperpay.error', error=Unserializable(), amount=Decimal('1.50'), ids={'checkout-id'})
+
+    assert message == (
+        '{"event":"hyperpay.error","error":"<Unserializable>","amount":"1.50","ids":"{\'checkout-id\'}"}'
+    )
+
+
+def test_secret_fields_of_request_payload_are_redacted():
+    """
+    Personal data and secrets of the request payload are redacted, the rest is kept.
+    """
+    request_data = {
+        'entityId': 'entity-id',
+        'amount': '115.00',
+        'customer.email': 'learner@example.com',
+        'customer.givenName': 'Learner',
+        'customer.ip': '10.0.0.1',
+        'billing.street1': 'Main street',
+        'card.number': '4111111111111111',
+        'card.cvv': '123',
+        'cart.items[0].name': 'Course',
+        'headers': {'Authorization': 'Bearer access-token'},
+        'access_token': 'access-token',
+    }
+
+    assert loads(render('hyperpay.checkout.request', request=request_data)) == {
+        'event': 'hyperpay.checkout.request',
+        'request': {
+            'entityId': 'entity-id',
+            'amount': '115.00',
+            'customer.email': '[redacted]',
+            'customer.givenName': '[redacted]',
+            'customer.ip': '[redacted]',
+            'billing.street1': '[redacted]',
+            'card.number': '[redacted]',
+            'card.cvv': '[redacted]',
+            'cart.items[0].name': 'Course',
+            'headers': {'Authorization': '[redacted]'},
+            'access_token': '[redacted]',
+        },
+    }
+
+
+def test_long_values_are_truncated():
+    """
+    Long strings and collections are truncated to the configured size.
+    """
+    message = StructuredMessage(
+        'hyperpay.checkout.response',
+        {'description': 'x' * 12, 'items': list(range(5)), 'data': {str(key): key for key in range(4)}},
+        {'max_field_length': 8, 'max_items': 3},
+    )
+
+    assert loads(str(message)) == {
+        'event': 'hyperpay.checkout.response',
+        'description': 'xxxxxxxx...[12 chars]',
+        'items': [0, 1, 2, '...2 more'],
+        'data': {'0': 0, '1': 1, '2': 2, '...': '1 more'},
+    }
+
+
+def test_log_event(caplog):
+    """
+    The event is logged with the rendered message and its name on the record.
+    """
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        log_event(logger, logging.INFO, 'hyperpay.response.received', query={'id': 'checkout-id'})
+
+    record, = caplog.records
+    assert record.hyperpay_event == 'hyperpay.response.received'
+    assert record.getMessage() == '{"event":"hyperpay.response.received","query":{"id":"checkout-id"}}'
+
+
+def test_disabled_level_builds_nothing(caplog):
+    """
+    Nothing is evaluated when the level is disabled.
+    """
+    build = mock.Mock()
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        log_event(logger, logging.INFO, 'hyperpay.checkout.request', request=build)
+
+    assert not caplog.records
+    build.assert_not_called()
+
+
+def test_sampled_out_event(caplog, settings):
+    """
+    Events below WARNING are sampled with their configured rate, warnings never are.
+    """
+    settings.HYPERPAY_LOGGING = {'sample_rates': {'hyperpay.checkout.request': 0.1}}
+    with caplog.at_level(logging.INFO, logger=logger.name), mock.patch.object(logs.random, 'random', return_value=0.5):
+        log_event(logger, logging.INFO, 'hyperpay.checkout.request')
+        log_event(logger, logging.WARNING, 'hyperpay.checkout.request')
+
+    assert [record.levelno for record in caplog.records] == [logging.WARNING]
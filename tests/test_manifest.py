@@ -0,0 +1,88 @@
+"""
+Tests for the `platform_plugin_hyperpay` Saleor app manifest endpoint.
+"""
+from unittest import mock
+
+import pytest
+
+from platform_plugin_hyperpay.saleor_app import manifest
+from platform_plugin_hyperpay.serialization import loads
+
+MANIFEST_URL = '/saleor-app/api/manifest'
+
+
+@pytest.fixture(autouse=True)
+def lms_root_url(settings):
+    """
+    Serve the manifest for a known LMS_ROOT_URL, without the one serialized by the previous tests.
+    """
+    settings.LMS_ROOT_URL = 'https://lms.example.com'
+    with mock.patch.object(manifest, '_serialized_manifest', (None, None, None)):
+        yield settings
+
+
+@pytest.fixture
+def build_manifest():
+    with mock.patch.object(manifest, 'get_app_manifest', wraps=manifest.get_app_manifest) as build_manifest:
+        yield build_manifest
+
+
+def test_manifest_is_served_with_its_etag(client):
+    """
+    The manifest is served as JSON with a strong ETag of its content.
+    """
+    response = client.get(MANIFEST_URL)
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/json'
+    assert loads(response.content)['id'] == manifest.HYPERPAY_APP_ID
+    assert response['ETag'] == '"{}"'.format(manifest.get_serialized_app_manifest()[1])
+
+
+def test_conditional_request_with_matching_etag(client):
+    """
+    Requests with the current ETag are answered with an empty 304.
+    """
+    etag = client.get(MANIFEST_URL)['ETag']
+
+    response = client.get(MANIFEST_URL, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response['ETag'] == etag
+
+
+def test_conditional_request_with_stale_etag(client):
+    """
+    Requests with another ETag get the full manifest.
+    """
+    response = client.get(MANIFEST_URL, HTTP_IF_NONE_MATCH='"stale-etag"')
+
+    assert response.status_code == 200
+    assert loads(response.content)['id'] == manifest.HYPERPAY_APP_ID
+
+
+def test_manifest_is_serialized_once(client, build_manifest):
+    """
+    The manifest is built once for every request of the same LMS_ROOT_URL.
+    """
+    client.get(MANIFEST_URL)
+    client.get(MANIFEST_URL)
+    client.get(MANIFEST_URL, HTTP_IF_NONE_MATCH='"stale-etag"')
+
+    build_manifest.assert_called_once_with()
+
+
+def test_manifest_is_rebuilt_for_another_root_url(client, lms_root_url):
+    """
+    Changing LMS_ROOT_URL rebuilds the manifest, with a new ETag.
+    """
+    response = client.get(MANIFEST_URL)
+
+    lms_root_url.LMS_ROOT_URL = 'https://courses.example.com'
+    new_response = client.get(MANIFEST_URL, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    assert new_response.status_code == 200
+    assert new_response['ETag'] != response['ETag']
+    assert b'https://courses.example.com' in new_response.content
+    assert b'https://lms.example.com' not in new_response.content
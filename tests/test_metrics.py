@@ -0,0 +1,72 @@
+"""
+Tests for the `platform_plugin_hyperpay` metrics endpoint.
+"""
+import pytest
+from django.contrib.auth import get_user_model
+
+from platform_plugin_hyperpay.metrics import CONTENT_TYPE
+
+METRICS_URL = '/metrics/'
+
+
+@pytest.fixture
+def metrics_settings(settings):
+    settings.HYPERPAY_METRICS = {'bearer_token': 'scrape-token', 'allowed_ips': ('10.0.0.5',)}
+    return settings
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('headers', (
+    {},
+    {'HTTP_AUTHORIZATION': 'Bearer wrong-token'},
+    {'HTTP_AUTHORIZATION': 'Basic c2NyYXBlLXRva2Vu'},
+    {'REMOTE_ADDR': '10.0.0.6'},
+))
+def test_unauthorized_scrape_is_rejected(client, metrics_settings, headers):  # pylint: disable=unused-argument
+    """
+    Scrapes without the token, from another address and by anonymous users are rejected.
+    """
+    response = client.get(METRICS_URL, **headers)
+
+    assert response.status_code == 401
+    assert response['WWW-Authenticate'].startswith('Bearer')
+    assert b'hyperpay_' not in response.content
+
+
+@pytest.mark.django_db
+def test_metrics_are_closed_by_default(client):
+    """
+    Without configuration, anonymous scrapes are rejected.
+    """
+    assert client.get(METRICS_URL).status_code == 401
+
+
+@pytest.mark.parametrize('headers', (
+    {'HTTP_AUTHORIZATION': 'Bearer scrape-token'},
+    {'REMOTE_ADDR': '10.0.0.5'},
+))
+def test_authorized_scrape(client, metrics_settings, headers):  # pylint: disable=unused-argument
+    """
+    Scrapes with the bearer token or from an allowed address read the metrics.
+    """
+    response = client.get(METRICS_URL, **headers)
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == CONTENT_TYPE
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('is_staff, allow_staff, status_code', (
+    (True, True, 200),
+    (False, True, 401),
+    (True, False, 401),
+))
+def test_staff_scrape(client, settings, is_staff, allow_staff, status_code):
+    """
+    Logged-in staff users read the metrics unless it is disabled.
+    """
+    settings.HYPERPAY_METRICS = {'allow_staff': allow_staff}
+    user = get_user_model().objects.create_user('operator', password='password', is_staff=is_staff)
+    client.force_login(user)
+
+    assert client.get(METRICS_URL).status_code == status_code
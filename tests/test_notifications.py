@@ -0,0 +1,163 @@
+"""
+Tests for the `platform_plugin_hyperpay` server-to-server notifications.
+"""
+import os
+
+import pytest
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from django.core.cache import cache
+
+from platform_plugin_hyperpay.exceptions import HyperPayException
+from platform_plugin_hyperpay.models import CheckoutCompletion, HyperPayTransaction
+from platform_plugin_hyperpay.notifications import decrypt_notification, process_payment_notification
+from platform_plugin_hyperpay.registry import get_processor
+from platform_plugin_hyperpay.result_codes import PaymentStatus
+from platform_plugin_hyperpay.serialization import dumps
+
+pytestmark = pytest.mark.django_db
+
+SECRET = '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f'
+
+
+def encrypt(notification, secret=SECRET):
+    """
+    Encrypt the notification as HyperPay does, returning the body, IV and tag.
+    """
+    iv = os.urandom(12)
+    encrypted = AESGCM(bytes.fromhex(secret)).encrypt(iv, dumps(notification), None)
+    return encrypted[:-16].hex().upper().encode(), iv.hex(), encrypted[-16:].hex()
+
+
+def payment(code='000.000.000', **fields):
+    return {
+        'id': 'payment-id',
+        'ndc': 'hyperpay-checkout-id',
+        'merchantTransactionId': 'saleor-checkout-id',
+        'amount': '115.00',
+        'currency': 'SAR',
+        'result': {'code': code, 'description': 'Transaction succeeded'},
+        **fields,
+    }
+
+
+@pytest.fixture
+def processor(settings, hyperpay_config):
+    hyperpay_config['hyperpay']['webhook_secret'] = SECRET
+    settings.HYPERPAY_CONFIG = hyperpay_config
+    return get_processor('hyperpay')
+
+
+def test_decrypt_notification():
+    """
+    A notification encrypted with the secret is decrypted and parsed.
+    """
+    notification = {'type': 'PAYMENT', 'payload': payment()}
+
+    assert decrypt_notification(SECRET, *encrypt(notification)) == notification
+
+
+def test_decrypt_notification_with_bad_tag():
+    """
+    A notification that does not authenticate is rejected.
+    """
+    body, iv, tag = encrypt({'type': 'PAYMENT', 'payload': payment()})
+    bad_tag = '{:032x}'.format(int(tag, 16) ^ 1)
+
+    with pytest.raises(HyperPayException, match='authenticate'):
+        decrypt_notification(SECRET, body, iv, bad_tag)
+
+
+def test_decrypt_notification_with_other_secret():
+    """
+    A notification encrypted with another secret is rejected.
+    """
+    body, iv, tag = encrypt({'type': 'PAYMENT', 'payload': payment()}, secret='ff' * 32)
+
+    with pytest.raises(HyperPayException):
+        decrypt_notification(SECRET, body, iv, tag)
+
+
+def test_process_successful_payment(processor):
+    """
+    A successful payment is recorded in the ledger and its checkout completion is enqueued.
+    """
+    assert process_payment_notification(processor, payment()) == PaymentStatus.SUCCESS
+
+    transaction = HyperPayTransaction.objects.get(hyperpay_checkout_id='hyperpay-checkout-id')
+    assert transaction.status == HyperPayTransaction.SUCCESS
+    assert CheckoutCompletion.objects.get(checkout_id='saleor-checkout-id').payment_id == 'payment-id'
+    resource_path = processor.get_payment_resource_path('hyperpay-checkout-id')
+    assert processor.get_cached_verification(resource_path)[1] == PaymentStatus.SUCCESS
+
+
+def test_replayed_notification_is_ignored(processor):
+    """
+    Once settled, later notifications of the payment are ignored, even after the cache was evicted.
+    """
+    process_payment_notification(processor, payment())
+    cache.clear()
+
+    status = process_payment_notification(processor, payment(code='000.200.000'))
+
+    assert status == PaymentStatus.SUCCESS
+    transaction = HyperPayTransaction.objects.get(hyperpay_checkout_id='hyperpay-checkout-id')
+    assert transaction.status == HyperPayTransaction.SUCCESS
+    assert transaction.result_code == '000.000.000'
+    assert CheckoutCompletion.objects.count() == 1
+
+
+def test_pending_notification_does_not_enqueue(processor):
+    """
+    A pending payment is recorded without completing its checkout.
+    """
+    assert process_payment_notification(processor, payment(code='000.200.000')) == PaymentStatus.PENDING
+
+    assert HyperPayTransaction.objects.get().status == HyperPayTransaction.PENDING
+    assert not CheckoutCompletion.objects.exists()
+
+
+@pytest.mark.parametrize('field', ('id', 'ndc', 'merchantTransactionId', 'result'))
+def test_missing_fields(processor, field):
+    """
+    Payloads missing a field needed to settle the payment are rejected without side effects.
+    """
+    payment_data = payment()
+    del payment_data[field]
+
+    with pytest.raises(HyperPayException, match='missing'):
+        process_payment_notification(processor, payment_data)
+
+    assert not HyperPayTransaction.objects.exists()
+    assert not CheckoutCompletion.objects.exists()
+
+
+def test_notification_view(client, processor):  # pylint: disable=unused-argument
+    """
+    The view settles authentic notifications and rejects the ones that do not authenticate.
+    """
+    url = '/payment/notifications/hyperpay/'
+    body, iv, tag = encrypt({'type': 'PAYMENT', 'payload': payment()})
+
+    rejected = client.post(url, body, content_type='text/plain', HTTP_X_INITIALIZATION_VECTOR=iv,
+                           HTTP_X_AUTHENTICATION_TAG='00' * 16)
+    accepted = client.post(url, body, content_type='text/plain', HTTP_X_INITIALIZATION_VECTOR=iv,
+                           HTTP_X_AUTHENTICATION_TAG=tag)
+
+    assert rejected.status_code == 400
+    assert accepted.status_code == 200
+    assert CheckoutCompletion.objects.filter(checkout_id='saleor-checkout-id').exists()
+
+
+def test_notification_view_with_missing_fields(client, processor):  # pylint: disable=unused-argument
+    """
+    Authentic notifications that cannot be settled are acknowledged so HyperPay stops retrying them.
+    """
+    payment_data = payment()
+    del payment_data['merchantTransactionId']
+    body, iv, tag = encrypt({'type': 'PAYMENT', 'payload': payment_data})
+
+    response = client.post('/payment/notifications/hyperpay/', body, content_type='text/plain',
+                           HTTP_X_INITIALIZATION_VECTOR=iv, HTTP_X_AUTHENTICATION_TAG=tag)
+
+    assert response.status_code == 200
+    assert not CheckoutCompletion.objects.exists()
@@ -0,0 +1,126 @@
+"""
+Tests for the `platform_plugin_hyperpay` checkout completion outbox.
+"""
+from unittest import mock
+
+import pytest
+
+from platform_plugin_hyperpay import outbox
+from platform_plugin_hyperpay.models import CheckoutCompletion
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeProcessor:
+    NAME = 'hyperpay'
+
+
+def verification_response(payment_id='payment-1', checkout_id='checkout-1'):
+    return {'id': payment_id, 'merchantTransactionId': checkout_id, 'result': {'code': '000.000.000'}}
+
+
+def test_enqueue_schedules_the_completion(django_capture_on_commit_callbacks):
+    """
+    A verified payment is recorded once and its completion is scheduled after the commit.
+    """
+    with django_capture_on_commit_callbacks() as callbacks:
+        completion = outbox.enqueue_checkout_completion(FakeProcessor(), verification_response())
+        again = outbox.enqueue_checkout_completion(FakeProcessor(), verification_response())
+
+    assert again.pk == completion.pk
+    assert completion.status == CheckoutCompletion.PENDING
+    assert completion.payment_id == 'payment-1'
+    assert len(callbacks) == 1
+
+
+def test_new_payment_resets_failed_completion(django_capture_on_commit_callbacks):
+    """
+    A failed completion is retried when another payment of the same checkout succeeds.
+    """
+    completion = outbox.enqueue_checkout_completion(FakeProcessor(), verification_response())
+    CheckoutCompletion.objects.filter(pk=completion.pk).update(
+        status=CheckoutCompletion.FAILED,
+        attempts=5,
+        last_error='error',
+    )
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        reset = outbox.enqueue_checkout_completion(FakeProcessor(), verification_response('payment-2'))
+
+    assert reset.pk == completion.pk
+    assert reset.reference == completion.reference
+    assert reset.status == CheckoutCompletion.PENDING
+    assert reset.attempts == 0
+    assert reset.last_error == ''
+    assert reset.payment_id == 'payment-2'
+    assert reset.verification_response['id'] == 'payment-2'
+    assert len(callbacks) == 1
+
+
+def test_same_payment_does_not_reset_failed_completion(django_capture_on_commit_callbacks):
+    """
+    Replaying the payment whose completion failed does not retry it.
+    """
+    completion = outbox.enqueue_checkout_completion(FakeProcessor(), verification_response())
+    CheckoutCompletion.objects.filter(pk=completion.pk).update(status=CheckoutCompletion.FAILED)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        replayed = outbox.enqueue_checkout_completion(FakeProcessor(), verification_response())
+
+    assert replayed.status == CheckoutCompletion.FAILED
+    assert not callbacks
+
+
+def test_process_completes_the_checkout():
+    """
+    Processing an entry completes the Saleor checkout and records the order.
+    """
+    completion = outbox.enqueue_checkout_completion(FakeProcessor(), verification_response())
+    processor = mock.Mock()
+    processor.complete_saleor_checkout.return_value = {'id': 'order-1'}
+
+    with mock.patch.object(outbox, 'get_processor', return_value=processor):
+        outbox.process_checkout_completion(completion.pk)
+
+    completion.refresh_from_db()
+    assert completion.status == CheckoutCompletion.COMPLETED
+    assert completion.order_id == 'order-1'
+    assert completion.attempts == 1
+    processor.complete_saleor_checkout.assert_called_once_with(verification_response())
+
+
+def test_process_retries_then_gives_up(settings):
+    """
+    Failed completions are retried with a delay until the maximum number of attempts.
+    """
+    settings.HYPERPAY_OUTBOX = {'max_attempts': 2, 'base_retry_delay': 0}
+    completion = outbox.enqueue_checkout_completion(FakeProcessor(), verification_response())
+    processor = mock.Mock()
+    processor.complete_saleor_checkout.side_effect = RuntimeError('Saleor is down')
+
+    with mock.patch.object(outbox, 'get_processor', return_value=processor), \
+            mock.patch.object(outbox, 'schedule_checkout_completion') as schedule:
+        outbox.process_checkout_completion(completion.pk)
+        completion.refresh_from_db()
+        assert completion.status == CheckoutCompletion.PENDING
+        assert 'Saleor is down' in completion.last_error
+        schedule.assert_called_once_with(completion.pk, delay=0)
+
+        outbox.process_checkout_completion(completion.pk)
+
+    completion.refresh_from_db()
+    assert completion.status == CheckoutCompletion.FAILED
+    assert completion.attempts == 2
+
+
+def test_process_skips_entries_that_are_not_due():
+    """
+    Entries that are completed or claimed by another worker are not processed again.
+    """
+    completion = outbox.enqueue_checkout_completion(FakeProcessor(), verification_response())
+    CheckoutCompletion.objects.filter(pk=completion.pk).update(status=CheckoutCompletion.COMPLETED)
+
+    with mock.patch.object(outbox, 'get_processor') as get_processor:
+        outbox.process_checkout_completion(completion.pk)
+
+    get_processor.assert_not_called()
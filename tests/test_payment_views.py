@@ -0,0 +1,79 @@
+"""
+Tests for the `platform_plugin_hyperpay` payment views helpers.
+"""
+from unittest import mock
+
+import pytest
+from cryptography.fernet import InvalidToken
+
+from platform_plugin_hyperpay.payment import views
+from platform_plugin_hyperpay.payment.views import clear_key_cache, decrypt_string, encrypt_string, get_fernet
+
+
+@pytest.fixture(autouse=True)
+def empty_key_cache():
+    clear_key_cache()
+    yield
+    clear_key_cache()
+
+
+@pytest.fixture
+def generate_key():
+    with mock.patch.object(views, 'generate_key', wraps=views.generate_key) as generate_key:
+        yield generate_key
+
+
+def test_key_is_derived_once(generate_key):
+    """
+    The key of an encryption key and salt is derived once, and shared by encryption and decryption.
+    """
+    encrypted = encrypt_string('/v1/checkouts/checkout-id/payment', 'encryption-key', 'salt')
+
+    assert decrypt_string(encrypted, 'encryption-key', 'salt') == '/v1/checkouts/checkout-id/payment'
+    assert get_fernet('encryption-key', 'salt') is get_fernet('encryption-key', 'salt')
+    generate_key.assert_called_once_with('encryption-key', 'salt')
+
+
+def test_keys_are_derived_per_salt(generate_key):
+    """
+    Each salt gets its own key, which cannot decrypt the messages of the others.
+    """
+    encrypted = encrypt_string('/v1/checkouts/checkout-id/payment', 'encryption-key', 'salt')
+
+    with pytest.raises(InvalidToken):
+        decrypt_string(encrypted, 'encryption-key', 'other-salt')
+    assert generate_key.call_count == 2
+
+
+def test_clear_key_cache(generate_key):
+    """
+    Clearing the cache derives the keys again.
+    """
+    fernet = get_fernet('encryption-key', 'salt')
+
+    clear_key_cache()
+
+    assert get_fernet('encryption-key', 'salt') is not fernet
+    assert generate_key.call_count == 2
+
+
+def test_key_cache_is_cleared_on_configuration_change(generate_key, settings, hyperpay_config):
+    """
+    Rotating the processor configuration drops the derived keys.
+    """
+    get_fernet('encryption-key', 'salt')
+
+    settings.HYPERPAY_CONFIG = dict(hyperpay_config)
+    get_fernet('encryption-key', 'salt')
+
+    assert generate_key.call_count == 2
+
+
+def test_key_cache_is_bounded():
+    """
+    At most KEY_CACHE_SIZE derived keys are kept.
+    """
+    for index in range(views.KEY_CACHE_SIZE + 1):
+        get_fernet('encryption-key', 'salt-{}'.format(index))
+
+    assert get_fernet.cache_info().currsize == views.KEY_CACHE_SIZE
@@ -0,0 +1,143 @@
+"""
+Tests for the `platform_plugin_hyperpay` pending payment poller.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from platform_plugin_hyperpay import processors
+from platform_plugin_hyperpay.payment.poller import (
+    DEFAULT_POLLER_CONFIG,
+    PendingPaymentPoller,
+    get_pending_payment_cache_key,
+)
+from platform_plugin_hyperpay.processors import HyperPay
+from platform_plugin_hyperpay.result_codes import PaymentStatus
+from platform_plugin_hyperpay.serialization import dumps
+
+RESOURCE_PATH = '/v1/checkouts/checkout-id/payment'
+
+
+class FakeProcessor:
+    """
+    Processor returning the queued statuses.
+    """
+
+    NAME = 'hyperpay'
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.verified = []
+
+    def _verify_status(self, resource_path, use_cache=True):
+        assert not use_cache
+        self.verified.append(resource_path)
+        return self.results.pop(0)
+
+    def get_cached_verification(self, resource_path):  # pylint: disable=unused-argument
+        return None
+
+
+@pytest.fixture
+def poller():
+    config = dict(DEFAULT_POLLER_CONFIG, base_interval=0.05, max_interval=0.05)
+    poller = PendingPaymentPoller(config)
+    poller._executor = ThreadPoolExecutor(max_workers=1)  # pylint: disable=protected-access
+    with mock.patch.object(PendingPaymentPoller, '_ensure_running'):
+        yield poller
+    poller._executor.shutdown()  # pylint: disable=protected-access
+
+
+def test_track_publishes_pending(poller):
+    """
+    A tracked payment is reported as pending to every worker.
+    """
+    processor = FakeProcessor()
+    poller.track(processor, RESOURCE_PATH, {'id': 'payment-id'})
+
+    assert poller.get_result(processor, RESOURCE_PATH) == ({'id': 'payment-id'}, PaymentStatus.PENDING)
+
+
+def test_pending_state_expires_without_heartbeat(poller):
+    """
+    The pending state of a payment whose poller stopped expires, so the status is checked again directly.
+    """
+    processor = FakeProcessor()
+    poller.track(processor, RESOURCE_PATH, {'id': 'payment-id'})
+
+    time.sleep(0.15)
+
+    assert poller.get_result(processor, RESOURCE_PATH) is None
+
+
+def test_poll_refreshes_pending_state(poller):
+    """
+    Every check of a payment that is still pending extends its shared state.
+    """
+    processor = FakeProcessor(*[({'id': 'payment-id', 'attempt': attempt}, PaymentStatus.PENDING)
+                                for attempt in range(3)])
+    poller.track(processor, RESOURCE_PATH, {'id': 'payment-id'})
+
+    for _ in range(3):
+        time.sleep(0.06)
+        poller.poll_once()
+
+    assert len(processor.verified) == 3
+    assert poller.get_result(processor, RESOURCE_PATH) == (
+        {'id': 'payment-id', 'attempt': 2},
+        PaymentStatus.PENDING,
+    )
+
+
+def test_poll_drops_final_payments(poller):
+    """
+    Payments stop being polled and published as pending once they reach a final status.
+    """
+    processor = FakeProcessor(({'id': 'payment-id'}, PaymentStatus.SUCCESS))
+    poller.track(processor, RESOURCE_PATH, {'id': 'payment-id'})
+
+    time.sleep(0.06)
+    poller.poll_once()
+
+    assert cache.get(get_pending_payment_cache_key(processor.NAME, RESOURCE_PATH)) is None
+    assert not poller._payments  # pylint: disable=protected-access
+
+
+# The check runs in a thread of the poller, with its own database connection.
+@pytest.mark.django_db(transaction=True)
+def test_poll_bypasses_cached_pending_result(poller, processor_configuration):
+    """
+    A check is never answered by the pending result cached by the previous one.
+    """
+    processor = HyperPay(processor_configuration)
+    pending = {'id': 'payment-id', 'ndc': 'checkout-id', 'result': {'code': '000.200.000'}}
+    processor.cache_verification(RESOURCE_PATH, pending, PaymentStatus.PENDING)
+    poller.track(processor, RESOURCE_PATH, pending)
+    response = mock.Mock(ok=True, status_code=200, content=dumps(dict(pending, result={'code': '000.000.000'})))
+
+    time.sleep(0.06)
+    with mock.patch.object(processors, 'http_get', return_value=response) as http_get:
+        poller.poll_once()
+
+    http_get.assert_called_once()
+    assert poller.get_result(processor, RESOURCE_PATH)[1] == PaymentStatus.SUCCESS
+
+
+def test_expired_payment_is_not_tracked_again(poller):
+    """
+    Once polling a payment expired, refreshes of its page do not start polling it again.
+    """
+    poller.config = dict(poller.config, max_age=0.05)
+    processor = FakeProcessor()
+    poller.track(processor, RESOURCE_PATH, {'id': 'payment-id'})
+
+    time.sleep(0.06)
+    poller.poll_once()
+    poller.track(processor, RESOURCE_PATH, {'id': 'payment-id'})
+
+    assert not poller._payments  # pylint: disable=protected-access
+    assert not processor.verified
+    assert poller.get_result(processor, RESOURCE_PATH) is None
@@ -0,0 +1,380 @@
+"""
+Tests for the `platform_plugin_hyperpay` payment processors.
+"""
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from graphql import parse
+from django.test import RequestFactory
+
+from platform_plugin_hyperpay import background, processors
+from platform_plugin_hyperpay.exceptions import HyperPayException, SaleorCheckoutFinalizationError
+from platform_plugin_hyperpay.models import HyperPayTransaction
+from platform_plugin_hyperpay.processors import HyperPay
+from platform_plugin_hyperpay.result_codes import PaymentStatus
+from platform_plugin_hyperpay.saleor_app.client import graphql
+from platform_plugin_hyperpay.saleor_app.manifest import HYPERPAY_APP_ID
+from platform_plugin_hyperpay.serialization import dumps, loads
+
+pytestmark = pytest.mark.django_db
+
+RESOURCE_PATH = '/v1/checkouts/hyperpay-checkout-id/payment'
+
+
+def http_response(data, status_code=200):
+    return mock.Mock(content=dumps(data), ok=status_code < 400, status_code=status_code)
+
+
+def payment_status(code='000.000.000'):
+    return {
+        'id': 'payment-id',
+        'ndc': 'hyperpay-checkout-id',
+        'merchantTransactionId': 'saleor-checkout-id',
+        'amount': '115.00',
+        'currency': 'SAR',
+        'result': {'code': code, 'description': 'Transaction succeeded'},
+    }
+
+
+def saleor_checkout(amount=115):
+    return {
+        'checkout': {
+            'id': 'saleor-checkout-id',
+            'email': 'learner@example.com',
+            'user': {'firstName': 'Ada', 'lastName': 'Lovelace'},
+            'totalPrice': {'gross': {'amount': amount, 'currency': 'SAR'}},
+            'lines': [{
+                'quantity': 1,
+                'variant': {'name': 'Course', 'sku': 'SKU-1'},
+                'unitPrice': {'gross': {'amount': amount}},
+                'totalPrice': {'gross': {'amount': amount}},
+            }],
+        },
+    }
+
+
+def payment_page_request():
+    request = RequestFactory().get('/payment/pay/', {'checkoutId': 'saleor-checkout-id'})
+    request.LANGUAGE_CODE = 'en-us'
+    return request
+
+
+@pytest.fixture
+def processor(processor_configuration):
+    return HyperPay(processor_configuration)
+
+
+@pytest.fixture
+def saleor_api():
+    """
+    Saleor API returning the checkout and initializing its transactions.
+    """
+    def execute(query, variables=None):  # pylint: disable=unused-argument
+        if query == processors.GET_CHECKOUT:
+            return saleor_checkout(saleor_api.amount)
+        return {'transactionInitialize': {'transaction': {'id': 'transaction-id'}, 'errors': []}}
+
+    saleor_api = mock.Mock(side_effect=execute)
+    saleor_api.amount = 115
+    with mock.patch.object(processors, 'execute', saleor_api):
+        yield saleor_api
+
+
+@pytest.fixture
+def checkouts_api():
+    """
+    HyperPay checkouts API creating a new checkout on each call.
+    """
+    def create_checkout(url, data, **kwargs):  # pylint: disable=unused-argument
+        checkouts_api.created += 1
+        return http_response({
+            'id': 'hyperpay-checkout-{}'.format(checkouts_api.created),
+            'integrity': 'sha384-integrity',
+            'result': {'code': HyperPay.RESULT_CODE_SUCCESSFULLY_CREATED_CHECKOUT},
+        })
+
+    checkouts_api = mock.Mock(side_effect=create_checkout)
+    checkouts_api.created = 0
+    with mock.patch.object(processors, 'http_post', checkouts_api):
+        yield checkouts_api
+
+
+def test_verify_status_caches_final_results(processor):
+    """
+    A final status is fetched once, recorded in the ledger and then read from the cache.
+    """
+    with mock.patch.object(processors, 'http_get', return_value=http_response(payment_status())) as http_get:
+        first = processor._verify_status(RESOURCE_PATH)  # pylint: disable=protected-access
+        second = processor._verify_status(RESOURCE_PATH)  # pylint: disable=protected-access
+
+    assert first == second == (payment_status(), PaymentStatus.SUCCESS)
+    http_get.assert_called_once()
+    assert http_get.call_args.args[0] == (
+        'https://test.oppwa.com/v1/checkouts/hyperpay-checkout-id/payment?entityId=entity-id'
+    )
+    assert HyperPayTransaction.objects.get(hyperpay_checkout_id='hyperpay-checkout-id').status == (
+        HyperPayTransaction.SUCCESS
+    )
+
+
+@pytest.mark.parametrize('code, status, timeout', (
+    ('000.000.000', PaymentStatus.SUCCESS, 60 * 60 * 24),
+    ('800.100.151', PaymentStatus.FAILURE, 60 * 60 * 24),
+    ('000.200.000', PaymentStatus.PENDING, 5),
+))
+def test_verification_cache_timeout(processor, code, status, timeout):
+    """
+    Final results are cached for a day, pending ones only for a few seconds.
+    """
+    with mock.patch.object(processors, 'http_get', return_value=http_response(payment_status(code))), \
+            mock.patch.object(processors.cache, 'set', wraps=cache.set) as cache_set:
+        assert processor._verify_status(RESOURCE_PATH)[1] == status  # pylint: disable=protected-access
+
+    cache_set.assert_called_once_with(
+        processor._get_verification_cache_key(RESOURCE_PATH),  # pylint: disable=protected-access
+        {'response': payment_status(code), 'status': status.name},
+        timeout=timeout,
+    )
+
+
+def test_verify_status_does_not_cache_http_errors(processor):
+    """
+    Error responses are reported as failures without being cached, so the next check queries HyperPay again.
+    """
+    responses = [http_response(payment_status('800.900.300'), status_code=500), http_response(payment_status())]
+
+    with mock.patch.object(processors, 'http_get', side_effect=responses) as http_get:
+        assert processor._verify_status(RESOURCE_PATH)[1] == PaymentStatus.FAILURE  # pylint: disable=protected-access
+        assert processor._verify_status(RESOURCE_PATH)[1] == PaymentStatus.SUCCESS  # pylint: disable=protected-access
+
+    assert http_get.call_count == 2
+
+
+def test_payment_page_reload_reuses_the_checkout(processor, saleor_api, checkouts_api):
+    """
+    Reloading the payment page reuses the HyperPay checkout and Saleor transaction of the same amount.
+    """
+    first = processor.get_transaction_parameters(payment_page_request())
+    second = processor.get_transaction_parameters(payment_page_request())
+
+    assert checkouts_api.call_count == 1
+    assert first == second
+    assert 'checkoutId=hyperpay-checkout-1' in first['payment_widget_js']
+    assert [call.args[0] for call in saleor_api.call_args_list].count(processors.INITIALIZE_TRANSACTION) == 1
+    assert HyperPayTransaction.objects.get().hyperpay_checkout_id == 'hyperpay-checkout-1'
+
+
+def test_new_amount_creates_a_new_checkout(processor, saleor_api, checkouts_api):
+    """
+    A HyperPay checkout is not reused once the amount of the Saleor checkout changed.
+    """
+    processor.get_transaction_parameters(payment_page_request())
+    saleor_api.amount = 230
+    processors.invalidate_saleor_checkout_data('saleor-checkout-id')
+
+    parameters = processor.get_transaction_parameters(payment_page_request())
+
+    assert checkouts_api.call_count == 2
+    assert 'checkoutId=hyperpay-checkout-2' in parameters['payment_widget_js']
+
+
+@pytest.mark.usefixtures('saleor_api')
+def test_final_payment_discards_the_reused_checkout(processor, checkouts_api):
+    """
+    Once a payment with the checkout reached a final status, a reload creates a new checkout.
+    """
+    processor.get_transaction_parameters(payment_page_request())
+    processor.store_verification(RESOURCE_PATH, payment_status('800.100.151'), PaymentStatus.FAILURE)
+
+    processor.get_transaction_parameters(payment_page_request())
+
+    assert checkouts_api.call_count == 2
+
+
+def test_failed_background_initialization_is_retried_on_reload(processor, saleor_api, checkouts_api):
+    """
+    A HyperPay checkout whose Saleor transaction could not be created in the background is not reused.
+    """
+    processor.background_transaction_initialize = True
+    futures = []
+    execute = saleor_api.side_effect
+
+    def fail_first_initialization(query, variables=None):
+        if query == processors.INITIALIZE_TRANSACTION and not futures[1:]:
+            raise HyperPayException('Saleor is down')
+        return execute(query, variables)
+
+    def run_in_background(*args, **kwargs):
+        futures.append(background.run_in_background(*args, **kwargs))
+        futures[-1].exception(timeout=5)
+
+    saleor_api.side_effect = fail_first_initialization
+    with mock.patch.object(processors, 'run_in_background', run_in_background):
+        processor.get_transaction_parameters(payment_page_request())
+        assert isinstance(futures[0].exception(), HyperPayException)
+
+        processor.get_transaction_parameters(payment_page_request())
+        processor.get_transaction_parameters(payment_page_request())
+
+    assert checkouts_api.call_count == 2
+    assert len(futures) == 2
+    assert futures[1].exception() is None
+
+@pytest.fixture
+def saleor_graphql_api(settings):
+    """
+    Saleor GraphQL endpoint answering with the queued data, recording the documents sent to it.
+    """
+    settings.SALEOR_API_URL = 'https://saleor.example.com/graphql/'
+    settings.SALEOR_API_TOKEN = 'saleor-token'
+    with mock.patch.object(graphql, 'http_post') as http_post:
+        yield http_post
+
+
+def test_init_saleor_transaction(processor, saleor_graphql_api):
+    """
+    The transaction is initialized with the HyperPay checkout as data of the app payment gateway.
+    """
+    checkout_data = {'id': 'hyperpay-checkout-id', 'integrity': 'sha384-integrity'}
+    transaction_initialize = {
+        'transaction': {'id': 'transaction-id'},
+        'transactionEvent': {'id': 'event-id', 'type': 'CHARGE_ACTION_REQUIRED', 'message': ''},
+        'data': None,
+        'errors': [],
+    }
+    saleor_graphql_api.return_value = mock.Mock(
+        content=dumps({'data': {'transactionInitialize': transaction_initialize}}),
+    )
+
+    data = processor.init_saleor_transaction(saleor_checkout_id='saleor-checkout-id', data=checkout_data)
+
+    assert data == {'transactionInitialize': transaction_initialize}
+    url, body = saleor_graphql_api.call_args.args
+    request = loads(body)
+    assert url == 'https://saleor.example.com/graphql/'
+    assert saleor_graphql_api.call_args.kwargs['headers']['Authorization'] == 'Bearer saleor-token'
+    assert request['query'] == processors.INITIALIZE_TRANSACTION
+    assert request['variables'] == {
+        'id': 'saleor-checkout-id',
+        'paymentGateway': {'id': HYPERPAY_APP_ID, 'data': checkout_data},
+    }
+    operation = parse(request['query']).definitions[0]
+    assert {definition.variable.name.value for definition in operation.variable_definitions} == {
+        'id',
+        'paymentGateway',
+    }
+
+
+def test_init_saleor_transaction_errors(processor, saleor_graphql_api):
+    """
+    GraphQL errors of the transaction initialization are raised.
+    """
+    saleor_graphql_api.return_value = mock.Mock(content=dumps({'errors': [{'message': 'Invalid token.'}]}))
+
+    with pytest.raises(HyperPayException, match='Invalid token'):
+        processor.init_saleor_transaction(saleor_checkout_id='saleor-checkout-id', data={'id': 'checkout-id'})
+
+
+def test_get_saleor_checkout_data_query(processor, saleor_graphql_api):
+    """
+    The checkout is queried by id and returned in the shape read by the basket.
+    """
+    saleor_graphql_api.return_value = mock.Mock(content=dumps({'data': saleor_checkout()}))
+
+    assert processor.get_saleor_checkout_data('saleor-checkout-id') == saleor_checkout()
+
+    request = loads(saleor_graphql_api.call_args.args[1])
+    assert request == {'query': processors.GET_CHECKOUT, 'variables': {'id': 'saleor-checkout-id'}}
+
+def test_saleor_checkout_snapshot_is_cached(processor, saleor_api):
+    """
+    The Saleor checkout is read once and served from its snapshot until it is invalidated.
+    """
+    first = processor.get_saleor_checkout_data('saleor-checkout-id')
+    second = processor.get_saleor_checkout_data('saleor-checkout-id')
+    processors.invalidate_saleor_checkout_data('saleor-checkout-id')
+    processor.get_saleor_checkout_data('saleor-checkout-id')
+
+    assert first == second == saleor_checkout()
+    assert saleor_api.call_args_list == [mock.call(processors.GET_CHECKOUT, {'id': 'saleor-checkout-id'})] * 2
+
+
+def test_missing_saleor_checkout_is_not_cached(processor):
+    """
+    A checkout Saleor does not return is read again on the next request.
+    """
+    with mock.patch.object(processors, 'execute', return_value={'checkout': None}) as execute:
+        processor.get_saleor_checkout_data('saleor-checkout-id')
+        processor.get_saleor_checkout_data('saleor-checkout-id')
+
+    assert execute.call_count == 2
+
+
+def test_checkout_updated_webhook_invalidates_the_snapshot(client, settings, processor, saleor_api):
+    """
+    The CHECKOUT_UPDATED webhook drops the snapshot of its checkout.
+    """
+    settings.HYPERPAY_VERIFY_SALEOR_SIGNATURE = False
+    processor.get_saleor_checkout_data('saleor-checkout-id')
+
+    response = client.post('/saleor-app/api/webhooks/checkout-updated', dumps({
+        'issuedAt': '2026-10-01T10:00:00+00:00',
+        'version': '3.20',
+        '__typename': 'CheckoutUpdated',
+        'checkout': {'id': 'saleor-checkout-id'},
+    }), content_type='application/json')
+    processor.get_saleor_checkout_data('saleor-checkout-id')
+
+    assert response.status_code == 200
+    assert saleor_api.call_count == 2
+
+
+def finalization_response(order=None, billing_errors=(), complete_errors=()):
+    return {
+        'checkoutBillingAddressUpdate': {'checkout': {'id': 'saleor-checkout-id'}, 'errors': list(billing_errors)},
+        'checkoutComplete': {'order': order, 'errors': list(complete_errors)},
+    }
+
+
+def test_complete_saleor_checkout(processor):
+    """
+    The billing address update and the completion are sent in a single request, returning the order.
+    """
+    verification_response = dict(payment_status(), billing={'city': 'Riyadh', 'country': 'SA'})
+    order = {'id': 'order-id', 'number': '1'}
+
+    with mock.patch.object(processors, 'execute', return_value=finalization_response(order)) as execute:
+        assert processor.complete_saleor_checkout(verification_response) == order
+
+    execute.assert_called_once()
+    query, variables = execute.call_args.args
+    assert query == processors.FINALIZE_CHECKOUT
+    assert variables['id'] == 'saleor-checkout-id'
+    assert variables['billingAddress']['city'] == 'Riyadh'
+    assert variables['metadata'][0]['key'] == 'payment_processor_response'
+
+
+def test_complete_saleor_checkout_without_order(processor):
+    """
+    The errors of each mutation are reported when Saleor does not create the order.
+    """
+    errors = [{'field': 'lines', 'message': 'Insufficient stock', 'code': 'INSUFFICIENT_STOCK'}]
+
+    with mock.patch.object(processors, 'execute', return_value=finalization_response(complete_errors=errors)):
+        with pytest.raises(SaleorCheckoutFinalizationError) as error:
+            processor.complete_saleor_checkout(payment_status())
+
+    assert error.value.checkout_id == 'saleor-checkout-id'
+    assert error.value.errors == {'checkoutComplete': errors}
+
+
+def test_complete_saleor_checkout_with_billing_errors(processor):
+    """
+    The order is returned when only the billing address update failed.
+    """
+    errors = [{'field': 'postalCode', 'message': 'Invalid postal code', 'code': 'INVALID'}]
+    response = finalization_response({'id': 'order-id'}, billing_errors=errors)
+
+    with mock.patch.object(processors, 'execute', return_value=response):
+        assert processor.complete_saleor_checkout(payment_status()) == {'id': 'order-id'}
@@ -0,0 +1,48 @@
+"""
+Tests for the `platform_plugin_hyperpay` processor registry.
+"""
+import logging
+
+import pytest
+
+from platform_plugin_hyperpay import registry
+from platform_plugin_hyperpay.exceptions import HyperPayException
+
+
+def test_processors_are_built_from_the_configuration(hyperpay_config):  # pylint: disable=unused-argument
+    """
+    Every configured processor is registered, with its sync and async variants.
+    """
+    assert registry.get_processor('hyperpay').entity_id == 'entity-id'
+    assert registry.get_processor('hyperpay_mada').entity_id == 'mada-entity-id'
+    assert registry.get_async_processor('hyperpay_mada').entity_id == 'mada-entity-id'
+    assert registry.get_processor('hyperpay') is registry.get_processor('hyperpay')
+
+
+def test_invalid_entry_disables_only_its_processor(settings, caplog, processor_configuration):
+    """
+    An incomplete configuration is logged and does not prevent the other processors from loading.
+    """
+    incomplete = dict(processor_configuration)
+    del incomplete['access_token']
+
+    with caplog.at_level(logging.ERROR, logger=registry.__name__):
+        settings.HYPERPAY_CONFIG = {'hyperpay': incomplete, 'hyperpay_mada': processor_configuration}
+
+    assert registry.get_processor('hyperpay_mada').entity_id == 'entity-id'
+    with pytest.raises(HyperPayException):
+        registry.get_processor('hyperpay')
+    with pytest.raises(HyperPayException):
+        registry.get_async_processor('hyperpay')
+    assert 'Invalid HYPERPAY_CONFIG entry for hyperpay' in caplog.text
+
+
+def test_unconfigured_processor(settings):
+    """
+    Looking up a processor without configuration raises HyperPayException.
+    """
+    settings.HYPERPAY_CONFIG = {}
+
+    with pytest.raises(HyperPayException):
+        registry.get_processor('hyperpay')
+    assert registry.get_processors() == []
@@ -0,0 +1,128 @@
+"""
+Tests for the `platform_plugin_hyperpay` transaction reports and their export.
+"""
+import csv
+import os
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from platform_plugin_hyperpay import reports
+from platform_plugin_hyperpay.processors import HyperPay
+from platform_plugin_hyperpay.reports import REPORT_COLUMNS, fetch_report_window
+from platform_plugin_hyperpay.serialization import dumps
+
+START = datetime(2026, 9, 1, tzinfo=timezone.utc)
+END = START + timedelta(hours=1)
+
+
+def record(index):
+    return {
+        'id': 'payment-{}'.format(index),
+        'timestamp': '2026-09-01 00:00:00',
+        'paymentType': 'DB',
+        'paymentBrand': 'VISA',
+        'amount': '115.00',
+        'currency': 'SAR',
+        'merchantTransactionId': 'saleor-checkout-{}'.format(index),
+        'ndc': 'hyperpay-checkout-{}'.format(index),
+        'result': {'code': '000.000.000', 'description': 'Transaction succeeded'},
+    }
+
+
+class FakeReportingAPI:
+    """
+    Reporting API returning the records in pages of ``page_size``, with or without the page count.
+    """
+
+    def __init__(self, count, page_size=100, with_page_count=True, error_page=None):
+        self.records = [record(index) for index in range(count)]
+        self.page_size = page_size
+        self.with_page_count = with_page_count
+        self.error_page = error_page
+        self.pages = []
+
+    def __call__(self, url, **kwargs):  # pylint: disable=unused-argument
+        page = int(parse_qs(urlsplit(url).query)['pageNo'][0])
+        self.pages.append(page)
+        if page == self.error_page:
+            return mock.Mock(ok=False, content=dumps({'result': {'code': '800.900.300'}}))
+        data = {'records': self.records[(page - 1) * self.page_size:page * self.page_size]}
+        if self.with_page_count:
+            data['pageCount'] = max(1, -(-len(self.records) // self.page_size))
+        return mock.Mock(ok=True, content=dumps(data))
+
+
+@pytest.fixture
+def processor(processor_configuration):
+    return HyperPay(processor_configuration)
+
+
+def test_multi_page_window(processor):
+    """
+    Every page is read, up to the page count returned by the API.
+    """
+    api = FakeReportingAPI(250)
+    with mock.patch.object(reports, 'http_get', api):
+        rows = fetch_report_window(processor, START, END)
+
+    assert [row[2] for row in rows] == ['payment-{}'.format(index) for index in range(250)]
+    assert api.pages == [1, 2, 3]
+
+
+def test_full_last_page(processor):
+    """
+    A last page of exactly REPORT_PAGE_SIZE records does not query an extra page when the page count is known.
+    """
+    api = FakeReportingAPI(200)
+    with mock.patch.object(reports, 'http_get', api):
+        assert len(fetch_report_window(processor, START, END)) == 200
+
+    assert api.pages == [1, 2]
+
+
+def test_short_pages_without_page_count(processor):
+    """
+    Pages capped below REPORT_PAGE_SIZE do not end the window, an empty page does.
+    """
+    api = FakeReportingAPI(120, page_size=50, with_page_count=False)
+    with mock.patch.object(reports, 'http_get', api):
+        rows = fetch_report_window(processor, START, END)
+
+    assert len(rows) == 120
+    assert api.pages == [1, 2, 3, 4]
+
+
+def test_export_csv(hyperpay_config, tmp_path):  # pylint: disable=unused-argument
+    """
+    The export writes a row per transaction under the report columns.
+    """
+    output = tmp_path / 'report.csv'
+    with mock.patch.object(reports, 'http_get', FakeReportingAPI(3)):
+        call_command('export_hyperpay_transactions', '2026-09-01', '2026-09-02', str(output),
+                     '--processor', 'hyperpay', '--window', '1440')
+
+    with open(output, newline='', encoding='utf-8') as report_file:
+        rows = list(csv.reader(report_file))
+    assert rows[0] == list(REPORT_COLUMNS)
+    assert len(rows) == 4
+    assert os.listdir(tmp_path) == ['report.csv']
+
+
+def test_export_error_keeps_no_partial_file(hyperpay_config, tmp_path):  # pylint: disable=unused-argument
+    """
+    A failed page aborts the export without leaving a partial report behind.
+    """
+    output = tmp_path / 'report.csv'
+    output.write_text('previous report')
+
+    with mock.patch.object(reports, 'http_get', FakeReportingAPI(250, error_page=2)):
+        with pytest.raises(CommandError, match='transaction report'):
+            call_command('export_hyperpay_transactions', '2026-09-01', '2026-09-03', str(output),
+                         '--processor', 'hyperpay', '--window', '1440', '--concurrency', '1')
+
+    assert output.read_text() == 'previous report'
+    assert os.listdir(tmp_path) == ['report.csv']
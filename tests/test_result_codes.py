@@ -0,0 +1,95 @@
+"""
+Tests for the `platform_plugin_hyperpay` result code classification.
+"""
+import re
+
+import pytest
+
+from platform_plugin_hyperpay.result_codes import UNKNOWN_CATEGORY, PaymentStatus, classify_result_code
+
+# The chain of patterns the processor used before ``classify_result_code``.
+SUCCESS_CODES_REGEX = re.compile(r'^(000\.000\.|000\.100\.1|000\.[36])')
+SUCCESS_MANUAL_REVIEW_CODES_REGEX = re.compile(r'^(000\.400\.0[^3]|000\.400\.[0-1]{2}0)')
+PENDING_CHANGEABLE_SOON_CODES_REGEX = re.compile(r'^(000\.200)')
+PENDING_NOT_CHANGEABLE_SOON_CODES_REGEX = re.compile(r'^(800\.400\.5|100\.400\.500)')
+
+
+def legacy_status(code):
+    if PENDING_CHANGEABLE_SOON_CODES_REGEX.search(code):
+        return PaymentStatus.PENDING
+    if PENDING_NOT_CHANGEABLE_SOON_CODES_REGEX.search(code):
+        return PaymentStatus.FAILURE
+    if SUCCESS_CODES_REGEX.search(code):
+        return PaymentStatus.SUCCESS
+    if SUCCESS_MANUAL_REVIEW_CODES_REGEX.search(code):
+        return PaymentStatus.FAILURE
+    return PaymentStatus.FAILURE
+
+
+REPRESENTATIVE_CODES = (
+    '000.000.000',
+    '000.000.100',
+    '000.100.110',
+    '000.100.112',
+    '000.100.200',
+    '000.200.000',
+    '000.200.100',
+    '000.300.000',
+    '000.310.100',
+    '000.400.000',
+    '000.400.010',
+    '000.400.030',
+    '000.400.101',
+    '000.400.200',
+    '000.600.000',
+    '100.100.101',
+    '100.380.401',
+    '100.390.112',
+    '100.396.101',
+    '100.400.500',
+    '200.300.404',
+    '300.100.100',
+    '600.200.100',
+    '700.100.100',
+    '800.100.151',
+    '800.110.100',
+    '800.400.500',
+    '800.800.800',
+    '900.100.300',
+    '999.999.999',
+    'not-a-code',
+    '',
+)
+
+
+@pytest.mark.parametrize('code', REPRESENTATIVE_CODES)
+def test_status_matches_legacy_patterns(code):
+    """
+    Every code gets the status the processor computed before.
+    """
+    assert classify_result_code(code).status == legacy_status(code)
+
+
+@pytest.mark.parametrize('code, category', (
+    ('000.000.000', 'success'),
+    ('000.200.100', 'pending'),
+    ('800.400.500', 'pending_not_changeable_soon'),
+    ('000.400.000', 'success_manual_review'),
+    ('800.100.151', 'rejected_external_bank'),
+    ('100.396.101', 'rejected_async_workflow'),
+    ('900.100.300', 'rejected_communication'),
+    ('123.456.789', UNKNOWN_CATEGORY),
+))
+def test_category(code, category):
+    """
+    Codes are labelled with the group of the catalogue they belong to.
+    """
+    assert classify_result_code(code).category == category
+
+
+def test_description():
+    """
+    Codes with a known description use it, the others the description of their group.
+    """
+    assert classify_result_code('800.100.151').description == 'transaction declined (invalid card)'
+    assert classify_result_code('800.100.199').description == 'Rejected by the external bank or payment system'
@@ -0,0 +1,104 @@
+"""
+Tests for the `platform_plugin_hyperpay` registration of the Saleor app token.
+"""
+from unittest import mock
+
+import pytest
+
+from platform_plugin_hyperpay.exceptions import HyperPayException
+from platform_plugin_hyperpay.models import SaleorAppToken
+from platform_plugin_hyperpay.saleor_app import tokens, views
+from platform_plugin_hyperpay.saleor_app.store import VersionedRecordStore
+from platform_plugin_hyperpay.saleor_app.tokens import get_saleor_api_token
+from platform_plugin_hyperpay.serialization import dumps
+
+pytestmark = pytest.mark.django_db
+
+SALEOR_API_URL = 'https://saleor.example.com/graphql/'
+REGISTER_URL = '/saleor-app/api/register'
+
+
+@pytest.fixture(autouse=True)
+def saleor_settings(settings):
+    settings.SALEOR_API_URL = SALEOR_API_URL
+    settings.SALEOR_API_TOKEN = 'settings-token'
+    return settings
+
+
+@pytest.fixture(autouse=True)
+def token_store():
+    """
+    Start every test without the token read by the previous ones.
+    """
+    token_store = VersionedRecordStore(
+        SaleorAppToken,
+        ('token',),
+        tokens.TOKEN_VERSION_CACHE_KEY,
+        'HYPERPAY_SALEOR_TOKEN_CHECK_INTERVAL',
+    )
+    with mock.patch.object(tokens, 'token_store', token_store):
+        yield token_store
+
+
+def register(client, token='new-token', api_url=SALEOR_API_URL):
+    headers = {'HTTP_SALEOR_API_URL': api_url} if api_url else {}
+    return client.post(REGISTER_URL, dumps({'auth_token': token}), content_type='application/json', **headers)
+
+
+def test_register_verified_token(client, saleor_settings):
+    """
+    A token that authenticates the app against the Saleor API is stored, without changing the settings.
+    """
+    with mock.patch.object(views, 'execute', return_value={'app': {'id': 'app-id'}}) as execute:
+        response = register(client)
+
+    assert response.status_code == 200
+    execute.assert_called_once_with(views.APP_ID, token='new-token')
+    assert get_saleor_api_token() == 'new-token'
+    assert saleor_settings.SALEOR_API_TOKEN == 'settings-token'
+
+
+@pytest.mark.parametrize('api_url', (None, 'https://attacker.example.com/graphql/'))
+def test_register_from_unknown_saleor_api(client, api_url):
+    """
+    Tokens sent for another Saleor API are rejected without being checked.
+    """
+    with mock.patch.object(views, 'execute') as execute:
+        response = register(client, api_url=api_url)
+
+    assert response.status_code == 403
+    execute.assert_not_called()
+    assert get_saleor_api_token() == 'settings-token'
+
+
+@pytest.mark.parametrize('result', (
+    {'return_value': {'app': None}},
+    {'side_effect': HyperPayException('Saleor API returned errors')},
+))
+def test_register_invalid_token(client, result):
+    """
+    Tokens that do not authenticate the app against the Saleor API are rejected.
+    """
+    with mock.patch.object(views, 'execute', **result):
+        response = register(client)
+
+    assert response.status_code == 403
+    assert get_saleor_api_token() == 'settings-token'
+
+
+def test_register_without_token(client):
+    """
+    Requests without a token are rejected.
+    """
+    with mock.patch.object(views, 'execute') as execute:
+        response = register(client, token=None)
+        invalid = client.post(REGISTER_URL, b'not-json', content_type='application/json',
+                              HTTP_SALEOR_API_URL=SALEOR_API_URL)
+
+    assert response.status_code == 400
+    assert invalid.status_code == 400
+    execute.assert_not_called()
+
+
+def test_register_requires_post(client):
+    assert client.get(REGISTER_URL, HTTP_SALEOR_API_URL=SALEOR_API_URL).status_code == 405
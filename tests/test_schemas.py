@@ -0,0 +1,109 @@
+"""
+Tests for the `platform_plugin_hyperpay` Saleor webhook payload schemas.
+"""
+import pytest
+
+from platform_plugin_hyperpay.saleor_app.client.subscriptions import TRANSACTION_INITIALIZE
+from platform_plugin_hyperpay.saleor_app.schemas import (
+    Field,
+    WebhookPayloadError,
+    compile_subscription,
+    validate_payload,
+)
+
+SUBSCRIPTION = """
+subscription Example {
+  event {
+    ...Metadata
+    checkout { id lines { quantity variant { sku } } }
+    total: amount
+    issuingPrincipal { ... on Node { id } }
+  }
+}
+fragment Metadata on Event { issuedAt version }
+"""
+
+
+def test_compile_subscription():
+    """
+    The schema lists the selected fields, with fragments resolved and aliases applied.
+    """
+    assert compile_subscription(SUBSCRIPTION) == {
+        'issuedAt': Field(None, False),
+        'version': Field(None, False),
+        'checkout': Field({
+            'id': Field(None, False),
+            'lines': Field({
+                'quantity': Field(None, False),
+                'variant': Field({'sku': Field(None, False)}, False),
+            }, False),
+        }, False),
+        'total': Field(None, False),
+        'issuingPrincipal': Field({'id': Field(None, True)}, False),
+    }
+
+
+def test_compile_subscription_without_event():
+    """
+    A subscription that does not select the event cannot be used for a webhook.
+    """
+    with pytest.raises(ValueError):
+        compile_subscription('subscription Example { other { id } }')
+
+
+def test_compile_transaction_initialize_subscription():
+    """
+    The subscription of the TRANSACTION_INITIALIZE_SESSION webhook resolves its nested fragments.
+    """
+    schema = compile_subscription(TRANSACTION_INITIALIZE)
+
+    assert set(schema) == {
+        'issuedAt', 'version', '__typename', 'recipient', 'idempotencyKey', 'data', 'merchantReference',
+        'action', 'issuingPrincipal', 'transaction',
+    }
+    assert set(schema['transaction'].selection) == {'id', 'token', 'pspReference', 'events'}
+
+
+def payload(**fields):
+    return {
+        'issuedAt': '2026-10-01T10:00:00+00:00',
+        'version': '3.20',
+        'checkout': {'id': 'checkout-id', 'lines': [{'quantity': 1, 'variant': {'sku': 'sku'}}]},
+        'total': 10,
+        'issuingPrincipal': {},
+        **fields,
+    }
+
+
+def test_validate_payload():
+    """
+    Payloads with every selected field are valid, nulls and missing optional fields included.
+    """
+    schema = compile_subscription(SUBSCRIPTION)
+
+    validate_payload(schema, payload())
+    validate_payload(schema, payload(checkout=None, issuingPrincipal={'id': 'user-id'}))
+
+
+@pytest.mark.parametrize('invalid, message', (
+    ({'checkout': {'lines': []}}, 'event.checkout.id is missing'),
+    ({'checkout': {'id': 'checkout-id', 'lines': [{'quantity': 1}]}}, 'event.checkout.lines.variant is missing'),
+    ({'checkout': 'checkout-id'}, 'event.checkout must be an object'),
+))
+def test_validate_invalid_payload(invalid, message):
+    """
+    Missing fields and values of the wrong type are reported with their path.
+    """
+    with pytest.raises(WebhookPayloadError, match=message):
+        validate_payload(compile_subscription(SUBSCRIPTION), payload(**invalid))
+
+
+def test_validate_missing_field():
+    """
+    A missing required field is reported.
+    """
+    data = payload()
+    del data['issuedAt']
+
+    with pytest.raises(WebhookPayloadError, match='event.issuedAt is missing'):
+        validate_payload(compile_subscription(SUBSCRIPTION), data)
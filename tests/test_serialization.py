@@ -0,0 +1,114 @@
+"""
+Tests for the `platform_plugin_hyperpay` JSON serialization.
+"""
+import importlib.util
+import json
+import sys
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse as DjangoJsonResponse
+from django.utils.translation import gettext_lazy
+
+from platform_plugin_hyperpay import serialization
+
+DOCUMENT = {
+    'amount': Decimal('115.00'),
+    'created': datetime(2026, 10, 1, 10, 30, 15, 123456, tzinfo=timezone.utc),
+    'day': date(2026, 10, 1),
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'label': gettext_lazy('Success'),
+    'name': 'دورة',
+    'items': [1, 2.5, None, True],
+    1: 'integer key',
+}
+
+
+@pytest.fixture(params=('orjson', 'json'))
+def backend(request):
+    """
+    The serialization module loaded with each backend.
+    """
+    if request.param == 'orjson':
+        return serialization
+    spec = importlib.util.spec_from_file_location('serialization_without_orjson', serialization.__file__)
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(sys.modules, {'orjson': None}):
+        spec.loader.exec_module(module)
+    assert module.JSON_BACKEND == 'json'
+    return module
+
+
+def test_backends_produce_the_same_document(backend):
+    """
+    Both backends encode the types of DjangoJSONEncoder as Django does.
+    """
+    expected = json.loads(json.dumps(DOCUMENT, cls=DjangoJSONEncoder))
+
+    assert backend.loads(backend.dumps(DOCUMENT)) == expected
+    assert expected['created'] == '2026-10-01T10:30:15.123Z'
+
+
+def test_dumps_is_compact(backend):
+    """
+    Documents are encoded as compact bytes.
+    """
+    assert backend.dumps({'a': [1, 2], 'b': {'c': None}}) == b'{"a":[1,2],"b":{"c":null}}'
+
+
+@pytest.mark.parametrize('data', (b'{', b'[1,', '{"a": }'))
+def test_invalid_document(backend, data):
+    """
+    Invalid documents raise a JSONDecodeError with both backends.
+    """
+    with pytest.raises(serialization.JSONDecodeError):
+        backend.loads(data)
+
+
+def test_unsupported_type(backend):
+    """
+    Types that Django cannot encode raise a TypeError with both backends.
+    """
+    with pytest.raises(TypeError):
+        backend.dumps({'value': object()})
+
+
+def test_json_response(backend):
+    """
+    The response has the content and content type of Django's JsonResponse.
+    """
+    response = backend.JsonResponse(DOCUMENT, status=201)
+    expected = DjangoJsonResponse(DOCUMENT)
+
+    assert response.status_code == 201
+    assert response['Content-Type'] == expected['Content-Type']
+    assert json.loads(response.content) == json.loads(expected.content)
+
+
+def test_json_response_safe(backend):
+    """
+    Non-dict data is refused unless safe is False.
+    """
+    with pytest.raises(TypeError):
+        backend.JsonResponse([1, 2])
+
+    assert json.loads(backend.JsonResponse([1, 2], safe=False).content) == [1, 2]
+
+
+def test_json_response_with_custom_encoder(backend):
+    """
+    A custom encoder or dump parameters are honoured by delegating to Django.
+    """
+    class Encoder(DjangoJSONEncoder):
+        def default(self, o):
+            if isinstance(o, set):
+                return sorted(o)
+            return super().default(o)
+
+    response = backend.JsonResponse({'ids': {2, 1}}, encoder=Encoder, json_dumps_params={'indent': 2})
+
+    assert response.content == DjangoJsonResponse({'ids': [1, 2]}, json_dumps_params={'indent': 2}).content
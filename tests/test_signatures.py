@@ -0,0 +1,231 @@
+"""
+Tests for the `platform_plugin_hyperpay` verification of the Saleor webhook signatures.
+"""
+import threading
+from unittest import mock
+
+import pytest
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from platform_plugin_hyperpay.saleor_app import signatures
+from platform_plugin_hyperpay.saleor_app.signatures import (
+    JWKSCache,
+    SaleorSignatureError,
+    base64url_encode,
+    verify_saleor_signature,
+)
+from platform_plugin_hyperpay.serialization import dumps
+
+DOMAIN_URL = 'https://saleor.example.com'
+BODY = b'{"issuedAt": "2026-10-01T10:00:00+00:00"}'
+
+
+def generate_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+KEYS = {'key-1': generate_key(), 'key-2': generate_key()}
+
+
+def jwk(kid):
+    numbers = KEYS[kid].public_key().public_numbers()
+
+    def encode(value):
+        return base64url_encode(value.to_bytes((value.bit_length() + 7) // 8, 'big')).decode()
+
+    return {'kty': 'RSA', 'kid': kid, 'alg': 'RS256', 'use': 'sig', 'e': encode(numbers.e), 'n': encode(numbers.n)}
+
+
+def sign(body, kid='key-1', unencoded=True, alg='RS256'):
+    """
+    Return the detached JWS of the body, as Saleor sends it in ``Saleor-Signature``.
+    """
+    header = {'alg': alg, 'kid': kid}
+    if unencoded:
+        header.update({'b64': False, 'crit': ['b64']})
+    encoded_header = base64url_encode(dumps(header))
+    payload = body if unencoded else base64url_encode(body)
+    signature = KEYS[kid].sign(encoded_header + b'.' + payload, padding.PKCS1v15(), hashes.SHA256())
+    return '{}..{}'.format(encoded_header.decode(), base64url_encode(signature).decode())
+
+
+class FakeJWKSEndpoint:
+    """
+    JWKS endpoint of Saleor, which can rotate its keys or fail.
+    """
+
+    def __init__(self, *kids):
+        self.kids = kids
+        self.error = None
+        self.calls = 0
+
+    def __call__(self, url, **kwargs):  # pylint: disable=unused-argument
+        assert url == DOMAIN_URL + signatures.JWKS_PATH
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        response = mock.Mock(content=dumps({'keys': [jwk(kid) for kid in self.kids]}))
+        return response
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def endpoint():
+    endpoint = FakeJWKSEndpoint('key-1')
+    with mock.patch.object(signatures, 'http_get', endpoint):
+        yield endpoint
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with mock.patch.object(signatures.time, 'monotonic', clock):
+        yield clock
+
+
+@pytest.fixture
+def jwks_cache(settings):
+    settings.SALEOR_API_URL = DOMAIN_URL + '/graphql/'
+    jwks_cache = JWKSCache({'ttl': 3600, 'min_refresh_interval': 30, 'refresh_wait_timeout': 1})
+    with mock.patch.object(signatures, 'jwks_cache', jwks_cache):
+        yield jwks_cache
+
+
+@pytest.mark.parametrize('unencoded', (True, False))
+def test_valid_signature(endpoint, jwks_cache, unencoded):  # pylint: disable=unused-argument
+    """
+    Detached signatures are verified, with both an unencoded (b64=false) and an encoded payload.
+    """
+    verify_saleor_signature(BODY, sign(BODY, unencoded=unencoded))
+
+
+@pytest.mark.parametrize('signature, message', (
+    (None, 'not signed'),
+    ('not-a-jws', 'Malformed'),
+    ('e30.payload.c2ln', 'detached'),
+))
+def test_malformed_signature(endpoint, jwks_cache, signature, message):  # pylint: disable=unused-argument
+    """
+    Missing, malformed and attached signatures are rejected.
+    """
+    with pytest.raises(SaleorSignatureError, match=message):
+        verify_saleor_signature(BODY, signature)
+
+
+@pytest.mark.parametrize('unencoded', (True, False))
+def test_tampered_body(endpoint, jwks_cache, unencoded):  # pylint: disable=unused-argument
+    """
+    A signature does not verify another body.
+    """
+    with pytest.raises(SaleorSignatureError, match='Invalid signature'):
+        verify_saleor_signature(BODY + b' ', sign(BODY, unencoded=unencoded))
+
+
+def test_unsupported_algorithm(endpoint, jwks_cache):  # pylint: disable=unused-argument
+    """
+    Only RS256 signatures are accepted.
+    """
+    with pytest.raises(SaleorSignatureError, match='Unsupported'):
+        verify_saleor_signature(BODY, sign(BODY, alg='HS256'))
+
+
+def test_keys_are_fetched_once(endpoint, jwks_cache, clock):  # pylint: disable=unused-argument
+    """
+    The keys are reused until they expire.
+    """
+    for _ in range(3):
+        verify_saleor_signature(BODY, sign(BODY))
+
+    assert endpoint.calls == 1
+
+
+def test_key_rotation(endpoint, jwks_cache, clock):  # pylint: disable=unused-argument
+    """
+    A webhook signed with a new key fetches the JWKS again, at most once per refresh interval.
+    """
+    verify_saleor_signature(BODY, sign(BODY))
+    endpoint.kids = ('key-2',)
+
+    clock.now += 5
+    with pytest.raises(SaleorSignatureError, match='Unknown signing key'):
+        verify_saleor_signature(BODY, sign(BODY, kid='key-2'))
+    assert endpoint.calls == 1
+
+    clock.now += 30
+    verify_saleor_signature(BODY, sign(BODY, kid='key-2'))
+    assert endpoint.calls == 2
+
+
+def test_fetch_failure_keeps_the_previous_keys(endpoint, jwks_cache, clock):  # pylint: disable=unused-argument
+    """
+    When the expired keys cannot be fetched again, they keep being used and the fetch is throttled.
+    """
+    verify_saleor_signature(BODY, sign(BODY))
+    endpoint.error = ConnectionError('Saleor is down')
+
+    clock.now += 3601
+    verify_saleor_signature(BODY, sign(BODY))
+    verify_saleor_signature(BODY, sign(BODY))
+    assert endpoint.calls == 2
+
+    clock.now += 30
+    endpoint.error = None
+    verify_saleor_signature(BODY, sign(BODY))
+    assert endpoint.calls == 3
+
+
+def test_fetch_failure_without_keys(endpoint, jwks_cache, clock):  # pylint: disable=unused-argument
+    """
+    Without any key to fall back to, webhooks are rejected and the fetch is throttled.
+    """
+    endpoint.error = ConnectionError('Saleor is down')
+
+    for _ in range(3):
+        with pytest.raises(SaleorSignatureError, match='Unknown signing key'):
+            verify_saleor_signature(BODY, sign(BODY))
+
+    assert endpoint.calls == 1
+
+
+def test_fetch_does_not_hold_the_lock(jwks_cache):
+    """
+    The JWKS is fetched without holding the lock shared by every webhook.
+    """
+    def fetch(url, **kwargs):  # pylint: disable=unused-argument
+        assert not jwks_cache._lock.locked()  # pylint: disable=protected-access
+        return mock.Mock(content=dumps({'keys': [jwk('key-1')]}))
+
+    with mock.patch.object(signatures, 'http_get', fetch):
+        verify_saleor_signature(BODY, sign(BODY))
+
+
+def test_slow_refresh_does_not_block_known_keys(endpoint, jwks_cache, clock):  # pylint: disable=unused-argument
+    """
+    While a refresh of the expired keys is in progress, the other webhooks keep using them.
+    """
+    verify_saleor_signature(BODY, sign(BODY))
+    started, release = threading.Event(), threading.Event()
+
+    def slow_fetch(url, **kwargs):
+        started.set()
+        release.wait(5)
+        return endpoint(url, **kwargs)
+
+    clock.now += 3601
+    with mock.patch.object(signatures, 'http_get', slow_fetch):
+        refresh = threading.Thread(target=verify_saleor_signature, args=(BODY, sign(BODY)))
+        refresh.start()
+        assert started.wait(5)
+        verify_saleor_signature(BODY, sign(BODY))
+        release.set()
+        refresh.join(5)
+
+    assert endpoint.calls == 2
@@ -0,0 +1,114 @@
+"""
+Tests for the `platform_plugin_hyperpay` versioned single-record stores.
+"""
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from platform_plugin_hyperpay.models import SaleorAppConfiguration
+from platform_plugin_hyperpay.saleor_app import store
+from platform_plugin_hyperpay.saleor_app.configuration import CONFIGURATION_FIELDS, CONFIGURATION_VERSION_CACHE_KEY
+from platform_plugin_hyperpay.saleor_app.store import RECORD_PK, VersionedRecordStore
+
+pytestmark = pytest.mark.django_db
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with mock.patch.object(store.time, 'monotonic', clock):
+        yield clock
+
+
+def build_store():
+    """
+    Return a store of the Saleor app configuration, as built by each worker process.
+    """
+    return VersionedRecordStore(
+        SaleorAppConfiguration,
+        CONFIGURATION_FIELDS,
+        CONFIGURATION_VERSION_CACHE_KEY,
+        'HYPERPAY_SALEOR_APP_CONFIG_CHECK_INTERVAL',
+    )
+
+
+def test_empty_store():
+    """
+    Without a record, every field is empty.
+    """
+    assert build_store().get() == dict.fromkeys(CONFIGURATION_FIELDS, '')
+
+
+def test_save_bumps_the_version(django_capture_on_commit_callbacks):
+    """
+    Every save increases the version of the record and publishes it once committed.
+    """
+    configuration_store = build_store()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        configuration_store.save(payment_url='https://pay.example.com/1')
+    with django_capture_on_commit_callbacks(execute=True):
+        values = configuration_store.save(payment_url='https://pay.example.com/2', access_token=None)
+
+    record = SaleorAppConfiguration.objects.get(pk=RECORD_PK)
+    assert record.version == 2
+    assert cache.get(CONFIGURATION_VERSION_CACHE_KEY) == 2
+    assert values['payment_url'] == 'https://pay.example.com/2'
+    assert values['access_token'] == ''
+
+
+def test_other_process_refreshes_after_the_check_interval(settings, clock, django_capture_on_commit_callbacks):
+    """
+    A process keeps its values until the check interval elapsed, then reads the new version.
+    """
+    settings.HYPERPAY_SALEOR_APP_CONFIG_CHECK_INTERVAL = 5
+    reader, writer = build_store(), build_store()
+    assert reader.get()['payment_url'] == ''
+
+    with django_capture_on_commit_callbacks(execute=True):
+        writer.save(payment_url='https://pay.example.com')
+
+    clock.now += 4
+    assert reader.get()['payment_url'] == ''
+    clock.now += 1
+    assert reader.get()['payment_url'] == 'https://pay.example.com'
+
+
+def test_unchanged_version_is_not_read_again(clock):
+    """
+    The record is only read from the database when its published version changed.
+    """
+    configuration_store = build_store()
+    configuration_store.get()
+
+    clock.now += 60
+    with mock.patch.object(SaleorAppConfiguration.objects, 'filter') as query:
+        configuration_store.get()
+
+    query.assert_not_called()
+
+
+def test_reload_on_cache_eviction(clock, django_capture_on_commit_callbacks):
+    """
+    When the published version was evicted from the cache, the record is read again and its version republished.
+    """
+    reader, writer = build_store(), build_store()
+    with django_capture_on_commit_callbacks(execute=True):
+        writer.save(payment_url='https://pay.example.com/1')
+    assert reader.get()['payment_url'] == 'https://pay.example.com/1'
+
+    SaleorAppConfiguration.objects.filter(pk=RECORD_PK).update(version=2, payment_url='https://pay.example.com/2')
+    cache.clear()
+    clock.now += 60
+
+    assert reader.get()['payment_url'] == 'https://pay.example.com/2'
+    assert cache.get(CONFIGURATION_VERSION_CACHE_KEY) == 2
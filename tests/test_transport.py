@@ -0,0 +1,143 @@
+"""
+Tests for the `platform_plugin_hyperpay` HTTP transport.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import pytest
+import requests
+
+from platform_plugin_hyperpay import transport
+from platform_plugin_hyperpay.transport import get_http_session, http_get, http_post, reset_http_session
+
+
+class OppwaHandler(BaseHTTPRequestHandler):
+    """
+    Answer every request with the status and delay of the server, counting the requests received.
+    """
+
+    def _respond(self):
+        self.server.requests.append(self.command)
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        time.sleep(self.server.delay)
+        self.send_response(self.server.status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@pytest.fixture
+def oppwa():
+    """
+    Local HTTP server standing for oppwa.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OppwaHandler)
+    server.requests = []
+    server.status = 200
+    server.delay = 0
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    reset_http_session()
+    yield
+    reset_http_session()
+
+
+def get_url(server):
+    return 'http://127.0.0.1:{}/v1/checkouts'.format(server.server_port)
+
+
+def test_session_is_reused_per_process():
+    """
+    Every call of the same process gets the same session until it is reset.
+    """
+    session = get_http_session()
+
+    assert get_http_session() is session
+    reset_http_session()
+    assert get_http_session() is not session
+
+
+def test_session_is_rebuilt_after_fork():
+    """
+    A forked worker builds its own session instead of using the sockets of its parent.
+    """
+    session = get_http_session()
+
+    with mock.patch.object(transport.os, 'getpid', return_value=transport.os.getpid() + 1):
+        forked_session = get_http_session()
+        assert forked_session is not session
+        assert get_http_session() is forked_session
+
+
+def test_pool_configuration(settings):
+    """
+    The adapter is built from ``HYPERPAY_HTTP_CONFIG`` merged over the defaults.
+    """
+    settings.HYPERPAY_HTTP_CONFIG = {'pool_connections': 2, 'pool_maxsize': 7, 'max_retries': 5}
+
+    adapter = get_http_session().get_adapter('https://test.oppwa.com/v1/checkouts')
+
+    assert adapter._pool_connections == 2  # pylint: disable=protected-access
+    assert adapter._pool_maxsize == 7  # pylint: disable=protected-access
+    assert adapter.max_retries.total == 5
+    assert adapter.max_retries.backoff_factor == 0.3
+
+
+def test_read_timeout_is_applied(settings, oppwa):
+    """
+    Requests fail once the configured read timeout is exceeded.
+    """
+    settings.HYPERPAY_HTTP_CONFIG = {'read_timeout': 0.05, 'max_retries': 0}
+    oppwa.delay = 0.5
+
+    # Once retries are exhausted, requests reports the timeout as the reason of a ConnectionError.
+    with pytest.raises(requests.exceptions.ConnectionError, match=r'Read timed out. \(read timeout=0.05\)'):
+        http_get(get_url(oppwa))
+
+
+def test_get_is_retried(settings, oppwa):
+    """
+    GET requests are retried on gateway errors.
+    """
+    settings.HYPERPAY_HTTP_CONFIG = {'max_retries': 2, 'backoff_factor': 0}
+    oppwa.status = 503
+
+    assert http_get(get_url(oppwa)).status_code == 503
+    assert oppwa.requests == ['GET'] * 3
+
+
+def test_post_is_never_retried(settings, oppwa):
+    """
+    POST requests are sent once, creating a checkout is not idempotent.
+    """
+    settings.HYPERPAY_HTTP_CONFIG = {'max_retries': 2, 'backoff_factor': 0}
+    oppwa.status = 503
+
+    assert http_post(get_url(oppwa), {'amount': '115.00'}).status_code == 503
+    assert oppwa.requests == ['POST']
+
+
+def test_post_read_timeout_is_not_retried(settings, oppwa):
+    """
+    A POST whose response times out is not sent again.
+    """
+    settings.HYPERPAY_HTTP_CONFIG = {'read_timeout': 0.05, 'max_retries': 2, 'backoff_factor': 0}
+    oppwa.delay = 0.2
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        http_post(get_url(oppwa), {'amount': '115.00'})
+    time.sleep(0.3)
+    assert oppwa.requests == ['POST']
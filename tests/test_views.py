@@ -0,0 +1,62 @@
+"""
+Tests for the `platform_plugin_hyperpay` build information endpoint.
+"""
+from subprocess import CalledProcessError, TimeoutExpired
+from unittest import mock
+
+import pytest
+
+from platform_plugin_hyperpay import __version__, views
+
+INFO_URL = '/info/'
+
+
+@pytest.fixture(autouse=True)
+def build_info_cache():
+    views.get_build_info.cache_clear()
+    yield
+    views.get_build_info.cache_clear()
+
+
+@pytest.fixture
+def check_output():
+    with mock.patch.object(views, 'check_output', return_value=b'0123456789abcdef\n') as check_output:
+        yield check_output
+
+
+def test_info(client, check_output):
+    """
+    The version of the plugin and its git commit are served.
+    """
+    response = client.get(INFO_URL)
+
+    assert response.status_code == 200
+    assert response.json() == {'version': __version__, 'name': 'platform-plugin-hyperpay', 'git': '0123456789abcdef'}
+    assert check_output.call_args.args[0] == ['git', 'rev-parse', 'HEAD']
+
+
+def test_build_info_is_resolved_once(client, check_output):
+    """
+    git is only run on the first request of the process.
+    """
+    client.get(INFO_URL)
+    client.get(INFO_URL)
+
+    check_output.assert_called_once()
+
+
+@pytest.mark.parametrize('error', (
+    FileNotFoundError('git'),
+    CalledProcessError(128, ['git', 'rev-parse', 'HEAD']),
+    TimeoutExpired(['git', 'rev-parse', 'HEAD'], 5),
+))
+def test_info_without_git(client, check_output, error):
+    """
+    The commit is empty when git is missing, fails or hangs.
+    """
+    check_output.side_effect = error
+
+    response = client.get(INFO_URL)
+
+    assert response.status_code == 200
+    assert response.json()['git'] == ''